@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Bounded, thread-safe least-recently-used cache with optional expiry"""
+
+import collections
+import threading
+import time
+
+class LRUCache(object):
+    """Bounded, thread-safe least-recently-used cache with optional expiry
+
+    Entries are evicted least-recently-used first once the total size of all
+    entries exceeds maxsize. By default, each entry has a size of 1 (i.e.
+    maxsize is the maximum number of entries); a sizeof function may be passed
+    to bound the cache by another measure (e.g. bytes). If a time-to-live is
+    set, entries older than the time-to-live are treated as absent. Cache hits
+    and misses are counted.
+
+    Attributes:
+        maxsize (int): maximum total size of entries, 0 disables the cache
+        ttl (float): entry time-to-live in seconds, 0 means entries never expire
+        sizeof (function): function returning the size of a cached value
+        currsize (int): current total size of entries
+        entries (OrderedDict): cached (insertion time, value) pairs by key
+        hits (int): number of lookups that found a live entry
+        misses (int): number of lookups that did not find a live entry
+        lock (threading.Lock): lock guarding entries and counters
+    """
+
+    def __init__(self, maxsize, ttl=0, sizeof=None):
+        """LRUCache constructor
+
+        Arguments:
+            maxsize (int): maximum total size of entries, 0 disables the cache
+            ttl (float): entry time-to-live in seconds, 0 for no expiry
+            sizeof (function): function returning the size of a cached value,
+                by default every value has a size of 1
+        """
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sizeof = sizeof if sizeof else lambda value: 1
+        self.currsize = 0
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get a cached value, marking it as most recently used
+
+        Arguments:
+            key: cache key
+
+        Returns:
+            cached value, or None if key is absent or its entry has expired
+        """
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl \
+                and time.monotonic() - entry[0] > self.ttl:
+                self.__remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def contains(self, key):
+        """Check whether a key has a live entry, without marking it as used
+
+        Arguments:
+            key: cache key
+
+        Returns:
+            (bool): True if key is present and its entry has not expired
+        """
+
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and not (
+                self.ttl and time.monotonic() - entry[0] > self.ttl)
+
+    def put(self, key, value):
+        """Add or update a cached value, evicting least recently used entries
+
+        Values larger than the maximum cache size are not cached.
+
+        Arguments:
+            key: cache key
+            value: value to cache
+        """
+
+        size = self.sizeof(value)
+        if size > self.maxsize:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.__remove(key)
+            self.entries[key] = (time.monotonic(), value)
+            self.currsize += size
+            while self.currsize > self.maxsize:
+                self.__remove(next(iter(self.entries)))
+
+    def __remove(self, key):
+        """Remove an entry, updating the current total size (lock held)
+
+        Arguments:
+            key: cache key
+        """
+
+        inserted, value = self.entries.pop(key)
+        self.currsize -= self.sizeof(value)
+
+    def clear(self):
+        """Remove all cached values and reset hit/miss counters"""
+
+        with self.lock:
+            self.entries.clear()
+            self.currsize = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_hits(self):
+        """Get the number of cache hits
+
+        Returns:
+            (int): number of lookups that found a live entry
+        """
+
+        return self.hits
+
+    def get_misses(self):
+        """Get the number of cache misses
+
+        Returns:
+            (int): number of lookups that did not find a live entry
+        """
+
+        return self.misses
+
+    def get_stats(self):
+        """Get cache statistics
+
+        Returns:
+            (dict): hits, misses, number of entries, current total size, and
+                maximum total size of the cache
+        """
+
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "currsize": self.currsize,
+                "maxsize": self.maxsize
+            }
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Bounded, thread-safe store of values pinned in memory, never evicted"""
+
+import threading
+
+class PinnedStore(object):
+    """Bounded, thread-safe store of values pinned in memory
+
+    Unlike an LRU cache, pinned values are never evicted: once the total size
+    of all pinned values would exceed maxsize, further values are refused.
+
+    Attributes:
+        maxsize (int): maximum total size of pinned values, 0 disables pinning
+        sizeof (function): function returning the size of a pinned value
+        currsize (int): current total size of pinned values
+        entries (dict): pinned values by key
+        lock (threading.Lock): lock guarding entries
+    """
+
+    def __init__(self, maxsize, sizeof=len):
+        """PinnedStore constructor
+
+        Arguments:
+            maxsize (int): maximum total size of pinned values, 0 disables
+                pinning
+            sizeof (function): function returning the size of a pinned value
+        """
+
+        self.maxsize = maxsize
+        self.sizeof = sizeof
+        self.currsize = 0
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get a pinned value
+
+        Arguments:
+            key: store key
+
+        Returns:
+            pinned value, or None if key is not pinned
+        """
+
+        return self.entries.get(key)
+
+    def contains(self, key):
+        """Check whether a key is pinned
+
+        Arguments:
+            key: store key
+
+        Returns:
+            (bool): True if key is pinned
+        """
+
+        return key in self.entries
+
+    def pin(self, key, value):
+        """Pin a value, unless it does not fit in the remaining space
+
+        Arguments:
+            key: store key
+            value: value to pin
+
+        Returns:
+            (bool): True if the value is pinned
+        """
+
+        size = self.sizeof(value)
+        with self.lock:
+            if key in self.entries:
+                self.currsize -= self.sizeof(self.entries.pop(key))
+            if self.currsize + size > self.maxsize:
+                return False
+            self.entries[key] = value
+            self.currsize += size
+            return True
+
+    def clear(self):
+        """Unpin all values"""
+
+        with self.lock:
+            self.entries.clear()
+            self.currsize = 0
+
+    def get_stats(self):
+        """Get store statistics
+
+        Returns:
+            (dict): number of pinned values, current total size, and maximum
+                total size of the store
+        """
+
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "currsize": self.currsize,
+                "maxsize": self.maxsize
+            }
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""Bloom filter of known sequence ids, built offline and loaded at startup
+
+A Bloom filter answers whether a sequence id may be known (possibly a false
+positive, at a configurable rate) or is definitely unknown, in constant time
+and without any upstream requests. Requests for definitely unknown sequence ids
+are rejected without reaching the datasource.
+
+The Bloom filter file is laid out as:
+    header: magic (8 bytes), number of bits (uint64), number of hash
+        functions (uint32)
+    bits: bit array, least significant bit first
+
+All integers are little-endian. The file is memory-mapped.
+"""
+
+import hashlib
+import math
+import mmap
+import struct
+import threading
+from ga4gh.refget.config.exceptions import RefgetCatalogException
+
+BLOOM_MAGIC = b"RGBLM001"
+"""Magic bytes identifying a Bloom filter file, and its format version"""
+
+HEADER = struct.Struct("<8sQI")
+"""Bloom filter header: magic, number of bits, number of hash functions"""
+
+bloom_filters = {}
+"""Process-wide memory-mapped Bloom filters, by Bloom filter file path"""
+
+bloom_filters_lock = threading.Lock()
+"""Lock guarding loading of process-wide Bloom filters"""
+
+def get_bit_positions(key, n_bits, n_hashes):
+    """Get the bit positions of a key, by enhanced double hashing
+
+    The cubic term keeps positions distinct even when the second hash is a
+    multiple of the number of bits
+
+    Arguments:
+        key (str): sequence id
+        n_bits (int): number of bits in the filter
+        n_hashes (int): number of hash functions
+
+    Returns:
+        (generator): bit positions
+    """
+
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    h1, h2 = struct.unpack("<QQ", digest)
+    return ((h1 + i * h2 + (i ** 3 - i) // 6) % n_bits
+            for i in range(n_hashes))
+
+class BloomFilter(object):
+    """Bloom filter of known sequence ids
+
+    Attributes:
+        n_bits (int): number of bits in the filter
+        n_hashes (int): number of hash functions
+        bits (bytearray or memoryview): bit array, a view of the mapped file
+            if loaded from a file
+    """
+
+    def __init__(self, n_bits, n_hashes, bits=None):
+        """BloomFilter constructor
+
+        Arguments:
+            n_bits (int): number of bits in the filter
+            n_hashes (int): number of hash functions
+            bits (bytearray or memoryview): bit array, by default empty
+        """
+
+        self.n_bits = n_bits
+        self.n_hashes = n_hashes
+        self.bits = bits if bits is not None \
+            else bytearray((n_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        """Create an empty, optimally sized Bloom filter
+
+        Arguments:
+            capacity (int): expected number of sequence ids
+            error_rate (float): target false positive rate
+
+        Returns:
+            (BloomFilter): empty Bloom filter
+        """
+
+        capacity = max(capacity, 1)
+        n_bits = int(math.ceil(
+            -capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        n_hashes = max(int(round(n_bits / capacity * math.log(2))), 1)
+        return cls(n_bits, n_hashes)
+
+    @classmethod
+    def load(cls, path):
+        """Load a Bloom filter file, memory-mapped
+
+        Arguments:
+            path (str): path to Bloom filter file
+
+        Returns:
+            (BloomFilter): loaded Bloom filter
+
+        Raises:
+            RefgetCatalogException: when the file does not exist, or is not a
+                Bloom filter
+        """
+
+        try:
+            with open(path, "rb") as fh:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            raise RefgetCatalogException(
+                "Bloom filter file could not be read: " + path)
+
+        if len(mapped) < HEADER.size:
+            raise RefgetCatalogException("not a Bloom filter: " + path)
+        magic, n_bits, n_hashes = HEADER.unpack_from(mapped, 0)
+        if magic != BLOOM_MAGIC or n_bits == 0 \
+            or len(mapped) != HEADER.size + (n_bits + 7) // 8:
+            raise RefgetCatalogException("not a Bloom filter: " + path)
+        return cls(n_bits, n_hashes, memoryview(mapped)[HEADER.size:])
+
+    def save(self, path):
+        """Write the Bloom filter to a file
+
+        Arguments:
+            path (str): path to Bloom filter file
+        """
+
+        with open(path, "wb") as fh:
+            fh.write(HEADER.pack(BLOOM_MAGIC, self.n_bits, self.n_hashes))
+            fh.write(self.bits)
+
+    def add(self, key):
+        """Add a sequence id to the filter
+
+        Arguments:
+            key (str): sequence id
+        """
+
+        for position in get_bit_positions(key, self.n_bits, self.n_hashes):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        """Check whether a sequence id may be known
+
+        Arguments:
+            key (str): sequence id
+
+        Returns:
+            (bool): False if the id is definitely unknown, True if it may be
+                known
+        """
+
+        for position in get_bit_positions(key, self.n_bits, self.n_hashes):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+def get_bloom_filter(properties):
+    """Get the process-wide Bloom filter of known sequence ids
+
+    Arguments:
+        properties (Properties): runtime properties, containing the path to the
+            Bloom filter file under 'local.bloom_file'
+
+    Returns:
+        (BloomFilter): memory-mapped Bloom filter, or None if no Bloom filter
+            file is configured
+    """
+
+    path = properties.get("local.bloom_file")
+    if not path:
+        return None
+
+    with bloom_filters_lock:
+        if path not in bloom_filters:
+            bloom_filters[path] = BloomFilter.load(path)
+    return bloom_filters[path]
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Builds sequence catalog and Bloom filter files offline
+
+Metadata objects are read from a local directory tree (e.g. a mirror of the
+datasource metadata objects). Each metadata object contributes one sequence to
+the catalog, under its canonical id (the checksum objects are stored under on
+the datasource), with its md5, trunc512, and ga4gh identifier, and any
+metadata aliases, as aliases. Bloom filters of known sequence ids are built
+from a list of sequence ids.
+"""
+
+import click
+import json
+import os
+import sys
+from ga4gh.refget.catalog.bloom import BloomFilter
+from ga4gh.refget.catalog.catalog import CATALOG_MAGIC, HEADER, \
+    SEQUENCE_RECORD, ALIAS_RECORD, encode_id, get_ga4gh_identifier
+from ga4gh.refget.config.logger import logger
+
+def get_aliases(metadata):
+    """Get all aliases of a sequence from its metadata object
+
+    Arguments:
+        metadata (dict): 'metadata' section of a sequence metadata object
+
+    Returns:
+        (list): md5, trunc512, ga4gh identifier, and metadata aliases
+    """
+
+    aliases = [metadata.get("md5"), metadata.get("trunc512")]
+    if metadata.get("trunc512"):
+        aliases.append(get_ga4gh_identifier(metadata["trunc512"]))
+    for alias in metadata.get("aliases") or []:
+        aliases.append(alias.get("alias") if isinstance(alias, dict) \
+            else alias)
+    return [alias for alias in aliases if alias]
+
+def iter_metadata(metadata_dir):
+    """Iterate over all sequence metadata objects in a directory tree
+
+    Files that are not sequence metadata objects are skipped
+
+    Arguments:
+        metadata_dir (str): root directory of metadata objects
+
+    Returns:
+        (generator): 'metadata' sections of sequence metadata objects
+    """
+
+    for dirpath, dirnames, filenames in os.walk(metadata_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            try:
+                with open(os.path.join(dirpath, filename), "r") as fh:
+                    metadata = json.load(fh)["metadata"]
+                int(metadata["length"])
+            except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+                continue
+            yield metadata
+
+def build_catalog(metadata_objects, output_file, canonical="trunc512"):
+    """Write a sequence catalog file from sequence metadata objects
+
+    Arguments:
+        metadata_objects (iterable): 'metadata' sections of sequence metadata
+            objects
+        output_file (str): path to output catalog file
+        canonical (str): 'md5' or 'trunc512', checksum objects are stored
+            under on the datasource
+
+    Returns:
+        (list): number of sequences, and number of aliases written
+    """
+
+    sequences = {}
+    aliases = {}
+    for metadata in metadata_objects:
+        seqid = metadata.get(canonical)
+        if encode_id(seqid) is None:
+            continue
+        sequences[seqid] = int(metadata["length"])
+        for alias in get_aliases(metadata):
+            if encode_id(alias) is not None:
+                aliases[alias] = seqid
+
+    seqids = sorted(sequences.keys())
+    indexes = {seqid: index for index, seqid in enumerate(seqids)}
+    alias_keys = sorted(aliases.keys(), key=encode_id)
+
+    with open(output_file, "wb") as fh:
+        fh.write(HEADER.pack(CATALOG_MAGIC, len(seqids), len(alias_keys)))
+        for seqid in seqids:
+            fh.write(SEQUENCE_RECORD.pack(encode_id(seqid), sequences[seqid]))
+        for alias in alias_keys:
+            fh.write(ALIAS_RECORD.pack(encode_id(alias),
+                                       indexes[aliases[alias]]))
+    return [len(seqids), len(alias_keys)]
+
+@click.command()
+@click.option('--metadata-dir', required=True,
+              type=click.Path(exists=True, file_okay=False),
+              help='Root directory of sequence metadata objects')
+@click.option('--output', required=True, type=click.Path(),
+              help='Path to output catalog file')
+@click.option('--canonical', type=click.Choice(["trunc512", "md5"]),
+              default="trunc512",
+              help='Checksum sequence objects are stored under on the '
+                   + 'datasource')
+def run_builder(**kwargs):
+    """Build a sequence catalog file from sequence metadata objects
+
+    Arguments:
+        kwargs (dict): dictionary of commandline options
+    """
+
+    n_sequences, n_aliases = build_catalog(
+        iter_metadata(kwargs["metadata_dir"]), kwargs["output"],
+        canonical=kwargs["canonical"])
+    logger.info("wrote %d sequences, %d aliases to %s" % (
+        n_sequences, n_aliases, kwargs["output"]))
+    if n_sequences == 0:
+        sys.exit(1)
+
+@click.command()
+@click.option('--ids-file', required=True,
+              type=click.Path(exists=True, dir_okay=False),
+              help='File of known sequence ids, one per line')
+@click.option('--output', required=True, type=click.Path(),
+              help='Path to output Bloom filter file')
+@click.option('--error-rate', type=float, default=0.001,
+              help='Target false positive rate')
+def run_bloom_builder(**kwargs):
+    """Build a Bloom filter file of known sequence ids
+
+    Arguments:
+        kwargs (dict): dictionary of commandline options
+    """
+
+    with open(kwargs["ids_file"], "r") as fh:
+        seqids = set(line.strip() for line in fh if line.strip())
+
+    bloom_filter = BloomFilter.for_capacity(len(seqids), kwargs["error_rate"])
+    for seqid in seqids:
+        bloom_filter.add(seqid)
+    bloom_filter.save(kwargs["output"])
+    logger.info("wrote %d sequence ids to %s (%d bits, %d hash functions)" % (
+        len(seqids), kwargs["output"], bloom_filter.n_bits,
+        bloom_filter.n_hashes))
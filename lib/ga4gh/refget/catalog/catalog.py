@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""Memory-mapped sequence catalog, mapping sequence aliases to sequences
+
+A sequence catalog is a compact binary file, built offline from sequence
+metadata objects (see ga4gh.refget.catalog.builder). It maps every alias of a
+sequence (md5, trunc512, ga4gh identifier, and any metadata aliases) to the
+canonical sequence id (the id objects are stored under on the datasource) and
+the sequence length, so that requested sequence ids can be resolved and
+subsequence ranges validated without any upstream requests.
+
+The catalog file is laid out as:
+    header: magic (8 bytes), number of sequences (uint32), number of aliases
+        (uint32)
+    sequence table: canonical id (48 bytes, null-padded ascii) and length
+        (uint64) per sequence
+    alias table: alias (48 bytes, null-padded ascii) and sequence table index
+        (uint32) per alias, sorted by alias
+
+All integers are little-endian. The file is memory-mapped, and aliases are
+looked up by binary search of the alias table.
+"""
+
+import base64
+import mmap
+import struct
+import threading
+from ga4gh.refget.config.exceptions import RefgetCatalogException
+
+CATALOG_MAGIC = b"RGCAT001"
+"""Magic bytes identifying a sequence catalog file, and its format version"""
+
+HEADER = struct.Struct("<8sII")
+"""Catalog header: magic, number of sequences, number of aliases"""
+
+SEQUENCE_RECORD = struct.Struct("<48sQ")
+"""Sequence table record: canonical id, sequence length"""
+
+ALIAS_RECORD = struct.Struct("<48sI")
+"""Alias table record: alias, sequence table index"""
+
+ID_WIDTH = 48
+"""Maximum length of catalog ids and aliases"""
+
+GA4GH_PREFIX = "ga4gh:SQ."
+"""Prefix of ga4gh sequence identifiers"""
+
+catalogs = {}
+"""Process-wide memory-mapped sequence catalogs, by catalog file path"""
+
+catalogs_lock = threading.Lock()
+"""Lock guarding loading of process-wide sequence catalogs"""
+
+def get_ga4gh_identifier(trunc512):
+    """Derive the ga4gh sequence identifier from a trunc512 checksum
+
+    Both are representations of the same truncated (24 byte) SHA-512 digest,
+    the trunc512 checksum as hex, the ga4gh identifier as base64url
+
+    Arguments:
+        trunc512 (str): trunc512 checksum (48 hex characters)
+
+    Returns:
+        (str): ga4gh sequence identifier, e.g. 'ga4gh:SQ.<base64url digest>'
+    """
+
+    digest = bytes.fromhex(trunc512)
+    return GA4GH_PREFIX + base64.urlsafe_b64encode(digest).decode("ascii")
+
+def encode_id(seqid):
+    """Encode a sequence id or alias as a fixed-width catalog field
+
+    Arguments:
+        seqid (str): sequence id or alias
+
+    Returns:
+        (bytes): null-padded ascii id, or None if the id cannot be stored in
+            the catalog (non-ascii, or longer than ID_WIDTH)
+    """
+
+    try:
+        encoded = seqid.encode("ascii")
+    except (AttributeError, UnicodeEncodeError):
+        return None
+    if not encoded or len(encoded) > ID_WIDTH:
+        return None
+    return encoded.ljust(ID_WIDTH, b"\0")
+
+class Catalog(object):
+    """Memory-mapped sequence catalog
+
+    Attributes:
+        path (str): path to catalog file
+        mapped (mmap.mmap): memory-mapped catalog file
+        n_sequences (int): number of sequences in the catalog
+        n_aliases (int): number of aliases in the catalog
+        alias_offset (int): byte offset of the alias table
+    """
+
+    def __init__(self, path):
+        """Catalog constructor
+
+        Arguments:
+            path (str): path to catalog file
+
+        Raises:
+            RefgetCatalogException: when the file does not exist, or is not a
+                sequence catalog
+        """
+
+        self.path = path
+        try:
+            with open(path, "rb") as fh:
+                self.mapped = mmap.mmap(fh.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            raise RefgetCatalogException(
+                "catalog file could not be read: " + path)
+
+        if len(self.mapped) < HEADER.size:
+            raise RefgetCatalogException("not a sequence catalog: " + path)
+        magic, self.n_sequences, self.n_aliases = \
+            HEADER.unpack_from(self.mapped, 0)
+        self.alias_offset = HEADER.size \
+            + self.n_sequences * SEQUENCE_RECORD.size
+        if magic != CATALOG_MAGIC or len(self.mapped) != \
+            self.alias_offset + self.n_aliases * ALIAS_RECORD.size:
+            raise RefgetCatalogException("not a sequence catalog: " + path)
+
+    def get_alias_key(self, index):
+        """Get an alias from the alias table
+
+        Arguments:
+            index (int): alias table index
+
+        Returns:
+            (bytes): null-padded alias
+        """
+
+        offset = self.alias_offset + index * ALIAS_RECORD.size
+        return self.mapped[offset:offset + ID_WIDTH]
+
+    def get_sequence(self, index):
+        """Get a sequence from the sequence table
+
+        Arguments:
+            index (int): sequence table index
+
+        Returns:
+            (list): canonical sequence id, and sequence length
+        """
+
+        seqid, length = SEQUENCE_RECORD.unpack_from(
+            self.mapped, HEADER.size + index * SEQUENCE_RECORD.size)
+        return [seqid.rstrip(b"\0").decode("ascii"), length]
+
+    def lookup(self, alias):
+        """Look up a sequence by any of its aliases
+
+        Arguments:
+            alias (str): sequence id or alias
+
+        Returns:
+            (list): canonical sequence id, and sequence length, or None if the
+                alias is not in the catalog
+        """
+
+        key = encode_id(alias)
+        if key is None:
+            return None
+
+        low, high = 0, self.n_aliases
+        while low < high:
+            mid = (low + high) // 2
+            if self.get_alias_key(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+
+        if low == self.n_aliases or self.get_alias_key(low) != key:
+            return None
+        alias_key, index = ALIAS_RECORD.unpack_from(
+            self.mapped, self.alias_offset + low * ALIAS_RECORD.size)
+        return self.get_sequence(index)
+
+def get_catalog(properties):
+    """Get the process-wide sequence catalog
+
+    Arguments:
+        properties (Properties): runtime properties, containing the path to the
+            catalog file under 'local.catalog_file'
+
+    Returns:
+        (Catalog): memory-mapped sequence catalog, or None if no catalog file
+            is configured
+    """
+
+    path = properties.get("local.catalog_file")
+    if not path:
+        return None
+
+    with catalogs_lock:
+        if path not in catalogs:
+            catalogs[path] = Catalog(path)
+    return catalogs[path]
+
+def resolve_seqid(properties, seqid):
+    """Resolve a requested sequence id to the canonical sequence id
+
+    Arguments:
+        properties (Properties): runtime properties
+        seqid (str): requested sequence id or alias
+
+    Returns:
+        (str): canonical sequence id, the requested id if no catalog is
+            configured, or None if the id is not in the catalog
+    """
+
+    catalog = get_catalog(properties)
+    if catalog is None:
+        return seqid
+    entry = catalog.lookup(seqid)
+    return entry[0] if entry else None
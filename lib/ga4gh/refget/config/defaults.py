@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 """Default values for modifiable server properties"""
 
+DEFAULT_SOURCE_TYPE = "http"
+"""Refget server requests objects from an http(s) object store by default"""
+
 DEFAULT_SOURCE_BASE_URL = "http://insdc-mirror.s3-website-us-west-2.amazonaws.com"
 """Refget server points to INSDC AWS S3 bucket by default"""
 
@@ -10,26 +13,229 @@ DEFAULT_SOURCE_SEQUENCE_PATH = "/sequence/{seqid}"
 DEFAULT_SOURCE_METADATA_PATH = "/metadata/json/{seqid}.json"
 """Refget server resolves metadata requests to specified dir in S3 bucket"""
 
+DEFAULT_SOURCE_FORMAT = "plain"
+"""By default, sequence objects are stored as plain text, one byte per base"""
+
+DEFAULT_SOURCE_S3_BUCKET = None
+"""By default, no S3 bucket, required by the s3 datasource"""
+
+DEFAULT_SOURCE_S3_REGION = None
+"""By default, the S3 bucket region is taken from the AWS configuration"""
+
+DEFAULT_SOURCE_S3_ENDPOINT_URL = None
+"""By default, the s3 datasource calls the AWS S3 endpoint of the region"""
+
+DEFAULT_SOURCE_S3_PRESIGN_TTL = 3600
+"""Default time (in seconds) presigned S3 urls clients are redirected to are
+valid for"""
+
+DEFAULT_SOURCE_S3_PART_SIZE = 8388608
+"""Default size (in bytes) above which S3 subsequences are fetched as parts"""
+
+DEFAULT_SOURCE_S3_PART_CONCURRENCY = 8
+"""Default maximum number of S3 subsequence parts fetched in parallel"""
+
+DEFAULT_SOURCE_POOL_CONNECTIONS = 10
+"""Default number of per-host connection pools kept to the datasource"""
+
+DEFAULT_SOURCE_POOL_MAXSIZE = 64
+"""Default maximum number of keep-alive connections kept to a datasource host"""
+
+DEFAULT_CACHE_METADATA_SIZE = 4096
+"""Default maximum number of metadata objects cached per process"""
+
+DEFAULT_CACHE_METADATA_TTL = 0
+"""By default, cached metadata objects never expire"""
+
+DEFAULT_CACHE_SEQUENCE_BYTES = 67108864
+"""Default maximum total size (in bytes) of sequence blocks cached per process"""
+
+DEFAULT_CACHE_SEQUENCE_BLOCK_SIZE = 65536
+"""Default size (in bases) of cached sequence blocks"""
+
+DEFAULT_CACHE_NEGATIVE_SIZE = 65536
+"""Default maximum number of not found sequence ids cached per process"""
+
+DEFAULT_CACHE_NEGATIVE_TTL = 300
+"""Default time-to-live (in seconds) of cached not found sequence ids"""
+
+DEFAULT_CACHE_PINNED_BYTES = 0
+"""By default, no sequences are pinned in memory"""
+
+DEFAULT_CACHE_PIN_MAX_LENGTH = 1048576
+"""Default maximum length (in bases) of warm-up sequences pinned in memory"""
+
+DEFAULT_CACHE_MEMORY_FRACTION = 0.25
+"""Default fraction of AWS lambda function memory used for caches"""
+
 DEFAULT_SERVER_PORT = 8888
 """Default port server runs on"""
 
+DEFAULT_SERVER_WORKERS = 1
+"""By default, server runs in a single process"""
+
+DEFAULT_SERVER_IO_THREADS = 64
+"""Default maximum number of threads performing upstream requests per process"""
+
+DEFAULT_SERVER_METADATA_MODE = "redirect"
+"""By default, metadata requests are redirected to the datasource"""
+
+DEFAULT_SERVER_RANGE_MODE = "redirect"
+"""By default, large 'Range' header requests are redirected to the datasource"""
+
+DEFAULT_SERVER_PROXY_SEQUENCE_MAX_LENGTH = 65536
+"""Default maximum length of full sequences proxied rather than redirected"""
+
+DEFAULT_SERVER_PROXY_RANGE_MAX_LENGTH = 65536
+"""Default maximum number of bases proxied by 'Range' requests, rather than
+redirected"""
+
+DEFAULT_SERVER_SUBSEQUENCE_LIMIT = 300000
+"""Default maximum length of subsequences requested by start/end"""
+
+DEFAULT_SERVER_MAX_UPSTREAM_FETCHES = 32
+"""Default maximum number of concurrent proxied upstream fetches per process"""
+
+DEFAULT_SERVER_MAX_INFLIGHT_BYTES = 134217728
+"""Default maximum total size (in bytes) of proxied subsequences read in full
+per process"""
+
+DEFAULT_SERVER_RETRY_AFTER = 1
+"""Default delay (in seconds) clients are asked to wait before retrying
+requests rejected by admission control"""
+
+DEFAULT_SERVER_CACHE_MAX_AGE = 31536000
+"""Default time (in seconds) clients and CDNs may cache responses for"""
+
+DEFAULT_SERVER_CACHE_MAX_AGE_MUTABLE = 3600
+"""Default maximum time (in seconds) responses that may change (service info)
+may be cached for"""
+
+DEFAULT_SERVER_WARMUP_REFRESH_INTERVAL = 300
+"""Default interval (in seconds) between background warm-up refreshes"""
+
+DEFAULT_SERVER_STREAM_THRESHOLD = 1048576
+"""Default subsequence size (in bases) above which subsequences are streamed"""
+
+DEFAULT_SERVER_BATCH_MAX_SIZE = 1000
+"""Default maximum number of subsequences requested in a single batch"""
+
+DEFAULT_SERVER_BATCH_CONCURRENCY = 16
+"""Default maximum number of concurrent upstream requests per batch process"""
+
+DEFAULT_SERVER_COMPRESSION_ENCODINGS = "br,zstd,gzip"
+"""Default content encodings offered to clients, most preferred first"""
+
+DEFAULT_SERVER_COMPRESSION_MIN_SIZE = 1024
+"""Default minimum response body size (in bytes) that is compressed"""
+
 DEFAULT_LOCAL_OPENAPI_FILE = None
 """By default, no openapi file provided, server will not serve Swagger UI"""
 
+DEFAULT_LOCAL_CATALOG_FILE = None
+"""By default, no sequence catalog, ids and lengths are resolved upstream"""
+
+DEFAULT_LOCAL_BLOOM_FILE = None
+"""By default, no Bloom filter of known sequence ids"""
+
+DEFAULT_LOCAL_WARMUP_FILE = None
+"""By default, no warm-up list, caches are populated by requests only"""
+
 DEFAULT_ALLOWED_PROPERTY_KEYS = {
+    "source.type",
     "source.base_url",
     "source.sequence_path",
     "source.metadata_path",
+    "source.format",
+    "source.s3_bucket",
+    "source.s3_region",
+    "source.s3_endpoint_url",
+    "source.s3_presign_ttl",
+    "source.s3_part_size",
+    "source.s3_part_concurrency",
+    "source.pool_connections",
+    "source.pool_maxsize",
+    "cache.metadata_size",
+    "cache.metadata_ttl",
+    "cache.sequence_bytes",
+    "cache.sequence_block_size",
+    "cache.negative_size",
+    "cache.negative_ttl",
+    "cache.pinned_bytes",
+    "cache.pin_max_length",
+    "cache.memory_fraction",
     "server.port",
-    "local.openapi_file"
+    "server.workers",
+    "server.io_threads",
+    "server.metadata_mode",
+    "server.range_mode",
+    "server.proxy_sequence_max_length",
+    "server.proxy_range_max_length",
+    "server.subsequence_limit",
+    "server.max_upstream_fetches",
+    "server.max_inflight_bytes",
+    "server.retry_after",
+    "server.cache_max_age",
+    "server.cache_max_age_mutable",
+    "server.warmup_refresh_interval",
+    "server.stream_threshold",
+    "server.batch_max_size",
+    "server.batch_concurrency",
+    "server.compression_encodings",
+    "server.compression_min_size",
+    "local.openapi_file",
+    "local.catalog_file",
+    "local.bloom_file",
+    "local.warmup_file"
 }
 """Allowed modifiable properties in properties file"""
 
 DEFAULT_PROPERTIES = {
+    "source.type": DEFAULT_SOURCE_TYPE,
     "source.base_url": DEFAULT_SOURCE_BASE_URL,
     "source.sequence_path": DEFAULT_SOURCE_SEQUENCE_PATH,
     "source.metadata_path": DEFAULT_SOURCE_METADATA_PATH,
+    "source.format": DEFAULT_SOURCE_FORMAT,
+    "source.s3_bucket": DEFAULT_SOURCE_S3_BUCKET,
+    "source.s3_region": DEFAULT_SOURCE_S3_REGION,
+    "source.s3_endpoint_url": DEFAULT_SOURCE_S3_ENDPOINT_URL,
+    "source.s3_presign_ttl": DEFAULT_SOURCE_S3_PRESIGN_TTL,
+    "source.s3_part_size": DEFAULT_SOURCE_S3_PART_SIZE,
+    "source.s3_part_concurrency": DEFAULT_SOURCE_S3_PART_CONCURRENCY,
+    "source.pool_connections": DEFAULT_SOURCE_POOL_CONNECTIONS,
+    "source.pool_maxsize": DEFAULT_SOURCE_POOL_MAXSIZE,
+    "cache.metadata_size": DEFAULT_CACHE_METADATA_SIZE,
+    "cache.metadata_ttl": DEFAULT_CACHE_METADATA_TTL,
+    "cache.sequence_bytes": DEFAULT_CACHE_SEQUENCE_BYTES,
+    "cache.sequence_block_size": DEFAULT_CACHE_SEQUENCE_BLOCK_SIZE,
+    "cache.negative_size": DEFAULT_CACHE_NEGATIVE_SIZE,
+    "cache.negative_ttl": DEFAULT_CACHE_NEGATIVE_TTL,
+    "cache.pinned_bytes": DEFAULT_CACHE_PINNED_BYTES,
+    "cache.pin_max_length": DEFAULT_CACHE_PIN_MAX_LENGTH,
+    "cache.memory_fraction": DEFAULT_CACHE_MEMORY_FRACTION,
     "server.port": DEFAULT_SERVER_PORT,
-    "local.openapi_file": DEFAULT_LOCAL_OPENAPI_FILE
+    "server.workers": DEFAULT_SERVER_WORKERS,
+    "server.io_threads": DEFAULT_SERVER_IO_THREADS,
+    "server.metadata_mode": DEFAULT_SERVER_METADATA_MODE,
+    "server.range_mode": DEFAULT_SERVER_RANGE_MODE,
+    "server.proxy_sequence_max_length":
+        DEFAULT_SERVER_PROXY_SEQUENCE_MAX_LENGTH,
+    "server.proxy_range_max_length": DEFAULT_SERVER_PROXY_RANGE_MAX_LENGTH,
+    "server.subsequence_limit": DEFAULT_SERVER_SUBSEQUENCE_LIMIT,
+    "server.max_upstream_fetches": DEFAULT_SERVER_MAX_UPSTREAM_FETCHES,
+    "server.max_inflight_bytes": DEFAULT_SERVER_MAX_INFLIGHT_BYTES,
+    "server.retry_after": DEFAULT_SERVER_RETRY_AFTER,
+    "server.cache_max_age": DEFAULT_SERVER_CACHE_MAX_AGE,
+    "server.cache_max_age_mutable": DEFAULT_SERVER_CACHE_MAX_AGE_MUTABLE,
+    "server.warmup_refresh_interval": DEFAULT_SERVER_WARMUP_REFRESH_INTERVAL,
+    "server.stream_threshold": DEFAULT_SERVER_STREAM_THRESHOLD,
+    "server.batch_max_size": DEFAULT_SERVER_BATCH_MAX_SIZE,
+    "server.batch_concurrency": DEFAULT_SERVER_BATCH_CONCURRENCY,
+    "server.compression_encodings": DEFAULT_SERVER_COMPRESSION_ENCODINGS,
+    "server.compression_min_size": DEFAULT_SERVER_COMPRESSION_MIN_SIZE,
+    "local.openapi_file": DEFAULT_LOCAL_OPENAPI_FILE,
+    "local.catalog_file": DEFAULT_LOCAL_CATALOG_FILE,
+    "local.bloom_file": DEFAULT_LOCAL_BLOOM_FILE,
+    "local.warmup_file": DEFAULT_LOCAL_WARMUP_FILE
 }
 """Default properties for each property key"""
\ No newline at end of file
@@ -114,3 +114,54 @@ class RefgetOpenApiNotFoundException(RefgetException):
 
         super(RefgetOpenApiNotFoundException, self).__init__(msg)
         self.exit_code = 5
+
+class RefgetCatalogException(RefgetException):
+    """Exception for when the sequence catalog file is missing or invalid
+
+    Attributes:
+        exit_code (int): exception exit code
+    """
+
+    def __init__(self, msg):
+        """RefgetCatalogException constructor
+        
+        Arguments:
+            msg (str): exception message
+        """
+
+        super(RefgetCatalogException, self).__init__(msg)
+        self.exit_code = 6
+
+class RefgetOverloadedException(RefgetException):
+    """Exception for when a proxied request exceeds the admission limits
+
+    Attributes:
+        exit_code (int): exception exit code
+    """
+
+    def __init__(self, msg):
+        """RefgetOverloadedException constructor
+
+        Arguments:
+            msg (str): exception message
+        """
+
+        super(RefgetOverloadedException, self).__init__(msg)
+        self.exit_code = 7
+
+class RefgetWarmupException(RefgetException):
+    """Exception for when the warm-up list file is missing or unreadable
+
+    Attributes:
+        exit_code (int): exception exit code
+    """
+
+    def __init__(self, msg):
+        """RefgetWarmupException constructor
+
+        Arguments:
+            msg (str): exception message
+        """
+
+        super(RefgetWarmupException, self).__init__(msg)
+        self.exit_code = 8
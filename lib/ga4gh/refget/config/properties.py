@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """Container for modifiable runtime properties"""
 
-import copy
 import os
 from ga4gh.refget.config.defaults import \
     DEFAULT_PROPERTIES, DEFAULT_ALLOWED_PROPERTY_KEYS
@@ -22,7 +21,8 @@ class Properties(object):
     def __init__(self, new_props):
         """Properties constructor
 
-        The properties dictionary is initialized as all defaults. Each 
+        The properties dictionary is initialized as all defaults (default
+        values are immutable, so a shallow copy suffices). Each 
         element in the passed dictionary overwrites the corresponding default
         property.
 
@@ -30,7 +30,7 @@ class Properties(object):
             new_props (dict): dictionary of new properties
         """
 
-        self.properties = copy.deepcopy(DEFAULT_PROPERTIES)
+        self.properties = dict(DEFAULT_PROPERTIES)
         self.__setup(new_props)
     
     def __setup(self, new_props):
@@ -7,4 +7,5 @@ SERVICE_INFO = {
     "subsequence_limit": 300000,
     "supported_api_versions": ["1.0"]
 }
-"""Refget Service Info Dictionary"""
+"""Refget Service Info Dictionary, the subsequence limit is replaced by the
+'server.subsequence_limit' property"""
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""Datasource admitting subsequence fetches within process-wide limits
+
+Subsequence fetches that require upstream requests are admitted by the
+process-wide admission controller (see ga4gh.refget.util.admission_control)
+before they are passed to the wrapped datasource, and rejected if the server
+is overloaded. Subsequences read in full count their size against the in-flight
+byte limit until they are returned. Streamed subsequences only hold a small
+buffer, so they count against the concurrent fetch limit only, until the
+stream is exhausted or closed. Subsequences served entirely from cache, urls,
+and metadata are passed through without admission.
+"""
+
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.util.admission_control import get_admission_controller
+
+class AdmittedStream(object):
+    """Subsequence stream, releasing its admitted fetch once exhausted or
+    closed
+
+    Attributes:
+        stream (iterable): wrapped subsequence bytes chunks
+        chunks (iterator): iterator over wrapped stream
+        admission (AdmissionController): controller the fetch was admitted by
+        released (bool): whether the fetch has been released
+    """
+
+    def __init__(self, stream, admission):
+        """AdmittedStream constructor
+
+        Arguments:
+            stream (iterable): wrapped subsequence bytes chunks
+            admission (AdmissionController): controller the fetch was
+                admitted by
+        """
+
+        self.stream = stream
+        self.chunks = iter(stream)
+        self.admission = admission
+        self.released = False
+
+    def __iter__(self):
+        """Get the stream iterator
+
+        Returns:
+            (AdmittedStream): this stream
+        """
+
+        return self
+
+    def __next__(self):
+        """Get the next chunk of the wrapped stream
+
+        Returns:
+            (bytes): subsequence bytes chunk
+        """
+
+        try:
+            return next(self.chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Close the wrapped stream, and release the admitted fetch once"""
+
+        if self.released:
+            return
+        self.released = True
+        try:
+            for stream in [self.chunks, self.stream]:
+                if hasattr(stream, "close"):
+                    stream.close()
+        finally:
+            self.admission.release(0)
+
+class AdmittedDataSource(DataSource):
+    """Datasource admitting subsequence fetches of a wrapped datasource
+
+    Attributes:
+        datasource (DataSource): wrapped datasource
+        admission (AdmissionController): process-wide admission controller
+    """
+
+    def __init__(self, properties, datasource):
+        """AdmittedDataSource constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+            datasource (DataSource): wrapped datasource
+        """
+
+        super(AdmittedDataSource, self).__init__(properties)
+        self.datasource = datasource
+        self.admission = get_admission_controller(properties)
+
+    def get_sequence_url(self, seqid):
+        """Get the sequence url of the wrapped datasource"""
+
+        return self.datasource.get_sequence_url(seqid)
+
+    def get_metadata_url(self, seqid):
+        """Get the metadata url of the wrapped datasource"""
+
+        return self.datasource.get_metadata_url(seqid)
+
+    def get_url_ttl(self):
+        """Get the url time-to-live of the wrapped datasource"""
+
+        return self.datasource.get_url_ttl()
+
+    def get_metadata(self, seqid):
+        """Get a metadata object from the wrapped datasource"""
+
+        return self.datasource.get_metadata(seqid)
+
+    def is_cached(self, seqid, start, end):
+        """Check whether a subsequence is cached by the wrapped datasource"""
+
+        return self.datasource.is_cached(seqid, start, end)
+
+    def is_pinned(self, seqid):
+        """Check whether a sequence is pinned by the wrapped datasource"""
+
+        return self.datasource.is_pinned(seqid)
+
+    def pin_sequence(self, seqid, length):
+        """Pin a sequence in the wrapped datasource, without admission
+
+        Sequences are pinned during warm-up and background refresh only, one
+        sequence per warm-up thread, rather than on behalf of clients
+        """
+
+        return self.datasource.pin_sequence(seqid, length)
+
+    def get_subsequence(self, seqid, start, end):
+        """Get a subsequence from the wrapped datasource, once admitted
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence, or None if the sequence could not be
+                retrieved
+
+        Raises:
+            RefgetOverloadedException: when the fetch is not admitted
+        """
+
+        if self.datasource.is_cached(seqid, start, end):
+            return self.datasource.get_subsequence(seqid, start, end)
+
+        n_bytes = 0 if end is None else max(end - start, 0)
+        self.admission.acquire(n_bytes)
+        try:
+            return self.datasource.get_subsequence(seqid, start, end)
+        finally:
+            self.admission.release(n_bytes)
+
+    def stream_subsequence(self, seqid, start, end):
+        """Stream a subsequence from the wrapped datasource, once admitted
+
+        Subsequences served from memory (pinned, or entirely cached) are
+        streamed without admission, as for get_subsequence
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (iterable): subsequence bytes chunks (an AdmittedStream, unless
+                served from memory), or None if the sequence could not be
+                retrieved
+
+        Raises:
+            RefgetOverloadedException: when the fetch is not admitted
+        """
+
+        if self.datasource.is_cached(seqid, start, end):
+            return self.datasource.stream_subsequence(seqid, start, end)
+
+        self.admission.acquire(0)
+        try:
+            stream = self.datasource.stream_subsequence(seqid, start, end)
+        except Exception:
+            self.admission.release(0)
+            raise
+        if stream is None:
+            self.admission.release(0)
+            return None
+        return AdmittedStream(stream, self.admission)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Generic datasource representation, serving sequence and metadata objects"""
+
+class DataSource(object):
+    """Generic datasource, serving sequence and metadata objects
+
+    Attributes:
+        properties (Properties): runtime properties
+    """
+
+    def __init__(self, properties):
+        """DataSource constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+        """
+
+        self.properties = properties
+
+    def get_sequence_url(self, seqid):
+        """Get the url clients may be redirected to for a sequence
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (str): sequence url, or None if clients cannot be redirected
+        """
+
+        return None
+
+    def get_metadata_url(self, seqid):
+        """Get the url clients may be redirected to for sequence metadata
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (str): metadata url, or None if clients cannot be redirected
+        """
+
+        return None
+
+    def get_url_ttl(self):
+        """Get the time urls clients are redirected to remain valid for
+
+        Returns:
+            (int): time (in seconds) urls are valid for, or None if urls never
+                expire
+        """
+
+        return None
+
+    def get_metadata(self, seqid):
+        """Get a sequence metadata object from the datasource
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (list): HTTP status code of the lookup, and the parsed metadata
+                object (or None if the lookup was unsuccessful)
+        """
+
+        raise NotImplementedError()
+
+    def is_cached(self, seqid, start, end):
+        """Check whether a subsequence is served without upstream requests
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (bool): True if the subsequence is held in a cache
+        """
+
+        return False
+
+    def is_pinned(self, seqid):
+        """Check whether a sequence is pinned in memory in full
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (bool): True if the sequence is pinned
+        """
+
+        return False
+
+    def pin_sequence(self, seqid, length):
+        """Read a complete sequence from the datasource, and pin it in memory
+
+        Arguments:
+            seqid (str): sequence (checksum identifier) to pin
+            length (int): sequence length
+
+        Returns:
+            (bool): True if the sequence is pinned, False if the datasource
+                does not pin sequences, or the sequence could not be pinned
+        """
+
+        return False
+
+    def get_subsequence(self, seqid, start, end):
+        """Get a subsequence from the datasource
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence, or None if the sequence could not be
+                retrieved
+        """
+
+        raise NotImplementedError()
+
+    def stream_subsequence(self, seqid, start, end):
+        """Get a subsequence from the datasource, as a stream of chunks
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (iterable): subsequence bytes chunks, or None if the sequence could
+                not be retrieved
+        """
+
+        raise NotImplementedError()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""Datasource assembling subsequences from a process-wide block cache
+
+Sequences are divided into fixed-size, block-aligned chunks. Requested
+subsequences are assembled from cached blocks, and only missing blocks are
+requested from the underlying datasource (contiguous missing blocks in a single
+request). Blocks are cached by (seqid, block index) in a process-wide cache,
+bounded by total bytes, evicting least recently used blocks first.
+"""
+
+import threading
+from ga4gh.refget.cache.lru import LRUCache
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.datasource.pinned_source import iter_chunks
+
+block_caches = {}
+"""Process-wide sequence block caches, by cache size in bytes"""
+
+block_caches_lock = threading.Lock()
+"""Lock guarding creation of process-wide sequence block caches"""
+
+def get_block_cache(properties):
+    """Get the process-wide sequence block cache
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            total size of cached blocks in bytes under 'cache.sequence_bytes'
+
+    Returns:
+        (LRUCache): sequence block cache, blocks by (seqid, block index)
+    """
+
+    max_bytes = int(properties.get("cache.sequence_bytes"))
+    with block_caches_lock:
+        if max_bytes not in block_caches:
+            block_caches[max_bytes] = LRUCache(max_bytes, sizeof=len)
+        return block_caches[max_bytes]
+
+class CachedDataSource(DataSource):
+    """Datasource assembling subsequences from a process-wide block cache
+
+    Wraps another datasource, which missing blocks are requested from. Urls
+    and metadata are passed through to the wrapped datasource. Streamed
+    subsequences are served from cache if every block is cached, and are
+    otherwise passed through uncached, so that large streamed subsequences do
+    not evict frequently requested blocks.
+
+    Attributes:
+        datasource (DataSource): wrapped datasource
+        block_cache (LRUCache): process-wide sequence block cache
+        block_size (int): size of sequence blocks, in bases
+    """
+
+    def __init__(self, properties, datasource):
+        """CachedDataSource constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+            datasource (DataSource): wrapped datasource
+        """
+
+        super(CachedDataSource, self).__init__(properties)
+        self.datasource = datasource
+        self.block_cache = get_block_cache(properties)
+        self.block_size = int(properties.get("cache.sequence_block_size"))
+
+    def get_sequence_url(self, seqid):
+        """Get the sequence url of the wrapped datasource"""
+
+        return self.datasource.get_sequence_url(seqid)
+
+    def get_metadata_url(self, seqid):
+        """Get the metadata url of the wrapped datasource"""
+
+        return self.datasource.get_metadata_url(seqid)
+
+    def get_url_ttl(self):
+        """Get the url time-to-live of the wrapped datasource"""
+
+        return self.datasource.get_url_ttl()
+
+    def get_metadata(self, seqid):
+        """Get a metadata object from the wrapped datasource"""
+
+        return self.datasource.get_metadata(seqid)
+
+    def stream_subsequence(self, seqid, start, end):
+        """Stream a subsequence from cached blocks if every block is cached,
+        otherwise from the wrapped datasource, uncached"""
+
+        if self.is_cached(seqid, start, end):
+            seq = self.get_subsequence(seqid, start, end)
+            if seq is not None:
+                return iter_chunks(seq)
+        return self.datasource.stream_subsequence(seqid, start, end)
+
+    def is_cached(self, seqid, start, end):
+        """Check whether all blocks of a subsequence are cached
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (bool): True if every block covering the subsequence is cached
+        """
+
+        if end is None:
+            return False
+        return all(self.block_cache.contains((seqid, block_index))
+                   for block_index in range(start // self.block_size,
+                                            (end - 1) // self.block_size + 1))
+
+    def get_subsequence(self, seqid, start, end):
+        """Assemble a subsequence from cached blocks
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence, or None if missing blocks could not be
+                retrieved
+        """
+
+        # block boundaries cannot be determined without a known end
+        if end is None:
+            return self.datasource.get_subsequence(seqid, start, end)
+        if end <= start:
+            return ""
+
+        first_block = start // self.block_size
+        last_block = (end - 1) // self.block_size
+        blocks = {}
+        missing = []
+        for block_index in range(first_block, last_block + 1):
+            block = self.block_cache.get((seqid, block_index))
+            if block is None:
+                missing.append(block_index)
+            else:
+                blocks[block_index] = block
+
+        # request each run of contiguous missing blocks from the datasource
+        for run in self.__get_runs(missing):
+            if not self.__fetch_blocks(seqid, run[0], run[-1], blocks):
+                return None
+
+        offset = first_block * self.block_size
+        seq = "".join(blocks.get(i, "")
+                      for i in range(first_block, last_block + 1))
+        return seq[start - offset:end - offset]
+
+    def __get_runs(self, block_indices):
+        """Group sorted block indices into runs of contiguous indices
+
+        Arguments:
+            block_indices (list): sorted block indices
+
+        Returns:
+            (list): lists of contiguous block indices
+        """
+
+        runs = []
+        for block_index in block_indices:
+            if runs and runs[-1][-1] == block_index - 1:
+                runs[-1].append(block_index)
+            else:
+                runs.append([block_index])
+        return runs
+
+    def __fetch_blocks(self, seqid, first_block, last_block, blocks):
+        """Request a run of blocks from the datasource, and cache them
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            first_block (int): index of first block in run
+            last_block (int): index of last block in run
+            blocks (dict): blocks by block index, updated with fetched blocks
+
+        Returns:
+            (bool): True if the blocks were retrieved, otherwise False
+        """
+
+        run_start = first_block * self.block_size
+        run_end = (last_block + 1) * self.block_size
+        seq = self.datasource.get_subsequence(seqid, run_start, run_end)
+        if seq is None:
+            return False
+
+        # the final block of a sequence may be shorter than the block size
+        for block_index in range(first_block, last_block + 1):
+            offset = (block_index - first_block) * self.block_size
+            block = seq[offset:offset + self.block_size]
+            if not block:
+                break
+            blocks[block_index] = block
+            self.block_cache.put((seqid, block_index), block)
+        return True
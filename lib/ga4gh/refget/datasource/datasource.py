@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Selection of the datasource serving refget functions, by property
+
+A datasource serves sequence and metadata objects to refget functions. The
+datasource type is selected by the 'source.type' property:
+    http -> objects are requested from an http(s) object store, under
+        'source.base_url' (default)
+    local -> objects are read from the local filesystem, under the directory
+        'source.base_url' (a 'file://' base url also selects this datasource)
+    s3 -> objects are read from the S3 bucket 'source.s3_bucket' through the
+        S3 API, which may be private (see ga4gh.refget.datasource.s3_source)
+
+Sequence objects are stored in the format selected by the 'source.format'
+property:
+    plain -> one byte per base (default)
+    2bit -> 2-bit packed sequence objects, decoded by the server (see
+        ga4gh.refget.packed.twobit)
+
+Subsequences from remote datasources are served through a block cache if
+'cache.sequence_bytes' is greater than 0. Local files are already held in the
+operating system page cache, so the local datasource is not cached. Sequences
+from remote datasources may also be pinned in memory in full, if
+'cache.pinned_bytes' is greater than 0 (see
+ga4gh.refget.datasource.pinned_source). Subsequence fetches that are not served
+from cache are admitted within the process-wide limits on concurrent fetches
+and in-flight bytes, if either is set (see
+ga4gh.refget.util.admission_control).
+"""
+
+from ga4gh.refget.config.exceptions import RefgetInvalidPropertyException
+from ga4gh.refget.datasource.admitted_source import AdmittedDataSource
+from ga4gh.refget.datasource.cached_source import CachedDataSource
+from ga4gh.refget.datasource.http_source import HttpDataSource
+from ga4gh.refget.datasource.local_source import LocalDataSource
+from ga4gh.refget.datasource.packed_source import PackedDataSource
+from ga4gh.refget.datasource.pinned_source import PinnedDataSource
+from ga4gh.refget.datasource.s3_source import S3DataSource
+
+def get_datasource_type(properties):
+    """Get the datasource type selected by runtime properties
+
+    Arguments:
+        properties (Properties): runtime properties
+
+    Returns:
+        (str): datasource type
+    """
+
+    if properties.get("source.base_url").startswith("file://"):
+        return "local"
+    return properties.get("source.type")
+
+def get_datasource(properties):
+    """Get the datasource selected by runtime properties
+
+    Arguments:
+        properties (Properties): runtime properties
+
+    Returns:
+        (DataSource): datasource serving sequence and metadata objects
+
+    Raises:
+        RefgetInvalidPropertyException: when 'source.type' is not a recognized
+            datasource type (or its requirements are not met), or
+            'source.format' is not a recognized format
+    """
+
+    datasource_classes = {
+        "http": HttpDataSource,
+        "local": LocalDataSource,
+        "s3": S3DataSource
+    }
+
+    source_type = get_datasource_type(properties)
+    if source_type not in datasource_classes:
+        raise RefgetInvalidPropertyException(
+            "unrecognized source.type: " + str(source_type))
+    datasource = datasource_classes[source_type](properties)
+
+    source_format = properties.get("source.format")
+    if source_format == "2bit":
+        datasource = PackedDataSource(properties, datasource)
+    elif source_format != "plain":
+        raise RefgetInvalidPropertyException(
+            "unrecognized source.format: " + str(source_format))
+
+    if source_type != "local" and int(properties.get("cache.sequence_bytes")):
+        datasource = CachedDataSource(properties, datasource)
+    if source_type != "local" and int(properties.get("cache.pinned_bytes")):
+        datasource = PinnedDataSource(properties, datasource)
+
+    if int(properties.get("server.max_upstream_fetches")) \
+        or int(properties.get("server.max_inflight_bytes")):
+        datasource = AdmittedDataSource(properties, datasource)
+    return datasource
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Datasource serving objects from an http(s) object store"""
+
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.datasource.upstream import get_metadata, \
+    get_subsequence, stream_subsequence
+from ga4gh.refget.util.resolve_url import resolve_sequence_url, \
+    resolve_metadata_url
+
+class HttpDataSource(DataSource):
+    """Datasource serving objects from an http(s) object store
+
+    Objects are requested from urls resolved from 'source.base_url' and the
+    sequence/metadata path templates. Clients may be redirected to these urls.
+    """
+
+    def get_sequence_url(self, seqid):
+        """Get the object store url of a sequence
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (str): sequence url
+        """
+
+        return resolve_sequence_url(self.properties, seqid)
+
+    def get_metadata_url(self, seqid):
+        """Get the object store url of sequence metadata
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (str): metadata url
+        """
+
+        return resolve_metadata_url(self.properties, seqid)
+
+    def get_metadata(self, seqid):
+        """Request a sequence metadata object from the object store
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (list): HTTP status code of the request, and the parsed metadata
+                object (or None if the request was unsuccessful)
+        """
+
+        return get_metadata(self.properties, self.get_metadata_url(seqid))
+
+    def get_subsequence(self, seqid, start, end):
+        """Request a subsequence from the object store by byte range
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence, or None if the sequence could not be
+                retrieved
+        """
+
+        url = self.get_sequence_url(seqid)
+        return get_subsequence(self.properties, url, start, end)
+
+    def stream_subsequence(self, seqid, start, end):
+        """Request a subsequence from the object store by byte range, streamed
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (iterable): subsequence bytes chunks, or None if the sequence could
+                not be retrieved
+        """
+
+        url = self.get_sequence_url(seqid)
+        return stream_subsequence(self.properties, url, start, end)
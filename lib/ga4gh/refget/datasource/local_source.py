@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Datasource serving objects from the local filesystem
+
+Sequence files are memory-mapped, and kept mapped between requests. Requested
+subsequences are sliced from the mapped file, and streamed subsequences are
+yielded as memoryview slices of the mapping, so sequence bytes are not copied
+before being written to the client. Metadata objects are read from the
+matching local JSON files. Sequence ids that could resolve to a path outside
+the configured directory (containing path separators or '..') are not found.
+Streamed subsequences extending past the end of the sequence file (e.g. if the
+file is shorter than its metadata length) are not found either, rather than
+being truncated below the response's announced length.
+"""
+
+import json
+import mmap
+from ga4gh.refget.cache.lru import LRUCache
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.datasource.upstream import READ_CHUNK_SIZE
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.util.resolve_url import resolve_url
+
+UNSAFE_SEQID_PARTS = ["/", "\\", ".."]
+"""Substrings of sequence ids that could escape the local directory"""
+
+MAPPED_FILES_SIZE = 1024
+"""Maximum number of sequence files kept memory-mapped per process"""
+
+mapped_files = LRUCache(MAPPED_FILES_SIZE)
+"""Process-wide memory-mapped sequence files, by file path. Evicted mappings
+are unmapped once no longer referenced by an in-flight request"""
+
+def map_file(path):
+    """Get a read-only memory mapping of a file
+
+    Arguments:
+        path (str): path to file, or None
+
+    Returns:
+        (mmap.mmap): memory-mapped file contents (or empty bytes for an empty
+            file), or None if no path is given, or the file does not exist
+    """
+
+    if path is None:
+        return None
+    mapped = mapped_files.get(path)
+    if mapped is not None:
+        return mapped
+
+    try:
+        with open(path, "rb") as fh:
+            try:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            # empty files cannot be memory-mapped
+            except ValueError:
+                mapped = b""
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+
+    mapped_files.put(path, mapped)
+    return mapped
+
+class LocalDataSource(DataSource):
+    """Datasource serving objects from the local filesystem
+
+    Objects are read from file paths resolved from 'source.base_url' (a
+    directory, optionally prefixed with 'file://') and the sequence/metadata
+    path templates. Clients cannot be redirected to local files, so sequences
+    and metadata are always returned directly.
+    """
+
+    def get_path(self, seqid, path_type):
+        """Resolve the local file path of a sequence or metadata object
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            path_type (str): 'sequence' or 'metadata'
+
+        Returns:
+            (str): local file path, or None if the sequence id could resolve
+                to a path outside the local directory
+        """
+
+        if any(part in seqid for part in UNSAFE_SEQID_PARTS):
+            return None
+        path = resolve_url(self.properties, seqid, path_type)
+        if path.startswith("file://"):
+            path = path[len("file://"):]
+        return path
+
+    def get_metadata(self, seqid):
+        """Read a sequence metadata object from the local filesystem
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (list): HTTP status code of the lookup, and the parsed metadata
+                object (or None if the metadata file does not exist)
+        """
+
+        path = self.get_path(seqid, "metadata")
+        if path is None:
+            return [SC.NOT_FOUND, None]
+        try:
+            with open(path, "r") as fh:
+                return [SC.OK, json.load(fh)]
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return [SC.NOT_FOUND, None]
+
+    def get_subsequence(self, seqid, start, end):
+        """Slice a subsequence from the memory-mapped sequence file
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence (truncated at the end of the file, as
+                for an HTTP range request), or None if the sequence file does
+                not exist
+        """
+
+        mapped = map_file(self.get_path(seqid, "sequence"))
+        if mapped is None:
+            return None
+        return mapped[start:end].decode("ascii")
+
+    def stream_subsequence(self, seqid, start, end):
+        """Stream a subsequence as zero-copy slices of the sequence file
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (generator): memoryview slices of the memory-mapped sequence file,
+                or None if the sequence file does not exist, or ends before
+                the subsequence end
+        """
+
+        mapped = map_file(self.get_path(seqid, "sequence"))
+        if mapped is None or (end is not None and end > len(mapped)):
+            return None
+
+        # every streamed byte is announced by the response Content-Length,
+        # so the stream is never truncated
+        end = len(mapped) if end is None else end
+
+        def iter_chunks():
+            view = memoryview(mapped)
+            for chunk_start in range(start, end, READ_CHUNK_SIZE):
+                yield view[chunk_start:min(chunk_start + READ_CHUNK_SIZE, end)]
+
+        return iter_chunks()
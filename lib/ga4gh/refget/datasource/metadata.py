@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Methods for requesting sequence metadata, through a process-wide cache
+
+Refget sequence identifiers are checksums of the sequence content, so the
+metadata object for a given identifier never changes. Metadata objects
+retrieved from the datasource are kept in a bounded, process-wide cache shared
+by all middleware and refget functions.
+
+Requests for unknown sequences are answered without reaching the datasource
+wherever possible: malformed sequence ids are rejected outright, ids absent
+from the Bloom filter of known ids (if configured) are rejected, and ids the
+datasource recently reported as not found are kept in a time-bounded negative
+cache.
+"""
+
+import threading
+from ga4gh.refget.cache.lru import LRUCache
+from ga4gh.refget.catalog.bloom import get_bloom_filter
+from ga4gh.refget.catalog.catalog import get_catalog
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.util.seqid import is_valid_seqid
+
+metadata_caches = {}
+"""Process-wide metadata caches, by cache size and time-to-live"""
+
+metadata_caches_lock = threading.Lock()
+"""Lock guarding creation of process-wide metadata caches"""
+
+negative_caches = {}
+"""Process-wide caches of not found sequence ids, by size and time-to-live"""
+
+negative_caches_lock = threading.Lock()
+"""Lock guarding creation of process-wide negative caches"""
+
+def get_metadata_cache(properties):
+    """Get the process-wide metadata cache
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            number of cached metadata objects under 'cache.metadata_size', and
+            the cached object time-to-live under 'cache.metadata_ttl'
+
+    Returns:
+        (LRUCache): metadata cache, metadata objects by sequence id
+    """
+
+    maxsize = int(properties.get("cache.metadata_size"))
+    ttl = float(properties.get("cache.metadata_ttl"))
+    key = (maxsize, ttl)
+    with metadata_caches_lock:
+        if key not in metadata_caches:
+            metadata_caches[key] = LRUCache(maxsize, ttl=ttl)
+        return metadata_caches[key]
+
+def get_negative_cache(properties):
+    """Get the process-wide cache of sequence ids not found on the datasource
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            number of cached sequence ids under 'cache.negative_size', and the
+            cached id time-to-live under 'cache.negative_ttl'
+
+    Returns:
+        (LRUCache): negative cache, True by not found sequence id
+    """
+
+    maxsize = int(properties.get("cache.negative_size"))
+    ttl = float(properties.get("cache.negative_ttl"))
+    key = (maxsize, ttl)
+    with negative_caches_lock:
+        if key not in negative_caches:
+            negative_caches[key] = LRUCache(maxsize, ttl=ttl)
+        return negative_caches[key]
+
+def is_known_seqid(properties, seqid):
+    """Check whether a sequence id may identify a sequence, without any I/O
+
+    Arguments:
+        properties (Properties): runtime properties
+        seqid (str): requested sequence (checksum identifier)
+
+    Returns:
+        (bool): False if the id is malformed, absent from the Bloom filter of
+            known ids, or was recently not found on the datasource, otherwise
+            True
+    """
+
+    if not is_valid_seqid(seqid):
+        return False
+    bloom_filter = get_bloom_filter(properties)
+    if bloom_filter is not None and seqid not in bloom_filter:
+        return False
+    return get_negative_cache(properties).get(seqid) is None
+
+def get_metadata(properties, seqid):
+    """Get a sequence metadata object, from cache or the datasource
+
+    Arguments:
+        properties (Properties): runtime properties
+        seqid (str): requested sequence (checksum identifier)
+
+    Returns:
+        (list): HTTP status code of the metadata lookup, and the parsed
+            metadata object (or None if the lookup was unsuccessful). The
+            metadata object is shared with the cache, and must not be modified
+    """
+
+    cache = get_metadata_cache(properties)
+    metadata = cache.get(seqid)
+    if metadata is not None:
+        return [SC.OK, metadata]
+
+    if not is_known_seqid(properties, seqid):
+        return [SC.NOT_FOUND, None]
+
+    status_code, metadata = get_datasource(properties).get_metadata(seqid)
+    if metadata is None:
+        if status_code == SC.NOT_FOUND:
+            get_negative_cache(properties).put(seqid, True)
+        return [status_code, None]
+
+    cache.put(seqid, metadata)
+    return [SC.OK, metadata]
+
+def get_sequence_length(properties, seqid):
+    """Get the length of a sequence from the catalog or its metadata object
+
+    If a sequence catalog is configured, the length is looked up in the
+    catalog (by any sequence alias), without any upstream requests, and
+    sequences absent from the catalog are not found
+
+    Arguments:
+        properties (Properties): runtime properties
+        seqid (str): requested sequence (checksum identifier)
+
+    Returns:
+        (list): HTTP status code of the metadata lookup, and the sequence length
+            (or None if the lookup was unsuccessful)
+    """
+
+    catalog = get_catalog(properties)
+    if catalog is not None:
+        entry = catalog.lookup(seqid)
+        if entry is None:
+            return [SC.NOT_FOUND, None]
+        return [SC.OK, entry[1]]
+
+    status_code, metadata = get_metadata(properties, seqid)
+    if metadata is None:
+        return [status_code, None]
+    return [status_code, int(metadata["metadata"]["length"])]
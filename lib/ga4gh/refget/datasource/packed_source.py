@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Datasource serving subsequences decoded from 2-bit packed sequence objects
+
+Sequence objects on the wrapped datasource are stored in the 2-bit packed
+format (see ga4gh.refget.packed.twobit). The index of each packed object
+(header and run tables) is read once, and cached in a process-wide cache.
+Subsequences are then served by reading only the packed bytes covering them
+from the wrapped datasource (a quarter of the bytes of the plain subsequence),
+and decoding them. Clients expect plain sequences, so they are never
+redirected to packed objects. Concurrent, identical reads of packed bytes are
+coalesced into a single read.
+"""
+
+from ga4gh.refget.cache.lru import LRUCache
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.metrics.metrics import observe_coalesced
+from ga4gh.refget.packed.twobit import PackedIndex, get_index_size
+from ga4gh.refget.util.singleflight import flights
+
+INDEX_READ_SIZE = 65536
+"""Size (in bytes) of the first read of a packed object, which contains the
+complete index of most sequences"""
+
+PACKED_INDEXES_SIZE = 4096
+"""Maximum number of packed object indexes cached per process"""
+
+packed_indexes = LRUCache(PACKED_INDEXES_SIZE)
+"""Process-wide packed object indexes, by (base url, seqid)"""
+
+class PackedDataSource(DataSource):
+    """Datasource decoding subsequences from packed objects of a wrapped
+    datasource
+
+    Attributes:
+        datasource (DataSource): wrapped datasource, serving packed sequence
+            objects and plain metadata objects
+    """
+
+    def __init__(self, properties, datasource):
+        """PackedDataSource constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+            datasource (DataSource): wrapped datasource
+        """
+
+        super(PackedDataSource, self).__init__(properties)
+        self.datasource = datasource
+
+    def get_metadata_url(self, seqid):
+        """Get the metadata url of the wrapped datasource"""
+
+        return self.datasource.get_metadata_url(seqid)
+
+    def get_url_ttl(self):
+        """Get the url time-to-live of the wrapped datasource"""
+
+        return self.datasource.get_url_ttl()
+
+    def get_metadata(self, seqid):
+        """Get a metadata object from the wrapped datasource"""
+
+        return self.datasource.get_metadata(seqid)
+
+    def request_bytes(self, seqid, start, end):
+        """Read a byte range of a packed object from the wrapped datasource
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive byte start
+            end (int): 0-based, exclusive byte end, or None for the remainder
+                of the object
+
+        Returns:
+            (bytes): bytes of the packed object, or None if the object could
+                not be retrieved
+        """
+
+        stream = self.datasource.stream_subsequence(seqid, start, end)
+        if stream is None:
+            return None
+        return b"".join(stream)
+
+    def read_bytes(self, seqid, start, end):
+        """Read a byte range of a packed object, shared with identical reads
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive byte start
+            end (int): 0-based, exclusive byte end, or None for the remainder
+                of the object
+
+        Returns:
+            (bytes): bytes of the packed object, or None if the object could
+                not be retrieved
+        """
+
+        key = ("packed", self.properties.get("source.base_url"), seqid, start,
+               end)
+        data, shared = flights.do(key, self.request_bytes, seqid, start, end)
+        if shared:
+            observe_coalesced("sequence")
+        return data
+
+    def get_index(self, seqid):
+        """Get the index of a packed object, from cache or the datasource
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (PackedIndex): packed object index, or None if the object could
+                not be retrieved, or is not a packed sequence object
+        """
+
+        key = (self.properties.get("source.base_url"), seqid)
+        index = packed_indexes.get(key)
+        if index is not None:
+            return index
+
+        # datasources that do not truncate reads past the end of an object
+        # (e.g. local files) fail the read of an object shorter than the
+        # index read, which is then read in full
+        data = self.read_bytes(seqid, 0, INDEX_READ_SIZE)
+        if data is None:
+            data = self.read_bytes(seqid, 0, None)
+        if data is None:
+            return None
+        index_size = get_index_size(data)
+        if index_size is None:
+            return None
+        if len(data) < index_size:
+            remainder = self.read_bytes(seqid, len(data), index_size)
+            if remainder is None or len(data) + len(remainder) < index_size:
+                return None
+            data += remainder
+
+        index = PackedIndex(data)
+        packed_indexes.put(key, index)
+        return index
+
+    def get_window(self, seqid, start, end):
+        """Get the index of a packed object, and the clamped subsequence window
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (list): packed object index (or None if it could not be
+                retrieved), and subsequence end, clamped to the sequence length
+        """
+
+        index = self.get_index(seqid)
+        if index is None:
+            return [None, end]
+        end = index.length if end is None else min(end, index.length)
+        return [index, end]
+
+    def get_subsequence(self, seqid, start, end):
+        """Decode a subsequence from the packed bytes covering it
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence, or None if the sequence could not be
+                retrieved
+        """
+
+        index, end = self.get_window(seqid, start, end)
+        if index is None:
+            return None
+        if start >= end:
+            return ""
+
+        byte_start, byte_end, first_base = index.get_packed_range(start, end)
+        packed = self.read_bytes(seqid, byte_start, byte_end)
+        if packed is None:
+            return None
+        return index.decode(packed, first_base, start, end).decode("ascii")
+
+    def stream_subsequence(self, seqid, start, end):
+        """Stream a subsequence, decoding packed bytes chunk by chunk
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (generator): decoded subsequence bytes chunks, or None if the
+                sequence could not be retrieved
+        """
+
+        index, end = self.get_window(seqid, start, end)
+        if index is None:
+            return None
+        if start >= end:
+            return iter([])
+
+        byte_start, byte_end, first_base = index.get_packed_range(start, end)
+        stream = self.datasource.stream_subsequence(seqid, byte_start, byte_end)
+        if stream is None:
+            return None
+
+        def iter_chunks():
+            # every packed byte holds four whole bases, so each chunk is
+            # decoded independently of its neighbours
+            try:
+                chunk_base = first_base
+                for chunk in stream:
+                    chunk_end = chunk_base + len(chunk) * 4
+                    chunk_start = max(start, chunk_base)
+                    if chunk_start < min(end, chunk_end):
+                        yield index.decode(chunk, chunk_base, chunk_start,
+                                           min(end, chunk_end))
+                    chunk_base = chunk_end
+            finally:
+                if hasattr(stream, "close"):
+                    stream.close()
+
+        return iter_chunks()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""Datasource serving pinned sequences from memory
+
+Small, frequently requested sequences (e.g. those of a reference assembly
+listed for warm-up, see ga4gh.refget.warmup.warmup) may be pinned in memory in
+full. Pinned sequences are held in a process-wide store, bounded by total
+bytes, and are never evicted, so subsequences of pinned sequences are always
+served without upstream requests. Sequences that are not pinned are passed
+through to the wrapped datasource.
+"""
+
+import threading
+from ga4gh.refget.cache.pinned import PinnedStore
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.datasource.upstream import READ_CHUNK_SIZE
+
+pinned_stores = {}
+"""Process-wide pinned sequence stores, by store size in bytes"""
+
+pinned_stores_lock = threading.Lock()
+"""Lock guarding creation of process-wide pinned sequence stores"""
+
+def get_pinned_store(properties):
+    """Get the process-wide pinned sequence store
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            total size of pinned sequences in bytes under 'cache.pinned_bytes'
+
+    Returns:
+        (PinnedStore): pinned sequence store, sequences by sequence id
+    """
+
+    max_bytes = int(properties.get("cache.pinned_bytes"))
+    with pinned_stores_lock:
+        if max_bytes not in pinned_stores:
+            pinned_stores[max_bytes] = PinnedStore(max_bytes)
+        return pinned_stores[max_bytes]
+
+def iter_chunks(seq):
+    """Iterate over an in-memory (pinned or cached) subsequence in bytes
+    chunks
+
+    Arguments:
+        seq (str): in-memory subsequence
+
+    Returns:
+        (generator): subsequence bytes chunks
+    """
+
+    for offset in range(0, len(seq), READ_CHUNK_SIZE):
+        yield seq[offset:offset + READ_CHUNK_SIZE].encode("ascii")
+
+class PinnedDataSource(DataSource):
+    """Datasource serving pinned sequences from a process-wide store
+
+    Attributes:
+        datasource (DataSource): wrapped datasource
+        pinned_store (PinnedStore): process-wide pinned sequence store
+    """
+
+    def __init__(self, properties, datasource):
+        """PinnedDataSource constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+            datasource (DataSource): wrapped datasource
+        """
+
+        super(PinnedDataSource, self).__init__(properties)
+        self.datasource = datasource
+        self.pinned_store = get_pinned_store(properties)
+
+    def get_sequence_url(self, seqid):
+        """Get the sequence url of the wrapped datasource"""
+
+        return self.datasource.get_sequence_url(seqid)
+
+    def get_metadata_url(self, seqid):
+        """Get the metadata url of the wrapped datasource"""
+
+        return self.datasource.get_metadata_url(seqid)
+
+    def get_url_ttl(self):
+        """Get the url time-to-live of the wrapped datasource"""
+
+        return self.datasource.get_url_ttl()
+
+    def get_metadata(self, seqid):
+        """Get a metadata object from the wrapped datasource"""
+
+        return self.datasource.get_metadata(seqid)
+
+    def is_cached(self, seqid, start, end):
+        """Check whether a subsequence is pinned, or cached by the wrapped
+        datasource"""
+
+        return self.pinned_store.contains(seqid) \
+            or self.datasource.is_cached(seqid, start, end)
+
+    def is_pinned(self, seqid):
+        """Check whether a sequence is pinned
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (bool): True if the sequence is pinned in memory
+        """
+
+        return self.pinned_store.contains(seqid)
+
+    def pin_sequence(self, seqid, length):
+        """Read a complete sequence from the wrapped datasource, and pin it
+
+        The sequence is streamed from the wrapped datasource, so that it does
+        not also occupy the sequence block cache
+
+        Arguments:
+            seqid (str): sequence (checksum identifier) to pin
+            length (int): sequence length
+
+        Returns:
+            (bool): True if the sequence is pinned
+        """
+
+        if self.pinned_store.contains(seqid):
+            return True
+        stream = self.datasource.stream_subsequence(seqid, 0, length)
+        if stream is None:
+            return False
+        try:
+            seq = b"".join(stream).decode("ascii")
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+        if len(seq) != length:
+            return False
+        return self.pinned_store.pin(seqid, seq)
+
+    def get_subsequence(self, seqid, start, end):
+        """Get a subsequence of a pinned sequence, or from the wrapped
+        datasource
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence, or None if the sequence could not be
+                retrieved
+        """
+
+        seq = self.pinned_store.get(seqid)
+        if seq is None:
+            return self.datasource.get_subsequence(seqid, start, end)
+        return seq[start:end]
+
+    def stream_subsequence(self, seqid, start, end):
+        """Stream a subsequence of a pinned sequence, or from the wrapped
+        datasource
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (iterable): subsequence bytes chunks, or None if the sequence could
+                not be retrieved
+        """
+
+        seq = self.pinned_store.get(seqid)
+        if seq is None:
+            return self.datasource.stream_subsequence(seqid, start, end)
+        return iter_chunks(seq[start:end])
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+"""Datasource serving objects from an S3 bucket, through the S3 API
+
+Objects are read with (ranged) GetObject calls, so the bucket does not need to
+be exposed as a public static website, and may be private. Object keys are
+resolved from the 'source.sequence_path' and 'source.metadata_path' templates
+(without their leading '/'), in the bucket named by 'source.s3_bucket'.
+Requests are signed with credentials from the default AWS credential chain
+(environment variables, shared credentials file, or instance/task role).
+
+All calls are made through a process-wide, long-lived botocore client per
+bucket configuration, which keeps a pool of up to 'source.pool_maxsize'
+connections alive. If 'source.s3_endpoint_url' is set, the client calls that
+endpoint (e.g. a local S3-compatible stand-in) with path-style addressing.
+
+Subsequences larger than 'source.s3_part_size' bytes are fetched as parts,
+with up to 'source.s3_part_concurrency' ranged GetObject calls in parallel.
+Concurrent, identical metadata and part fetches are coalesced into a single
+call (see ga4gh.refget.util.singleflight). Clients are redirected to
+presigned urls, valid for 'source.s3_presign_ttl' seconds.
+
+Secondary checksum identifiers (e.g. md5) are stored as empty alias objects,
+redirecting to the object of the primary identifier with a
+'Website-Redirect-Location' header, which only S3 website endpoints follow.
+Alias objects are followed by the datasource instead, and resolved keys are
+kept in a process-wide cache.
+
+botocore is an optional dependency (e.g. 'pip install refget-cloud[s3]'),
+required only by this datasource.
+"""
+
+import json
+import threading
+import time
+from ga4gh.refget.cache.lru import LRUCache
+from ga4gh.refget.config.exceptions import RefgetInvalidPropertyException
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.datasource.upstream import READ_CHUNK_SIZE, \
+    get_range_header
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.metrics.metrics import observe_coalesced, \
+    observe_upstream
+from ga4gh.refget.util.executor import get_part_executor
+from ga4gh.refget.util.singleflight import flights
+
+try:
+    import botocore.config
+    import botocore.exceptions
+    import botocore.session
+except ImportError:
+    botocore = None
+
+ALIAS_KEYS_SIZE = 65536
+"""Maximum number of resolved alias object keys cached per process"""
+
+alias_keys = LRUCache(ALIAS_KEYS_SIZE)
+"""Process-wide resolved alias object keys, by (bucket, alias key)"""
+
+clients = {}
+"""Process-wide S3 clients, by region, endpoint url, and pool size"""
+
+clients_lock = threading.Lock()
+"""Lock guarding creation of process-wide S3 clients"""
+
+def get_s3_client(properties):
+    """Get the process-wide, pooled S3 client
+
+    Arguments:
+        properties (Properties): runtime properties, containing the bucket
+            region under 'source.s3_region', the S3 endpoint url under
+            'source.s3_endpoint_url', and the maximum number of pooled
+            connections under 'source.pool_maxsize'
+
+    Returns:
+        (botocore.client.S3): S3 client shared by all S3 calls
+    """
+
+    region = properties.get("source.s3_region") or None
+    endpoint_url = properties.get("source.s3_endpoint_url") or None
+    pool_maxsize = int(properties.get("source.pool_maxsize"))
+    key = (region, endpoint_url, pool_maxsize)
+
+    with clients_lock:
+        if key not in clients:
+            # S3-compatible stand-ins are addressed by path, not subdomain
+            config = botocore.config.Config(
+                max_pool_connections=pool_maxsize, signature_version="s3v4",
+                s3={"addressing_style": "path" if endpoint_url else "auto"})
+            clients[key] = botocore.session.get_session().create_client(
+                "s3", region_name=region, endpoint_url=endpoint_url,
+                config=config)
+    return clients[key]
+
+def reset_s3_clients():
+    """Discard process-wide S3 clients inherited from a parent process
+
+    As for HTTP sessions (see ga4gh.refget.datasource.upstream), pooled
+    connections opened before worker processes are forked would otherwise be
+    shared by all workers
+    """
+
+    with clients_lock:
+        clients.clear()
+
+def resolve_key(properties, seqid, path_type):
+    """Resolve the object key of a sequence or metadata object
+
+    Arguments:
+        properties (Properties): runtime properties, containing the sequence
+            and metadata path templates
+        seqid (str): requested sequence (checksum identifier)
+        path_type (str): 'sequence' or 'metadata'
+
+    Returns:
+        (str): object key in the bucket
+    """
+
+    template = properties.get("source.%s_path" % path_type)
+    return template.format(seqid=seqid).lstrip("/")
+
+def get_error_status_code(error):
+    """Get the HTTP status code of a failed S3 call
+
+    Arguments:
+        error (botocore.exceptions.ClientError): S3 call error
+
+    Returns:
+        (int): HTTP status code of the S3 response
+    """
+
+    return error.response.get("ResponseMetadata", {}).get(
+        "HTTPStatusCode", SC.NOT_FOUND)
+
+def get_redirect_key(s3_response):
+    """Get the key an empty alias object redirects to
+
+    Arguments:
+        s3_response (dict): GetObject or HeadObject response
+
+    Returns:
+        (str): key of the object redirected to, or None if the object is not
+            an alias object, or redirects outside of the bucket
+    """
+
+    location = s3_response.get("WebsiteRedirectLocation")
+    if s3_response.get("ContentLength") != 0 or not location \
+        or not location.startswith("/"):
+        return None
+    return location.lstrip("/")
+
+def iter_body(body, start, end):
+    """Iterate over a window of a GetObject response body
+
+    Reads the body chunk by chunk, discarding bytes before the start position,
+    and stops reading once the end position has been reached. The body is
+    closed once iteration completes (or the iterator is closed early)
+
+    Arguments:
+        body (botocore.response.StreamingBody): GetObject response body
+        start (int): 0-based, inclusive window start, relative to the first
+            byte of the body
+        end (int): 0-based, exclusive window end, relative to the first byte of
+            the body, or None for the remainder of the body
+
+    Returns:
+        (generator): subsequence bytes chunks
+    """
+
+    try:
+        position = 0
+        while end is None or position < end:
+            chunk = body.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunk_start = position
+            position += len(chunk)
+            if position <= start:
+                continue
+            yield chunk[max(start - chunk_start, 0):
+                        None if end is None else end - chunk_start]
+    finally:
+        body.close()
+
+class S3DataSource(DataSource):
+    """Datasource serving objects from an S3 bucket, through the S3 API
+
+    Attributes:
+        bucket (str): bucket name
+        client (botocore.client.S3): process-wide S3 client
+        part_size (int): size (in bytes) above which subsequences are fetched
+            as parts, 0 fetches subsequences in a single call
+        part_concurrency (int): maximum number of parts fetched in parallel
+        presign_ttl (int): time (in seconds) presigned urls are valid for, 0
+            if clients are not redirected
+    """
+
+    def __init__(self, properties):
+        """S3DataSource constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+
+        Raises:
+            RefgetInvalidPropertyException: when botocore is not installed, or
+                no bucket is configured
+        """
+
+        super(S3DataSource, self).__init__(properties)
+        if botocore is None:
+            raise RefgetInvalidPropertyException(
+                "source.type s3 requires the botocore package")
+        self.bucket = properties.get("source.s3_bucket")
+        if not self.bucket:
+            raise RefgetInvalidPropertyException(
+                "source.type s3 requires source.s3_bucket")
+        self.client = get_s3_client(properties)
+        self.part_size = int(properties.get("source.s3_part_size"))
+        self.part_concurrency = int(
+            properties.get("source.s3_part_concurrency"))
+        self.presign_ttl = int(properties.get("source.s3_presign_ttl"))
+
+    def get_url(self, seqid, path_type):
+        """Get a presigned url of a sequence or metadata object
+
+        Presigned urls are served by the S3 API, which does not follow alias
+        objects, so urls of alias objects are signed for the object they
+        redirect to
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            path_type (str): 'sequence' or 'metadata'
+
+        Returns:
+            (str): presigned url, or None if clients are not redirected, or
+                the url could not be signed (e.g. no credentials)
+        """
+
+        if self.presign_ttl <= 0:
+            return None
+        key = self.resolve_alias_key(
+            resolve_key(self.properties, seqid, path_type))
+        try:
+            return self.client.generate_presigned_url(
+                "get_object", Params={"Bucket": self.bucket, "Key": key},
+                ExpiresIn=self.presign_ttl)
+        except botocore.exceptions.BotoCoreError:
+            return None
+
+    def get_sequence_url(self, seqid):
+        """Get a presigned url of a sequence object"""
+
+        return self.get_url(seqid, "sequence")
+
+    def get_metadata_url(self, seqid):
+        """Get a presigned url of a metadata object"""
+
+        return self.get_url(seqid, "metadata")
+
+    def get_url_ttl(self):
+        """Get the time presigned urls are valid for
+
+        Returns:
+            (int): time (in seconds) presigned urls are valid for
+        """
+
+        return self.presign_ttl
+
+    def call_get_object(self, key, call, start=None, end=None):
+        """Call GetObject, optionally for a byte range
+
+        The call count and latency (to response headers) are recorded in the
+        upstream metrics, under the call name
+
+        Arguments:
+            key (str): object key
+            call (str): call name recorded in metrics, 'sequence' or 'metadata'
+            start (int): 0-based, inclusive range start, or None for the
+                complete object
+            end (int): 0-based, exclusive range end, or None for the remainder
+                of the object
+
+        Returns:
+            (list): HTTP status code of the call, and the GetObject response
+                (or None if the call was unsuccessful)
+        """
+
+        kwargs = {"Bucket": self.bucket, "Key": key}
+        if start is not None:
+            kwargs["Range"] = get_range_header(start, end)
+
+        started = time.monotonic()
+        status_code = None
+        try:
+            s3_response = self.client.get_object(**kwargs)
+            status_code = s3_response["ResponseMetadata"]["HTTPStatusCode"]
+            return [status_code, s3_response]
+        except botocore.exceptions.ClientError as e:
+            status_code = get_error_status_code(e)
+            return [status_code, None]
+        finally:
+            observe_upstream(call, status_code, time.monotonic() - started)
+
+    def head_redirect_key(self, key):
+        """Get the key an alias object redirects to, with HeadObject
+
+        Ranged GetObject calls to empty alias objects are not satisfiable, so
+        their redirect location is read from the object's headers instead
+
+        Arguments:
+            key (str): object key
+
+        Returns:
+            (str): key of the object redirected to, or None if the object is
+                not an alias object
+        """
+
+        try:
+            return get_redirect_key(
+                self.client.head_object(Bucket=self.bucket, Key=key))
+        except botocore.exceptions.ClientError:
+            return None
+
+    def resolve_alias_key(self, key):
+        """Resolve an object key to the key of the object it redirects to
+
+        Arguments:
+            key (str): object key
+
+        Returns:
+            (str): key of the object redirected to, or the object key if the
+                object is not an alias object
+        """
+
+        resolved = alias_keys.get((self.bucket, key))
+        if resolved is None:
+            resolved = self.head_redirect_key(key) or key
+            alias_keys.put((self.bucket, key), resolved)
+        return resolved
+
+    def get_object(self, key, call, start=None, end=None):
+        """Call GetObject, following alias objects to the object they redirect
+        to
+
+        Arguments:
+            key (str): object key
+            call (str): call name recorded in metrics, 'sequence' or 'metadata'
+            start (int): 0-based, inclusive range start, or None for the
+                complete object
+            end (int): 0-based, exclusive range end, or None for the remainder
+                of the object
+
+        Returns:
+            (list): HTTP status code of the call, and the GetObject response
+                (or None if the call was unsuccessful)
+        """
+
+        key = alias_keys.get((self.bucket, key)) or key
+        status_code, s3_response = self.call_get_object(key, call, start, end)
+        if s3_response is not None:
+            target = get_redirect_key(s3_response)
+        elif status_code == SC.REQUESTED_RANGE_NOT_SATISFIABLE:
+            target = self.head_redirect_key(key)
+        else:
+            target = None
+        if target is None:
+            return [status_code, s3_response]
+
+        if s3_response is not None:
+            s3_response["Body"].close()
+        alias_keys.put((self.bucket, key), target)
+        return self.call_get_object(target, call, start, end)
+
+    def request_metadata(self, key):
+        """Request a sequence metadata object from the bucket
+
+        Arguments:
+            key (str): metadata object key
+
+        Returns:
+            (list): HTTP status code of the call, and the parsed metadata
+                object (or None if the call was unsuccessful)
+        """
+
+        status_code, s3_response = self.get_object(key, "metadata")
+        if s3_response is None:
+            return [status_code, None]
+        body = s3_response["Body"]
+        try:
+            return [SC.OK, json.loads(body.read().decode("utf-8"))]
+        finally:
+            body.close()
+
+    def get_metadata(self, seqid):
+        """Request a sequence metadata object, shared with identical requests
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+
+        Returns:
+            (list): HTTP status code of the call, and the parsed metadata
+                object (or None if the call was unsuccessful). The metadata
+                object may be shared with concurrent callers, and must not be
+                modified
+        """
+
+        key = resolve_key(self.properties, seqid, "metadata")
+        result, shared = flights.do(("s3", "metadata", self.bucket, key),
+                                    self.request_metadata, key)
+        if shared:
+            observe_coalesced("metadata")
+        return result
+
+    def stream_subsequence(self, seqid, start, end):
+        """Request a subsequence from the bucket by byte range, streamed
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (generator): subsequence bytes chunks, or None if the sequence
+                could not be retrieved
+        """
+
+        if end is not None and end <= start:
+            return iter([])
+
+        key = resolve_key(self.properties, seqid, "sequence")
+        status_code, s3_response = self.get_object(key, "sequence", start,
+                                                   end)
+        length = None if end is None else end - start
+
+        # S3 honours the Range header, body is the subsequence
+        if status_code == SC.PARTIAL_CONTENT:
+            return iter_body(s3_response["Body"], 0, length)
+        # S3-compatible stand-in ignored the Range header, body is the
+        # complete object
+        elif status_code == SC.OK:
+            return iter_body(s3_response["Body"], start, end)
+
+        # start lies at the end of the sequence, subsequence is empty
+        if status_code == SC.REQUESTED_RANGE_NOT_SATISFIABLE:
+            return iter([])
+        return None
+
+    def request_part(self, seqid, start, end):
+        """Request a subsequence (or part of one) from the bucket
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence, or None if the sequence could not be
+                retrieved
+        """
+
+        stream = self.stream_subsequence(seqid, start, end)
+        if stream is None:
+            return None
+        return b"".join(stream).decode("ascii")
+
+    def get_part(self, seqid, start, end):
+        """Request a subsequence part, shared with identical requests
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive part start
+            end (int): 0-based, exclusive part end, or None for the remainder
+                of the sequence
+
+        Returns:
+            (str): requested part, or None if the sequence could not be
+                retrieved
+        """
+
+        seq, shared = flights.do(("s3", "sequence", self.bucket, seqid, start,
+                                  end), self.request_part, seqid, start, end)
+        if shared:
+            observe_coalesced("sequence")
+        return seq
+
+    def get_subsequence(self, seqid, start, end):
+        """Request a subsequence from the bucket, in parallel parts if large
+
+        Arguments:
+            seqid (str): requested sequence (checksum identifier)
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end, or None for the
+                remainder of the sequence
+
+        Returns:
+            (str): requested subsequence, or None if the sequence could not be
+                retrieved
+        """
+
+        if end is None or self.part_size <= 0 or self.part_concurrency <= 1 \
+            or end - start <= self.part_size:
+            return self.get_part(seqid, start, end)
+
+        # a part is short (or empty) if it lies beyond the end of the sequence
+        bounds = [[part_start, min(part_start + self.part_size, end)]
+                  for part_start in range(start, end, self.part_size)]
+        parts = list(get_part_executor(self.properties).map(
+            lambda b: self.get_part(seqid, b[0], b[1]), bounds))
+        if any(part is None for part in parts):
+            return None
+        return "".join(parts)
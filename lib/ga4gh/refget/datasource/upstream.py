@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""Methods for requesting sequence and metadata objects from the datasource
+
+All upstream requests are made through a single, process-wide HTTP session,
+which keeps connections to the datasource alive and pools them per host.
+Subsequences are requested from the datasource with an HTTP 'Range' header, so
+that only the requested bytes are transferred. If the datasource does not
+honour the 'Range' header and returns the complete object, the response is
+streamed and only read up to the end of the requested subsequence.
+
+Concurrent, identical metadata and subsequence fetches (by url and byte range)
+are coalesced into a single upstream request (see
+ga4gh.refget.util.singleflight). Streamed subsequences are never shared.
+"""
+
+import requests
+import threading
+import time
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.metrics.metrics import observe_coalesced, \
+    observe_upstream
+from ga4gh.refget.util.singleflight import flights
+
+READ_CHUNK_SIZE = 65536
+"""Size (in bytes) of chunks read from a streamed datasource response"""
+
+sessions = {}
+"""Process-wide HTTP sessions, by connection pool configuration"""
+
+sessions_lock = threading.Lock()
+"""Lock guarding creation of process-wide HTTP sessions"""
+
+def get_session(properties):
+    """Get the process-wide, pooled keep-alive HTTP session
+
+    Arguments:
+        properties (Properties): runtime properties, containing the number of
+            per-host connection pools under 'source.pool_connections', and the
+            maximum number of connections per host under 'source.pool_maxsize'
+
+    Returns:
+        (requests.Session): HTTP session shared by all upstream requests
+    """
+
+    pool_connections = int(properties.get("source.pool_connections"))
+    pool_maxsize = int(properties.get("source.pool_maxsize"))
+    key = (pool_connections, pool_maxsize)
+
+    with sessions_lock:
+        if key not in sessions:
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            sessions[key] = session
+    return sessions[key]
+
+def reset_sessions():
+    """Discard process-wide HTTP sessions inherited from a parent process
+
+    Pooled connections opened before worker processes are forked (e.g. during
+    warm-up) would otherwise be shared by all workers. Each worker opens its
+    own connections once the inherited sessions are discarded
+    """
+
+    with sessions_lock:
+        sessions.clear()
+
+def upstream_get(properties, url, call="sequence", **kwargs):
+    """Perform a GET request to the datasource on the process-wide session
+
+    The request count and latency (to response headers) are recorded in the
+    upstream metrics, under the call name.
+
+    Arguments:
+        properties (Properties): runtime properties
+        url (str): datasource url
+        call (str): call name recorded in metrics, 'sequence' or 'metadata'
+        kwargs (dict): keyword arguments passed to requests.Session.get
+
+    Returns:
+        (requests.Response): datasource response
+    """
+
+    started = time.monotonic()
+    status_code = None
+    try:
+        datasource_response = get_session(properties).get(url, **kwargs)
+        status_code = datasource_response.status_code
+        return datasource_response
+    finally:
+        observe_upstream(call, status_code, time.monotonic() - started)
+
+def get_range_header(start, end):
+    """Get the 'Range' header value for a subsequence
+
+    Arguments:
+        start (int): 0-based, inclusive subsequence start
+        end (int): 0-based, exclusive subsequence end, or None for the
+            remainder of the sequence
+
+    Returns:
+        (str): 'Range' header value, with inclusive byte positions
+    """
+
+    if end is None:
+        return "bytes=%d-" % start
+    return "bytes=%d-%d" % (start, end - 1)
+
+def iter_window(datasource_response, start, end):
+    """Iterate over a subsequence window of a streamed datasource response
+
+    Reads the streamed response chunk by chunk, discarding bytes before the
+    start position, and stops reading once the end position has been reached.
+    The datasource response is closed once iteration completes (or the
+    iterator is closed early)
+
+    Arguments:
+        datasource_response (requests.Response): streamed datasource response
+        start (int): 0-based, inclusive window start, relative to the first
+            byte of the response body
+        end (int): 0-based, exclusive window end, relative to the first byte of
+            the response body, or None for the remainder of the body
+
+    Returns:
+        (generator): subsequence bytes chunks
+    """
+
+    try:
+        position = 0
+        for chunk in datasource_response.iter_content(
+            chunk_size=READ_CHUNK_SIZE):
+            chunk_start = position
+            position += len(chunk)
+            if position <= start:
+                continue
+            yield chunk[max(start - chunk_start, 0):
+                        None if end is None else end - chunk_start]
+            if end is not None and position >= end:
+                break
+    finally:
+        datasource_response.close()
+
+def stream_subsequence(properties, url, start, end):
+    """Request a subsequence from the datasource by byte range, as a stream
+
+    The subsequence is requested with a 'Range' header. If the datasource
+    honours the header, the response body is streamed directly. Otherwise, the
+    complete object is streamed, and only the requested window is yielded.
+
+    Arguments:
+        properties (Properties): runtime properties
+        url (str): datasource url of the complete sequence object
+        start (int): 0-based, inclusive subsequence start
+        end (int): 0-based, exclusive subsequence end, or None for the
+            remainder of the sequence
+
+    Returns:
+        (generator): subsequence bytes chunks, or None if the sequence object
+            could not be retrieved from the datasource
+    """
+
+    if end is not None and end <= start:
+        return iter([])
+
+    headers = {"Range": get_range_header(start, end)}
+    datasource_response = upstream_get(
+        properties, url, headers=headers, stream=True)
+    status_code = datasource_response.status_code
+    length = None if end is None else end - start
+
+    # datasource honoured the Range header, body is the subsequence
+    if status_code == SC.PARTIAL_CONTENT:
+        return iter_window(datasource_response, 0, length)
+    # datasource ignored the Range header, body is the complete object
+    elif status_code == SC.OK:
+        return iter_window(datasource_response, start, end)
+
+    datasource_response.close()
+    # start lies at the end of the sequence, subsequence is empty
+    if status_code == SC.REQUESTED_RANGE_NOT_SATISFIABLE:
+        return iter([])
+    return None
+
+def request_metadata(properties, url):
+    """Request a sequence metadata object from the datasource
+
+    Arguments:
+        properties (Properties): runtime properties
+        url (str): datasource url of the metadata object
+
+    Returns:
+        (list): HTTP status code of the request, and the parsed metadata
+            object (or None if the request was unsuccessful)
+    """
+
+    metadata_response = upstream_get(properties, url, call="metadata")
+    if not SC.is_successful_code(metadata_response.status_code):
+        return [metadata_response.status_code, None]
+    return [SC.OK, metadata_response.json()]
+
+def get_metadata(properties, url):
+    """Request a sequence metadata object, shared with identical requests
+
+    Arguments:
+        properties (Properties): runtime properties
+        url (str): datasource url of the metadata object
+
+    Returns:
+        (list): HTTP status code of the request, and the parsed metadata
+            object (or None if the request was unsuccessful). The metadata
+            object may be shared with concurrent callers, and must not be
+            modified
+    """
+
+    result, shared = flights.do(("metadata", url), request_metadata,
+                                properties, url)
+    if shared:
+        observe_coalesced("metadata")
+    return result
+
+def request_subsequence(properties, url, start, end):
+    """Request a subsequence from the datasource by byte range
+
+    Arguments:
+        properties (Properties): runtime properties
+        url (str): datasource url of the complete sequence object
+        start (int): 0-based, inclusive subsequence start
+        end (int): 0-based, exclusive subsequence end, or None for the
+            remainder of the sequence
+
+    Returns:
+        (str): requested subsequence, or None if the sequence object could not
+            be retrieved from the datasource
+    """
+
+    stream = stream_subsequence(properties, url, start, end)
+    if stream is None:
+        return None
+    return b"".join(stream).decode("ascii")
+
+def get_subsequence(properties, url, start, end):
+    """Request a subsequence by byte range, shared with identical requests
+
+    Arguments:
+        properties (Properties): runtime properties
+        url (str): datasource url of the complete sequence object
+        start (int): 0-based, inclusive subsequence start
+        end (int): 0-based, exclusive subsequence end, or None for the
+            remainder of the sequence
+
+    Returns:
+        (str): requested subsequence, or None if the sequence object could not
+            be retrieved from the datasource
+    """
+
+    seq, shared = flights.do(("sequence", url, start, end),
+                             request_subsequence, properties, url, start, end)
+    if shared:
+        observe_coalesced("sequence")
+    return seq
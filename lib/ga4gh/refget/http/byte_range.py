@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Parsing and resolution of HTTP 'Range' request headers
+
+A 'Range' header requests one or more byte ranges of the sequence, each as a
+closed range ('bytes=10-19'), an open-ended range ('bytes=10-', to the end of
+the sequence), or a suffix range ('bytes=-10', the final 10 bytes). Ranges are
+resolved against the sequence length into 0-based, [start, exclusive end]
+subsequence coordinates.
+"""
+
+import re
+
+RANGE_SPEC_PATTERN = re.compile(r"(\d*)-(\d*)")
+"""Matches a single byte range spec, with optional first and last positions"""
+
+def parse_range_header(range_header):
+    """Parse a 'Range' header into byte range specs
+
+    Arguments:
+        range_header (str): 'Range' header value
+
+    Returns:
+        (list): [first, last] byte positions of each range spec, in request
+            order. first is None for suffix ranges (last is then the suffix
+            length), last is None for open-ended ranges. Returns None if the
+            header is malformed
+    """
+
+    units, _, range_set = range_header.partition("=")
+    if units.strip().lower() != "bytes":
+        return None
+
+    specs = []
+    for spec in range_set.split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        match = RANGE_SPEC_PATTERN.fullmatch(spec)
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+        first, last = [int(g) if g else None for g in match.groups()]
+        specs.append([first, last])
+    return specs if specs else None
+
+def resolve_ranges(specs, length):
+    """Resolve byte range specs against the sequence length
+
+    Specs starting at or beyond the end of the sequence (and empty suffix
+    ranges) are not satisfiable, and are omitted. Ranges ending beyond the end
+    of the sequence are truncated
+
+    Arguments:
+        specs (list): [first, last] byte range specs (see parse_range_header)
+        length (int): sequence length
+
+    Returns:
+        (list): 0-based, [start, exclusive end] coordinates of each
+            satisfiable range, in request order
+    """
+
+    ranges = []
+    for first, last in specs:
+        if first is None:
+            if last > 0 and length > 0:
+                ranges.append([max(length - last, 0), length])
+        elif first < length:
+            end = length if last is None else min(last + 1, length)
+            ranges.append([first, end])
+    return ranges
+
+def merge_ranges(ranges):
+    """Merge overlapping and adjacent ranges
+
+    Arguments:
+        ranges (list): 0-based, [start, exclusive end] coordinates
+
+    Returns:
+        (list): merged, non-overlapping coordinates, ordered by start
+    """
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def get_content_range(start, end, length):
+    """Get the 'Content-Range' header value of a range
+
+    Arguments:
+        start (int): 0-based, inclusive range start
+        end (int): 0-based, exclusive range end
+        length (int): sequence length
+
+    Returns:
+        (str): 'Content-Range' header value, with inclusive byte positions
+    """
+
+    return "bytes %d-%d/%d" % (start, end - 1, length)
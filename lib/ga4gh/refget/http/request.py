@@ -15,6 +15,7 @@ class Request(object):
         headers (dict): key-value mapping of HTTP headers
         path_params (dict): key-value mapping of parameters on url path
         query_params (dict): key-value mapping of parameters on query string
+        body (str): request body
     """
     
     def __init__(self):
@@ -23,6 +24,7 @@ class Request(object):
         self.headers = {}
         self.path_params = {}
         self.query_params = {}
+        self.body = ""
 
     def add_header(self, key, value):
         """Add a header to the headers dictionary
@@ -116,3 +118,21 @@ class Request(object):
         """
 
         return self.query_params
+
+    def set_body(self, body):
+        """Set request body
+
+        Arguments:
+            body (str): request body
+        """
+
+        self.body = body
+
+    def get_body(self):
+        """Get request body
+
+        Returns:
+            (str): request body
+        """
+
+        return self.body
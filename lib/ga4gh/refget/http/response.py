@@ -18,7 +18,9 @@ class Response(object):
     Attributes:
         status_code (int): HTTP status code
         headers (dict): key-value mapping of HTTP response headers
-        body (str): response body
+        body (str or bytes): response body, bytes if encoded (compressed)
+        body_stream (iterable): response body as a stream of bytes chunks, or
+            None if the response body is not streamed
         data (dict): common data-dictionary to pass resources between functions
     """
 
@@ -28,6 +30,7 @@ class Response(object):
         self.status_code = SC.BAD_REQUEST
         self.headers = {}
         self.body = ""
+        self.body_stream = None
         self.data = {}
 
     ##################################################
@@ -51,6 +54,52 @@ class Response(object):
         """
 
         return self.body
+
+    def set_body_stream(self, body_stream):
+        """Set response body as a stream of chunks
+
+        A streamed body is written to the client chunk by chunk, so that large
+        bodies never need to be held in memory in full
+
+        Arguments:
+            body_stream (iterable): bytes chunks making up the response body
+        """
+
+        self.body_stream = body_stream
+
+    def get_body_stream(self):
+        """Get response body stream
+
+        Returns:
+            (iterable): bytes chunks making up the response body, or None if
+                the response body is not streamed
+        """
+
+        return self.body_stream
+
+    def is_streamed(self):
+        """Check whether the response body is streamed
+
+        Returns:
+            (bool): True if the response body is streamed, otherwise False
+        """
+
+        return self.body_stream is not None
+
+    def join_body_stream(self):
+        """Read a streamed response body in full, setting it as the body
+
+        Used in deployment contexts that cannot stream response bodies
+        """
+
+        if self.is_streamed():
+            body_stream = self.body_stream
+            self.body_stream = None
+            body = b"".join(body_stream)
+            # encoded (compressed) bodies remain bytes
+            if "Content-Encoding" not in self.headers:
+                body = body.decode("ascii")
+            self.set_body(body)
     
     def set_status_code(self, status_code):
         """Set HTTP status code
@@ -92,6 +141,15 @@ class Response(object):
 
         self.headers.update(new_dict)
     
+    def remove_header(self, key):
+        """Remove a header from response headers, if present
+
+        Arguments:
+            key (str): response header key/name
+        """
+
+        self.headers.pop(key, None)
+
     def get_header(self, key):
         """Get the value of a particular header
 
@@ -8,21 +8,29 @@ class StatusCodes(object):
         OK (int): code for successful request
         PARTIAL_CONTENT (int): code for successful request, partial response
         REDIRECT_FOUND (int): code for succesful redirect
+        NOT_MODIFIED (int): code for conditional request, cached response valid
         BAD_REQUEST (int): code for bad or malformed request
         NOT_FOUND (int): code for requested resource not found
+        METHOD_NOT_ALLOWED (int): code for HTTP method not supported by route
         NOT_ACCEPTABLE (int): code for not acceptable request
+        PAYLOAD_TOO_LARGE (int): code for request exceeding a size limit
         REQUESTED_RANGE_NOT_SATISFIABLE (int): code for not satisfiable request
         NOT_IMPLEMENTED (int): code for not implemented endpoint/feature
+        SERVICE_UNAVAILABLE (int): code for temporarily overloaded server
     """
 
     OK = 200
     PARTIAL_CONTENT = 206
     REDIRECT_FOUND = 302
+    NOT_MODIFIED = 304
     BAD_REQUEST = 400
     NOT_FOUND = 404
+    METHOD_NOT_ALLOWED = 405
     NOT_ACCEPTABLE = 406
+    PAYLOAD_TOO_LARGE = 413
     REQUESTED_RANGE_NOT_SATISFIABLE = 416
     NOT_IMPLEMENTED = 501
+    SERVICE_UNAVAILABLE = 503
 
     @staticmethod
     def is_successful_code(status_code):
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Process-wide refget server metrics
+
+Metrics are recorded per server process, and exposed in Prometheus text
+exposition format by the /metrics route. When running multiple worker
+processes, each scrape is answered by a single worker process, so all samples
+carry a 'worker' label (the worker's fork task id, or 0 when not forked) and
+each worker's counters form separate, monotonic series. Aggregate across
+workers with e.g. sum without (worker) (...).
+"""
+
+import time
+from ga4gh.refget.metrics.registry import Counter, Histogram, Registry, \
+    format_labels
+
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0]
+"""Fixed latency histogram bucket upper bounds, in seconds"""
+
+ROUTE_METHOD_NOT_ALLOWED = "method_not_allowed"
+"""Route name recorded for requests with an HTTP method the route does not
+support"""
+
+CONTENT_TYPE_METRICS = "text/plain; version=0.0.4; charset=utf-8"
+"""Prometheus text exposition format MIME type"""
+
+registry = Registry([("worker", "0")])
+"""Process-wide metrics registry, labelled by worker process"""
+
+requests_total = registry.register(Counter(
+    "refget_requests_total",
+    "Refget requests handled, by route, outcome, and status code",
+    ["route", "outcome", "status"]))
+
+request_duration = registry.register(Histogram(
+    "refget_request_duration_seconds",
+    "Refget request latency, by route and outcome",
+    ["route", "outcome"],
+    LATENCY_BUCKETS))
+
+upstream_requests_total = registry.register(Counter(
+    "refget_upstream_requests_total",
+    "Requests to the upstream datasource, by call and status code",
+    ["call", "status"]))
+
+upstream_duration = registry.register(Histogram(
+    "refget_upstream_duration_seconds",
+    "Upstream datasource latency to response headers, by call",
+    ["call"],
+    LATENCY_BUCKETS))
+
+upstream_coalesced_total = registry.register(Counter(
+    "refget_upstream_coalesced_total",
+    "Upstream fetches shared with an identical in-flight fetch, by call",
+    ["call"]))
+
+admission_rejected_total = registry.register(Counter(
+    "refget_admission_rejected_total",
+    "Proxied upstream fetches rejected by admission control, by exceeded "
+    + "limit",
+    ["reason"]))
+
+def set_worker(worker):
+    """Label all metrics samples of this process with its worker id
+
+    Arguments:
+        worker (int): worker process id (fork task id), or None if the
+            server does not fork worker processes
+    """
+
+    registry.set_const_labels([("worker", str(worker or 0))])
+
+def get_outcome(status_code):
+    """Classify a response status code as a request outcome
+
+    Arguments:
+        status_code (int): HTTP status code of the response
+
+    Returns:
+        (str): 'redirect', 'not_modified' (conditional request answered
+            without a body), 'body' (response body returned directly,
+            including proxied sequences and metadata), or 'error'
+    """
+
+    if status_code == 304:
+        return "not_modified"
+    if 300 <= status_code < 400:
+        return "redirect"
+    if status_code < 300:
+        return "body"
+    return "error"
+
+def observe_request(route, status_code, seconds):
+    """Record a completed refget request
+
+    Arguments:
+        route (str): route name (e.g. 'sequence')
+        status_code (int): HTTP status code of the response
+        seconds (float): request latency in seconds
+    """
+
+    outcome = get_outcome(status_code)
+    requests_total.inc(route, outcome, str(status_code))
+    request_duration.observe(seconds, route, outcome)
+
+def observe_upstream(call, status_code, seconds):
+    """Record a completed upstream datasource request
+
+    Arguments:
+        call (str): upstream call name (e.g. 'metadata')
+        status_code (int): HTTP status code of the upstream response, or None
+            if no response was received
+        seconds (float): upstream latency in seconds
+    """
+
+    upstream_requests_total.inc(call, str(status_code))
+    upstream_duration.observe(seconds, call)
+
+def observe_coalesced(call):
+    """Record an upstream fetch shared with an identical in-flight fetch
+
+    Arguments:
+        call (str): upstream call name (e.g. 'metadata')
+    """
+
+    upstream_coalesced_total.inc(call)
+
+def observe_rejected(reason):
+    """Record an upstream fetch rejected by admission control
+
+    Arguments:
+        reason (str): exceeded limit ('fetches' or 'bytes')
+    """
+
+    admission_rejected_total.inc(reason)
+
+def collect_cache_stats():
+    """Render hit/miss counters and sizes of all process-wide caches
+
+    Returns:
+        (list): exposition lines
+    """
+
+    # imported here, as the datasource modules record upstream metrics
+    from ga4gh.refget.datasource.cached_source import block_caches
+    from ga4gh.refget.datasource.metadata import metadata_caches
+
+    caches = [("metadata", c) for c in metadata_caches.values()] \
+           + [("sequence", c) for c in block_caches.values()]
+
+    stat_metrics = [
+        ("refget_cache_hits_total", "counter", "hits", "Cache hits"),
+        ("refget_cache_misses_total", "counter", "misses", "Cache misses"),
+        ("refget_cache_size", "gauge", "currsize",
+         "Current cache size, in entries (metadata) or bytes (sequence)")
+    ]
+
+    lines = []
+    for name, metric_type, stat, documentation in stat_metrics:
+        lines += ["# HELP %s %s" % (name, documentation),
+                  "# TYPE %s %s" % (name, metric_type)]
+        totals = {}
+        for cache_name, cache in caches:
+            totals[cache_name] = \
+                totals.get(cache_name, 0) + cache.get_stats()[stat]
+        for cache_name in sorted(totals.keys()):
+            lines.append("%s%s %d" % (
+                name,
+                format_labels(["cache"], (cache_name,),
+                              registry.const_labels),
+                totals[cache_name]))
+    return lines
+
+registry.register_collector(collect_cache_stats)
+
+def render_metrics():
+    """Render all refget server metrics
+
+    Returns:
+        (str): metrics in Prometheus text exposition format
+    """
+
+    return registry.render()
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""Minimal Prometheus-compatible metric types and text exposition
+
+Counters and histograms are labelled by a fixed set of label names, and the
+samples of all metrics in a registry additionally carry the registry's
+constant labels (e.g. the worker process). Histograms use fixed bucket upper
+bounds, so recording an observation is a single bisect
+and increment. All metric types are thread-safe, as observations are recorded
+from both the event loop and the thread pool.
+"""
+
+import bisect
+import threading
+
+def format_labels(label_names, label_values, extra=None):
+    """Format a Prometheus label set
+
+    Arguments:
+        label_names (list): label names
+        label_values (tuple): label values, in the same order as label names
+        extra (list): additional (name, value) label pairs
+
+    Returns:
+        (str): formatted label set, e.g. '{route="sequence"}', or empty string
+    """
+
+    pairs = list(zip(label_names, label_values)) + (extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in pairs
+    ) + "}"
+
+def format_value(value):
+    """Format a sample value
+
+    Arguments:
+        value (float): sample value
+
+    Returns:
+        (str): formatted sample value
+    """
+
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Counter(object):
+    """Monotonically increasing counter, by label values
+
+    Attributes:
+        name (str): metric name
+        documentation (str): metric help text
+        label_names (list): label names
+        values (dict): counter values, by tuple of label values
+        lock (threading.Lock): lock guarding counter values
+    """
+
+    def __init__(self, name, documentation, label_names=()):
+        """Counter constructor
+
+        Arguments:
+            name (str): metric name
+            documentation (str): metric help text
+            label_names (list): label names
+        """
+
+        self.name = name
+        self.documentation = documentation
+        self.label_names = list(label_names)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """Increment the counter for a set of label values
+
+        Arguments:
+            label_values (list): label values, in order of label names
+            amount (float): amount to increment by
+        """
+
+        with self.lock:
+            self.values[label_values] = \
+                self.values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        """Get the counter value for a set of label values
+
+        Arguments:
+            label_values (list): label values, in order of label names
+
+        Returns:
+            (float): counter value
+        """
+
+        return self.values.get(label_values, 0)
+
+    def render(self, const_labels=None):
+        """Render the counter in Prometheus text exposition format
+
+        Arguments:
+            const_labels (list): (name, value) label pairs added to all samples
+
+        Returns:
+            (list): exposition lines
+        """
+
+        lines = ["# HELP %s %s" % (self.name, self.documentation),
+                 "# TYPE %s counter" % self.name]
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append("%s%s %s" % (
+                    self.name,
+                    format_labels(self.label_names, label_values,
+                                  const_labels),
+                    format_value(value)))
+        return lines
+
+class Histogram(object):
+    """Histogram of observations with fixed buckets, by label values
+
+    Attributes:
+        name (str): metric name
+        documentation (str): metric help text
+        label_names (list): label names
+        buckets (list): sorted bucket upper bounds (excluding +Inf)
+        values (dict): [bucket counts, sum] by tuple of label values
+        lock (threading.Lock): lock guarding histogram values
+    """
+
+    def __init__(self, name, documentation, label_names=(), buckets=()):
+        """Histogram constructor
+
+        Arguments:
+            name (str): metric name
+            documentation (str): metric help text
+            label_names (list): label names
+            buckets (list): bucket upper bounds
+        """
+
+        self.name = name
+        self.documentation = documentation
+        self.label_names = list(label_names)
+        self.buckets = sorted(buckets)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Record an observation for a set of label values
+
+        Arguments:
+            value (float): observed value
+            label_values (list): label values, in order of label names
+        """
+
+        # index of the first bucket the value falls into, the final
+        # (len(buckets)) index is the +Inf bucket
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            if label_values not in self.values:
+                self.values[label_values] = [[0] * (len(self.buckets) + 1), 0]
+            counts_sum = self.values[label_values]
+            counts_sum[0][index] += 1
+            counts_sum[1] += value
+
+    def get_count(self, *label_values):
+        """Get the number of observations for a set of label values
+
+        Arguments:
+            label_values (list): label values, in order of label names
+
+        Returns:
+            (int): number of observations
+        """
+
+        if label_values not in self.values:
+            return 0
+        return sum(self.values[label_values][0])
+
+    def render(self, const_labels=None):
+        """Render the histogram in Prometheus text exposition format
+
+        Arguments:
+            const_labels (list): (name, value) label pairs added to all samples
+
+        Returns:
+            (list): exposition lines
+        """
+
+        lines = ["# HELP %s %s" % (self.name, self.documentation),
+                 "# TYPE %s histogram" % self.name]
+        const_labels = const_labels or []
+        bounds = self.buckets + [float("inf")]
+        with self.lock:
+            for label_values, (counts, total) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    lines.append("%s_bucket%s %s" % (
+                        self.name,
+                        format_labels(self.label_names, label_values,
+                                      const_labels
+                                      + [("le", format_value(bound))]),
+                        cumulative))
+                labels = format_labels(self.label_names, label_values,
+                                       const_labels)
+                lines.append("%s_sum%s %s" % (self.name, labels,
+                                              format_value(total)))
+                lines.append("%s_count%s %s" % (self.name, labels, cumulative))
+        return lines
+
+class Registry(object):
+    """Collection of metrics, rendered together
+
+    Attributes:
+        metrics (list): registered metrics
+        collectors (list): functions returning additional exposition lines,
+            called at render time
+        const_labels (list): (name, value) label pairs added to all samples
+            of registered metrics
+    """
+
+    def __init__(self, const_labels=None):
+        """Registry constructor
+
+        Arguments:
+            const_labels (list): (name, value) label pairs added to all
+                samples of registered metrics
+        """
+
+        self.metrics = []
+        self.collectors = []
+        self.const_labels = list(const_labels or [])
+
+    def set_const_labels(self, const_labels):
+        """Set the label pairs added to all samples of registered metrics
+
+        Arguments:
+            const_labels (list): (name, value) label pairs
+        """
+
+        self.const_labels = list(const_labels)
+
+    def register(self, metric):
+        """Register a metric
+
+        Arguments:
+            metric (Counter|Histogram): metric to register
+
+        Returns:
+            (Counter|Histogram): the registered metric
+        """
+
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """Register a function returning exposition lines at render time
+
+        Collectors format their own samples, and should add the registry's
+        constant labels to them.
+
+        Arguments:
+            collector (function): function returning list of exposition lines
+        """
+
+        self.collectors.append(collector)
+
+    def render(self):
+        """Render all metrics in Prometheus text exposition format
+
+        Returns:
+            (str): exposition text
+        """
+
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render(self.const_labels)
+        for collector in self.collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
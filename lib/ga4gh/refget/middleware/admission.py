@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Converts proxied fetches rejected by admission control to error responses"""
+
+from ga4gh.refget.config.exceptions import RefgetOverloadedException
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+
+class AdmissionMW(object):
+    """Middleware, sets the response to SERVICE UNAVAILABLE when the server is
+    overloaded
+
+    Upstream fetches of proxied subsequences are admitted within process-wide
+    limits (see ga4gh.refget.util.admission_control). If a fetch made by the
+    refget function is rejected, the response is set to SERVICE UNAVAILABLE,
+    with a 'Retry-After' header, so the client retries later rather than the
+    request being queued
+
+    Attributes:
+        properties (Properties): runtime properties
+        request (Request): generic refget request
+        response (Response): modifiable refget generic response
+    """
+
+    def __init__(self, properties, request, response):
+        """AdmissionMW constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+            request (Request): generic refget request
+            response (Response): modifiable refget generic response
+        """
+
+        self.properties = properties
+        self.request = request
+        self.response = response
+
+    def reject(self, exception):
+        """Set the response to SERVICE UNAVAILABLE
+
+        Arguments:
+            exception (RefgetOverloadedException): rejection of the fetch
+        """
+
+        body_stream = self.response.get_body_stream()
+        if hasattr(body_stream, "close"):
+            body_stream.close()
+        self.response.set_body_stream(None)
+        for key in ["Content-Length", "Content-Range"]:
+            self.response.remove_header(key)
+        self.response.set_error(SC.SERVICE_UNAVAILABLE,
+                                exception.get_message())
+        self.response.put_header(
+            "Retry-After", str(self.properties.get("server.retry_after")))
+
+def AdmissionMidware(properties, request, response):
+    """Creates the admission middleware decorator function
+
+    Arguments:
+        properties (Properties): runtime properties
+        request (Request): generic refget request
+        response (Response): modifiable, generic refget response
+
+    Returns:
+        (function): admission middleware decorator function
+    """
+
+    def decorator_function(func):
+        def wrapper(properties, request, response):
+            # execute inner function. if any proxied fetch was rejected, the
+            # response is replaced by an error response
+            try:
+                return func(properties, request, response)
+            except RefgetOverloadedException as e:
+                AdmissionMW(properties, request, response).reject(e)
+                return response
+        return wrapper
+    return decorator_function
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""Sets HTTP caching headers, and answers conditional requests
+
+Refget sequences and metadata are addressed by their checksum, so the
+representation returned for a given request never changes. Successful and
+redirect responses are marked as cacheable (immutable, for checksum-addressed
+routes), so that CDNs and client caches can serve repeat requests. The ETag of
+a response is derived from the request alone (route, sequence id, subsequence
+parameters, and negotiated media type and content encoding), so conditional
+requests with a matching ETag are answered with NOT MODIFIED before any
+upstream request is made. Conditions that match any representation
+('If-None-Match: *', 'If-Modified-Since') are only evaluated once the route
+has returned a successful response, so that invalid requests still fail.
+
+Redirects to urls that expire (e.g. presigned S3 urls) are cached for at most
+half the url's validity, and carry no ETag, so that an expired redirect is
+never revalidated.
+"""
+
+import email.utils
+import hashlib
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.middleware.compression import CompressionMW
+
+LAST_MODIFIED = "Thu, 01 Jan 1970 00:00:00 GMT"
+"""Last-Modified date of checksum-addressed responses, which never change"""
+
+CACHEABLE_STATUS_CODES = {SC.OK, SC.PARTIAL_CONTENT, SC.REDIRECT_FOUND}
+"""Status codes of responses that are marked as cacheable"""
+
+SUCCESSFUL_STATUS_CODES = {SC.OK, SC.PARTIAL_CONTENT}
+"""Status codes of responses that conditional requests are evaluated against,
+once the route has returned"""
+
+class CachingMW(object):
+    """Middleware, answers conditional requests and sets caching headers
+
+    Attributes:
+        properties (Properties): runtime properties
+        request (Request): generic refget request
+        response (Response): modifiable, generic refget response
+        representation (list): strings identifying the route representation,
+            in addition to the request
+        max_age (int): time (in seconds) responses may be cached for
+        immutable (bool): whether responses are checksum-addressed, and never
+            change
+    """
+
+    def __init__(self, properties, request, response, representation,
+                 max_age, immutable):
+        """CachingMW constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+            request (Request): generic refget request
+            response (Response): modifiable, generic refget response
+            representation (list): strings identifying the route
+                representation, in addition to the request
+            max_age (int): time (in seconds) responses may be cached for
+            immutable (bool): whether responses are checksum-addressed, and
+                never change
+        """
+
+        self.properties = properties
+        self.request = request
+        self.response = response
+        self.representation = representation
+        self.max_age = max_age
+        self.immutable = immutable
+
+    def get_request_header(self, name):
+        """Get a request header, of any letter case
+
+        Arguments:
+            name (str): header name
+
+        Returns:
+            (str): header value, or None if not present
+        """
+
+        headers = self.request.get_headers()
+        for key in headers.keys():
+            if key.lower() == name.lower():
+                return headers[key]
+        return None
+
+    def get_etag(self):
+        """Get the entity tag of the response, derived from the request
+
+        Returns:
+            (str): quoted, strong entity tag
+        """
+
+        encoding = CompressionMW(self.properties, self.request,
+                                 self.response).negotiate()
+        parts = self.representation + [
+            self.request.get_path_param("seqid"),
+            self.request.get_query_param("start"),
+            self.request.get_query_param("end"),
+            self.get_request_header("Range"),
+            self.get_request_header("Accept"),
+            encoding
+        ]
+        key = "\n".join("" if p is None else str(p) for p in parts)
+        return '"%s"' % hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    def get_if_none_match_tags(self):
+        """Get the entity tags listed in the If-None-Match request header
+
+        Returns:
+            (list): listed entity tags, without weak indicators (as
+                If-None-Match uses weak comparison), or None if the header is
+                not present
+        """
+
+        if_none_match = self.get_request_header("If-None-Match")
+        if if_none_match is None:
+            return None
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return [t[2:] if t.startswith("W/") else t for t in tags]
+
+    def matches_etag(self, etag):
+        """Check whether the request lists the response's entity tag, so the
+        client's cached response is valid without executing the route
+
+        Arguments:
+            etag (str): entity tag of the response
+
+        Returns:
+            (bool): True if If-None-Match lists the entity tag
+        """
+
+        tags = self.get_if_none_match_tags()
+        return tags is not None and etag in tags
+
+    def is_not_modified(self, etag):
+        """Check whether a conditional request's cached response is valid,
+        once the route has returned a successful response
+
+        If-None-Match takes precedence over If-Modified-Since, which is only
+        evaluated for immutable responses
+
+        Arguments:
+            etag (str): entity tag of the response
+
+        Returns:
+            (bool): True if the client's cached response is still valid
+        """
+
+        tags = self.get_if_none_match_tags()
+        if tags is not None:
+            return "*" in tags or etag in tags
+
+        if_modified_since = self.get_request_header("If-Modified-Since")
+        if self.immutable and if_modified_since is not None:
+            try:
+                email.utils.parsedate_to_datetime(if_modified_since)
+                return True
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def set_caching_headers(self, etag):
+        """Mark the response as cacheable
+
+        Arguments:
+            etag (str): entity tag of the response
+        """
+
+        cache_control = "public, max-age=%d" % self.max_age
+        if self.immutable:
+            cache_control += ", immutable"
+            self.response.put_header("Last-Modified", LAST_MODIFIED)
+        self.response.put_header("Cache-Control", cache_control)
+        self.response.put_header("ETag", etag)
+
+    def set_expiring_redirect_caching_headers(self, url_ttl):
+        """Mark a redirect to an expiring url as cacheable, until half of the
+        url's validity has passed
+
+        Arguments:
+            url_ttl (int): time (in seconds) the redirect url is valid for
+        """
+
+        max_age = max(min(self.max_age, url_ttl // 2), 0)
+        self.response.put_header("Cache-Control",
+                                 "public, max-age=%d" % max_age)
+
+    def set_not_modified(self, etag):
+        """Set the response to NOT MODIFIED, with an empty body
+
+        Any body (or body stream) set by the route is discarded
+
+        Arguments:
+            etag (str): entity tag of the response
+        """
+
+        body_stream = self.response.get_body_stream()
+        if hasattr(body_stream, "close"):
+            body_stream.close()
+        self.response.set_body_stream(None)
+        for key in ["Content-Length", "Content-Range", "Content-Encoding"]:
+            self.response.remove_header(key)
+        self.response.set_status_code(SC.NOT_MODIFIED)
+        self.response.set_body("")
+        self.response.put_header("Vary", "Accept-Encoding")
+        self.set_caching_headers(etag)
+
+def CachingMidware(properties, request, response, representation,
+                   immutable=True):
+    """Creates the caching middleware decorator function
+
+    Arguments:
+        properties (Properties): runtime properties
+        request (Request): generic refget request
+        response (Response): modifiable, generic refget response
+        representation (list): strings identifying the route representation,
+            in addition to the request (e.g. the route name)
+        immutable (bool): whether responses are checksum-addressed, and never
+            change. Responses that may change are cached for at most
+            'server.cache_max_age_mutable' seconds
+
+    Returns:
+        (function): caching middleware decorator function
+    """
+
+    max_age = int(properties.get("server.cache_max_age"))
+    if not immutable:
+        max_age = min(max_age,
+                      int(properties.get("server.cache_max_age_mutable")))
+
+    def decorator_function(func):
+        def wrapper(properties, request, response):
+            if max_age <= 0:
+                return func(properties, request, response)
+
+            # answer requests listing the entity tag before executing inner
+            # function, other conditions once the response is successful,
+            # then mark successful and redirect responses as cacheable
+            middleware = CachingMW(properties, request, response,
+                                   representation, max_age, immutable)
+            etag = middleware.get_etag()
+            if middleware.matches_etag(etag):
+                middleware.set_not_modified(etag)
+                return response
+            func(properties, request, response)
+            status_code = response.get_status_code()
+            if status_code not in CACHEABLE_STATUS_CODES:
+                return response
+            if status_code in SUCCESSFUL_STATUS_CODES \
+                and middleware.is_not_modified(etag):
+                middleware.set_not_modified(etag)
+                return response
+            url_ttl = get_datasource(properties).get_url_ttl() \
+                if status_code == SC.REDIRECT_FOUND else None
+            if url_ttl is None:
+                middleware.set_caching_headers(etag)
+            else:
+                middleware.set_expiring_redirect_caching_headers(url_ttl)
+            return response
+        return wrapper
+    return decorator_function
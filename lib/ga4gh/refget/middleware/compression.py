@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Compresses response bodies according to the request Accept-Encoding"""
+
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.util.content_encoding import compress_body, \
+    compress_stream, negotiate_encoding
+
+class CompressionMW(object):
+    """Middleware, compresses the completed response body
+
+    CompressionMW negotiates a content encoding from the "Accept-Encoding"
+    header of the request, and compresses successful (OK) response bodies at
+    least 'server.compression_min_size' bytes long. Streamed bodies are
+    compressed chunk by chunk as they are streamed. Error, redirect, and
+    partial content responses are never compressed
+
+    Attributes:
+        properties (Properties): runtime properties
+        request (Request): generic refget request
+        response (Response): modifiable, generic refget response
+    """
+
+    def __init__(self, properties, request, response):
+        """CompressionMW constructor
+
+        Arguments:
+            properties (Properties): runtime properties
+            request (Request): generic refget request
+            response (Response): modifiable, generic refget response
+        """
+
+        self.properties = properties
+        self.request = request
+        self.response = response
+
+    def get_accept_encoding(self):
+        """Get the request Accept-Encoding header, of any letter case
+
+        Returns:
+            (str): Accept-Encoding header value, or None if not present
+        """
+
+        headers = self.request.get_headers()
+        for key in headers.keys():
+            if key.lower() == "accept-encoding":
+                return headers[key]
+        return None
+
+    def get_body_size(self):
+        """Get the size of the uncompressed response body
+
+        Returns:
+            (int): body size in bytes, or None if unknown (streamed body
+                without Content-Length)
+        """
+
+        if self.response.is_streamed():
+            headers = self.response.get_headers()
+            if "Content-Length" not in headers:
+                return None
+            return int(headers["Content-Length"])
+        return len(self.response.get_body())
+
+    def negotiate(self):
+        """Negotiate the content encoding of the response
+
+        Returns:
+            (str): content encoding accepted by the client and offered by the
+                server, or None if the response should not be compressed
+        """
+
+        preferred = [e.strip() for e in self.properties.get(
+            "server.compression_encodings").split(",") if e.strip()]
+        return negotiate_encoding(self.get_accept_encoding(), preferred)
+
+    def compress(self):
+        """Compress the response body, if negotiated"""
+
+        if self.response.get_status_code() != SC.OK:
+            return
+
+        # the response varies by Accept-Encoding, whether or not this
+        # particular response is compressed
+        self.response.put_header("Vary", "Accept-Encoding")
+
+        encoding = self.negotiate()
+        body_size = self.get_body_size()
+        min_size = int(self.properties.get("server.compression_min_size"))
+        if encoding is None or body_size is None or body_size < min_size:
+            return
+
+        self.response.put_header("Content-Encoding", encoding)
+        if self.response.is_streamed():
+            # compressed length is unknown until the stream is exhausted
+            self.response.remove_header("Content-Length")
+            self.response.set_body_stream(compress_stream(
+                self.response.get_body_stream(), encoding))
+        else:
+            body = self.response.get_body()
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            body = compress_body(body, encoding)
+            self.response.set_body(body)
+            if "Content-Length" in self.response.get_headers():
+                self.response.put_header("Content-Length", len(body))
+
+def CompressionMidware(properties, request, response):
+    """Creates the compression middleware decorator function
+
+    Arguments:
+        properties (Properties): runtime properties
+        request (Request): generic refget request
+        response (Response): modifiable, generic refget response
+
+    Returns:
+        (function): compression middleware decorator function
+    """
+
+    def decorator_function(func):
+        def wrapper(properties, request, response):
+            # execute inner function, then compress the completed response
+            func(properties, request, response)
+            CompressionMW(properties, request, response).compress()
+            return response
+        return wrapper
+    return decorator_function
@@ -2,11 +2,10 @@
 """Checks that query string parameters and/or headers are set correctly"""
 
 import json
-import re
-import requests
 from ga4gh.refget.config.constants import *
+from ga4gh.refget.datasource.metadata import get_sequence_length
+from ga4gh.refget.http.byte_range import parse_range_header, resolve_ranges
 from ga4gh.refget.http.status_codes import StatusCodes as SC
-from ga4gh.refget.util.resolve_url import resolve_metadata_url
 
 class QueryParametersMW(object):
     """Middleware, checks request for correct and appropriate query parameters
@@ -42,7 +41,11 @@ class QueryParametersMW(object):
         # start indicates subseq start
         # end indicates subseq end
         # subseq-type indicates whether subseq requested by Range or start/end
-        starting_data = {"start": None, "end": None, "subseq-type": None}
+        # length indicates full sequence length, once retrieved from metadata
+        # range-specs indicates the byte range specs of the Range header
+        # ranges indicates the satisfiable [start, end) coords of range-specs
+        starting_data = {"start": None, "end": None, "subseq-type": None,
+                         "length": None, "range-specs": None, "ranges": None}
         self.response.update_data(starting_data)
         self.__check_supplied_params()
 
@@ -52,7 +55,8 @@ class QueryParametersMW(object):
             self.__get_subseq_coords,
             self.__check_datatype,
             self.__check_datarange,
-            self.__check_noncircular
+            self.__check_noncircular,
+            self.__check_subsequence_limit
         ]
 
         # if subseq parameters have been specified (and are so far OK), iterate
@@ -117,16 +121,19 @@ class QueryParametersMW(object):
             start = self.request.get_query_param("start")
             end = self.request.get_query_param("end")
 
-        # if subseq-type is 'range', then set base start and end according to
-        # values in Range header. If Range header does not match expected 
-        # format/regex, this is a BAD REQUEST
+        # if subseq-type is 'range', then parse the byte range specs of the
+        # Range header (closed, open-ended, or suffix ranges, one or more), and
+        # set base start and end according to the first spec. If Range header
+        # does not match expected format, this is a BAD REQUEST
         elif subseq_type == "range":
             range_header = self.request.get_header("Range")
-            range_pattern = re.compile("bytes=(\d+)-(\d+)")
-            range_match = range_pattern.search(range_header)
-            if range_match:
-                start = range_match.group(1)
-                end = range_match.group(2)
+            range_specs = parse_range_header(range_header)
+            if range_specs:
+                self.response.put_data("range-specs", range_specs)
+                first, last = range_specs[0]
+                if first is not None:
+                    start = str(first)
+                    end = None if last is None else str(last)
             else:
                 self.response.set_error(SC.BAD_REQUEST, "Invalid 'Range' header")
         
@@ -172,19 +179,34 @@ class QueryParametersMW(object):
         """
 
         try:
-            # get sequence length from metadata object stored on S3
+            # get sequence length from metadata object stored on S3 (or from
+            # the metadata cache, if previously retrieved)
             seqid = self.request.get_path_param("seqid")
-            metadata_url = resolve_metadata_url(self.properties, seqid)
-            metadata_response = requests.get(metadata_url)
-            if not SC.is_successful_code(metadata_response.status_code):
+            status_code, seq_length = \
+                get_sequence_length(self.properties, seqid)
+            if seq_length is None:
                 self.response.set_error(
-                    metadata_response.status_code,
+                    status_code,
                     "sequence %s not found" % seqid
                 )
                 raise Exception("Metadata for object not found")
+            self.response.put_data("length", seq_length)
 
-            metadata_json = metadata_response.json()
-            seq_length = int(metadata_json["metadata"]["length"])
+            # if subseq specified by 'Range' header, then resolve each byte
+            # range spec against the sequence length. at least one range MUST
+            # start before the end of the sequence
+            subseq_type = self.response.get_datum("subseq-type")
+            if subseq_type == "range":
+                ranges = resolve_ranges(
+                    self.response.get_datum("range-specs"), seq_length)
+                if ranges:
+                    self.response.put_data("ranges", ranges)
+                else:
+                    self.response.set_error(
+                        SC.REQUESTED_RANGE_NOT_SATISFIABLE,
+                        "Invalid sequence range provided"
+                    )
+                return
 
             # perform range checking on both start (if specified) 
             # and end (if specified)
@@ -197,12 +219,6 @@ class QueryParametersMW(object):
             # parameter violates the acceptable range, and response status code
             # set to REQUEST RANGE NOT SATISFIABLE
             comparator_dict = {
-                "range": { # if subseq specified by 'Range' header, then
-                    "start": lambda val, seqlen: int(val) >= seqlen,
-                        # start base MUST be LESS THAN sequence length
-                    "end": lambda val, seqlen: False
-                        # any end base is acceptable
-                },
                 "start-end": { # if subseq specified by start/end parameters, 
                                # then
                     "start": lambda val, seqlen: int(val) >= seqlen,
@@ -212,7 +228,6 @@ class QueryParametersMW(object):
                 }
             }
 
-            subseq_type = self.response.get_datum("subseq-type")
             for key in keys:
                 val = val_dict[key]
                 if val:
@@ -243,15 +258,44 @@ class QueryParametersMW(object):
             [self.response.get_datum(a) for a in ["start", "end", "subseq-type"]]
         
         # if request start is greater than end, set the response status code
-        # to an error code
-        if start and end:
-            if int(start) > int(end):
+        # to an error code. every closed byte range of the Range header is
+        # checked
+        bounds = [[start, end]]
+        if subseq_type == "range":
+            bounds = [[str(first), str(last)] for first, last
+                      in self.response.get_datum("range-specs")
+                      if first is not None and last is not None]
+        for start, end in bounds:
+            if start and end and int(start) > int(end):
                 self.response.set_error(
                     status_codes[subseq_type],
                     "server DOES NOT support circular sequences, end MUST be "
                     + "higher than start"
                 )
 
+    def __check_subsequence_limit(self):
+        """Check requested subsequence does not exceed the subsequence limit
+
+        Subsequences requested by start/end are read by the server, so their
+        length is limited by the 'server.subsequence_limit' property (as
+        advertised in service info). If the subsequence is longer, the response
+        status code will be set to REQUESTED RANGE NOT SATISFIABLE
+        """
+
+        limit = int(self.properties.get("server.subsequence_limit"))
+        start, end, subseq_type, length = [self.response.get_datum(a) \
+            for a in ["start", "end", "subseq-type", "length"]]
+
+        if limit and subseq_type == "start-end":
+            start_idx = int(start) if start else 0
+            end_idx = int(end) if end else length
+            if end_idx - start_idx > limit:
+                self.response.set_error(
+                    SC.REQUESTED_RANGE_NOT_SATISFIABLE,
+                    "requested subsequence exceeds the subsequence limit "
+                    + "of %d" % limit
+                )
+
 def QueryParametersMidware(properties, request, response):
     """Creates the query parameter middleware decorator function
 
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Converts plain sequence objects to 2-bit packed sequence objects offline
+
+Sequence objects are read from a local directory tree (e.g. a mirror of the
+datasource sequence objects), and each is written as a packed sequence object
+under the same relative path in the output directory tree, so that the packed
+objects can be served with the same 'source.sequence_path' template. Files
+that are not plain sequence objects are skipped.
+"""
+
+import click
+import os
+import re
+import sys
+from ga4gh.refget.config.logger import logger
+from ga4gh.refget.packed.twobit import encode_sequence
+
+SEQUENCE_PATTERN = re.compile(rb"[A-Za-z*-]*")
+"""Matches the contents of a plain sequence object"""
+
+def convert_file(input_file, output_file):
+    """Convert a plain sequence object to a packed sequence object
+
+    Arguments:
+        input_file (str): path to plain sequence object
+        output_file (str): path to output packed sequence object
+
+    Returns:
+        (bool): True if the object was converted, False if the input file is
+            not a plain sequence object
+    """
+
+    with open(input_file, "rb") as fh:
+        seq = fh.read()
+    if not SEQUENCE_PATTERN.fullmatch(seq):
+        return False
+
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_file, "wb") as fh:
+        fh.write(encode_sequence(seq))
+    return True
+
+def convert_dir(sequence_dir, output_dir):
+    """Convert all plain sequence objects in a directory tree
+
+    Arguments:
+        sequence_dir (str): root directory of plain sequence objects
+        output_dir (str): root directory of output packed sequence objects
+
+    Returns:
+        (list): number of objects converted, total size (in bytes) of plain
+            objects, and total size of packed objects
+    """
+
+    n_converted, plain_bytes, packed_bytes = 0, 0, 0
+    for dirpath, dirnames, filenames in os.walk(sequence_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            input_file = os.path.join(dirpath, filename)
+            output_file = os.path.join(
+                output_dir, os.path.relpath(input_file, sequence_dir))
+            if convert_file(input_file, output_file):
+                n_converted += 1
+                plain_bytes += os.path.getsize(input_file)
+                packed_bytes += os.path.getsize(output_file)
+    return [n_converted, plain_bytes, packed_bytes]
+
+@click.command()
+@click.option('--sequence-dir', required=True,
+              type=click.Path(exists=True, file_okay=False),
+              help='Root directory of plain sequence objects')
+@click.option('--output-dir', required=True,
+              type=click.Path(file_okay=False),
+              help='Root directory of output packed sequence objects')
+def run_converter(**kwargs):
+    """Convert plain sequence objects to 2-bit packed sequence objects
+
+    Arguments:
+        kwargs (dict): dictionary of commandline options
+    """
+
+    n_converted, plain_bytes, packed_bytes = convert_dir(
+        kwargs["sequence_dir"], kwargs["output_dir"])
+    logger.info("converted %d sequence objects to %s (%d bytes to %d bytes)"
+                % (n_converted, kwargs["output_dir"], plain_bytes,
+                   packed_bytes))
+    if n_converted == 0:
+        sys.exit(1)
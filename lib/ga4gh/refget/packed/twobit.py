@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""2-bit packed sequence format, storing each base in 2 bits
+
+A packed sequence object stores A, C, G, and T as 2-bit codes, four bases per
+byte, so objects are a quarter of the size of plain (one byte per base)
+sequence objects. Runs of any other character (e.g. N blocks, or other IUPAC
+ambiguity codes) are stored in an ambiguity run table, and runs of lowercase
+(soft-masked) bases in a mask run table, so that packing is lossless.
+
+The packed object is laid out as:
+    header: magic (4 bytes), format version (uint32), sequence length
+        (uint64), number of ambiguity runs (uint32), number of mask runs
+        (uint32)
+    ambiguity run table: start (uint64), length (uint32), character (1 byte),
+        3 padding bytes, per run
+    mask run table: start (uint64), length (uint64), per run
+    packed bases: 4 bases per byte, first base in the most significant bits,
+        codes A=0, C=1, G=2, T=3 (ambiguous positions are packed as A)
+
+All integers are little-endian. Runs are ordered by start, and do not overlap.
+The header and run tables (the index) precede the packed bases, so that any
+subsequence can be decoded from the index and the packed bytes covering it.
+
+Decoding is vectorized with NumPy if it is installed, otherwise an equivalent
+table-based method is used (byte translation and strided slice assignment).
+"""
+
+import bisect
+import re
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b"RG2B"
+"""Magic bytes identifying a packed sequence object"""
+
+VERSION = 1
+"""Packed sequence format version"""
+
+HEADER = struct.Struct("<4sIQII")
+"""Packed sequence header: magic, version, sequence length, number of
+ambiguity runs, number of mask runs"""
+
+AMBIGUITY_RUN = struct.Struct("<QIc3x")
+"""Ambiguity run table record: start, length, character"""
+
+MASK_RUN = struct.Struct("<QQ")
+"""Mask run table record: start, length"""
+
+MAX_AMBIGUITY_RUN_LENGTH = 0xFFFFFFFF
+"""Maximum length of a single ambiguity run, longer runs are split"""
+
+BASES = b"ACGT"
+"""Bases, in order of their 2-bit codes"""
+
+SHIFTS = [6, 4, 2, 0]
+"""Bit shift of the 2-bit code of each of the four bases in a packed byte"""
+
+AMBIGUITY_PATTERN = re.compile(rb"([^ACGT])\1*")
+"""Matches runs of a single non-ACGT character, in uppercased sequence"""
+
+MASK_PATTERN = re.compile(rb"[a-z]+")
+"""Matches runs of lowercase (soft-masked) bases"""
+
+ENCODE_TABLE = bytes(BASES.index(c) if c in BASES else 0 for c in range(256))
+"""Translation table of uppercase characters to 2-bit codes"""
+
+SHIFT_TABLES = [bytes((c << s) & 0xFF for c in range(256)) for s in SHIFTS]
+"""Translation tables of 2-bit codes to their position in a packed byte"""
+
+UNPACK_TABLES = [bytes(BASES[(c >> s) & 3] for c in range(256))
+                 for s in SHIFTS]
+"""Translation tables of packed bytes to the base at each position"""
+
+UNPACK_LUT = None if numpy is None else numpy.frombuffer(
+    bytes(BASES[(c >> s) & 3] for c in range(256) for s in SHIFTS),
+    dtype=numpy.uint8).reshape(256, 4)
+"""Lookup table of packed bytes to their four bases, if NumPy is installed"""
+
+def pack_bases(upper):
+    """Pack uppercase bases into 2-bit codes, four bases per byte
+
+    Arguments:
+        upper (bytes): uppercase sequence, non-ACGT characters are packed as A
+
+    Returns:
+        (bytes): packed bases
+    """
+
+    codes = upper.translate(ENCODE_TABLE)
+    codes += b"\0" * (-len(codes) % 4)
+    if numpy is not None:
+        arr = numpy.frombuffer(codes, dtype=numpy.uint8).reshape(-1, 4)
+        packed = (arr[:, 0] << 6) | (arr[:, 1] << 4) | (arr[:, 2] << 2) \
+            | arr[:, 3]
+        return packed.astype(numpy.uint8).tobytes()
+
+    # combine the shifted codes of each position with big integer OR
+    n_bytes = len(codes) // 4
+    value = 0
+    for position in range(4):
+        value |= int.from_bytes(
+            codes[position::4].translate(SHIFT_TABLES[position]), "big")
+    return value.to_bytes(n_bytes, "big")
+
+def unpack_bases(packed):
+    """Unpack 2-bit codes into uppercase bases
+
+    Arguments:
+        packed (bytes-like): packed bases
+
+    Returns:
+        (bytearray): four bases per packed byte
+    """
+
+    if numpy is not None:
+        arr = numpy.frombuffer(packed, dtype=numpy.uint8)
+        return bytearray(UNPACK_LUT[arr].ravel())
+
+    packed = bytes(packed)
+    bases = bytearray(len(packed) * 4)
+    for position in range(4):
+        bases[position::4] = packed.translate(UNPACK_TABLES[position])
+    return bases
+
+def encode_sequence(seq):
+    """Encode a plain sequence as a packed sequence object
+
+    Arguments:
+        seq (bytes): plain sequence, one byte per base
+
+    Returns:
+        (bytes): packed sequence object
+    """
+
+    upper = seq.upper()
+    ambiguity_runs = []
+    for match in AMBIGUITY_PATTERN.finditer(upper):
+        start, end = match.span()
+        for run_start in range(start, end, MAX_AMBIGUITY_RUN_LENGTH):
+            ambiguity_runs.append(AMBIGUITY_RUN.pack(
+                run_start, min(end - run_start, MAX_AMBIGUITY_RUN_LENGTH),
+                match.group(1)))
+    mask_runs = [MASK_RUN.pack(match.start(), match.end() - match.start())
+                 for match in MASK_PATTERN.finditer(seq)]
+
+    header = HEADER.pack(MAGIC, VERSION, len(seq), len(ambiguity_runs),
+                         len(mask_runs))
+    return b"".join([header] + ambiguity_runs + mask_runs
+                    + [pack_bases(upper)])
+
+def get_index_size(data):
+    """Get the size of a packed sequence object's index
+
+    Arguments:
+        data (bytes-like): the first bytes of a packed sequence object,
+            including at least the header
+
+    Returns:
+        (int): size of header and run tables (i.e. the offset of the packed
+            bases) in bytes, or None if the data is not a packed sequence
+    """
+
+    if len(data) < HEADER.size:
+        return None
+    magic, version, length, n_ambiguity, n_mask = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return HEADER.size + n_ambiguity * AMBIGUITY_RUN.size \
+        + n_mask * MASK_RUN.size
+
+class PackedIndex(object):
+    """Index of a packed sequence object, decoding subsequences
+
+    Attributes:
+        length (int): sequence length
+        data_offset (int): byte offset of the packed bases in the object
+        ambiguity_starts (list): 0-based, inclusive start of ambiguity runs
+        ambiguity_ends (list): 0-based, exclusive end of ambiguity runs
+        ambiguity_chars (list): character of ambiguity runs
+        mask_starts (list): 0-based, inclusive start of mask runs
+        mask_ends (list): 0-based, exclusive end of mask runs
+    """
+
+    def __init__(self, data):
+        """PackedIndex constructor
+
+        Arguments:
+            data (bytes-like): the first bytes of a packed sequence object,
+                including at least the complete index (see get_index_size)
+        """
+
+        magic, version, self.length, n_ambiguity, n_mask = \
+            HEADER.unpack_from(data, 0)
+        self.data_offset = get_index_size(data)
+
+        ambiguity_end = HEADER.size + n_ambiguity * AMBIGUITY_RUN.size
+        ambiguity_runs = list(AMBIGUITY_RUN.iter_unpack(
+            data[HEADER.size:ambiguity_end]))
+        self.ambiguity_starts = [run[0] for run in ambiguity_runs]
+        self.ambiguity_ends = [run[0] + run[1] for run in ambiguity_runs]
+        self.ambiguity_chars = [run[2] for run in ambiguity_runs]
+
+        mask_runs = list(MASK_RUN.iter_unpack(
+            data[ambiguity_end:self.data_offset]))
+        self.mask_starts = [run[0] for run in mask_runs]
+        self.mask_ends = [run[0] + run[1] for run in mask_runs]
+
+    def get_packed_range(self, start, end):
+        """Get the byte range of the packed bases covering a subsequence
+
+        Arguments:
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end
+
+        Returns:
+            (list): 0-based, inclusive byte start and exclusive byte end in
+                the packed object, and the position of the first base packed
+                in the byte range
+        """
+
+        return [self.data_offset + start // 4,
+                self.data_offset + (end + 3) // 4,
+                start - start % 4]
+
+    def decode(self, packed, first_base, start, end):
+        """Decode a subsequence from the packed bytes covering it
+
+        Arguments:
+            packed (bytes-like): packed bytes, beginning with the byte
+                containing first_base
+            first_base (int): position of the first base in packed, a multiple
+                of 4
+            start (int): 0-based, inclusive subsequence start
+            end (int): 0-based, exclusive subsequence end
+
+        Returns:
+            (bytes): decoded subsequence
+        """
+
+        bases = unpack_bases(packed)[start - first_base:end - first_base]
+
+        index = bisect.bisect_right(self.ambiguity_ends, start)
+        while index < len(self.ambiguity_starts) \
+            and self.ambiguity_starts[index] < end:
+            run_start = max(self.ambiguity_starts[index], start)
+            run_end = min(self.ambiguity_ends[index], end)
+            bases[run_start - start:run_end - start] = \
+                self.ambiguity_chars[index] * (run_end - run_start)
+            index += 1
+
+        index = bisect.bisect_right(self.mask_ends, start)
+        while index < len(self.mask_starts) and self.mask_starts[index] < end:
+            run_start = max(self.mask_starts[index], start) - start
+            run_end = min(self.mask_ends[index], end) - start
+            bases[run_start:run_end] = bases[run_start:run_end].lower()
+            index += 1
+
+        return bytes(bases)
+
+def decode_sequence(data):
+    """Decode a complete packed sequence object
+
+    Arguments:
+        data (bytes-like): packed sequence object
+
+    Returns:
+        (bytes): plain sequence, one byte per base, or None if the data is not
+            a packed sequence object
+    """
+
+    index_size = get_index_size(data)
+    if index_size is None or len(data) < index_size:
+        return None
+    index = PackedIndex(data)
+    return index.decode(data[index.data_offset:], 0, 0, index.length)
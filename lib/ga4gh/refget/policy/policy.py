@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Size-aware policy deciding whether sequence requests are proxied or
+redirected
+
+Redirecting a client to the datasource costs the client a second round trip,
+while proxying costs the server the transfer of the sequence bytes. Small
+sequences and subsequences (e.g. mitochondria, plasmids, viral genomes) are
+therefore proxied, and large ones redirected, based on the known sequence
+length (from the sequence catalog or metadata) and the requested span.
+Subsequences requested by start/end cannot be served by the datasource, and
+are always proxied, as are sequences pinned in memory.
+"""
+
+from ga4gh.refget.datasource.metadata import get_sequence_length
+from ga4gh.refget.http.byte_range import merge_ranges
+
+def should_proxy_sequence(properties, seqid):
+    """Decide whether a full sequence request is proxied
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            length of proxied full sequences under
+            'server.proxy_sequence_max_length'
+        seqid (str): requested sequence (checksum identifier)
+
+    Returns:
+        (bool): True if the sequence is known to be at or below the maximum
+            proxied length, otherwise False
+    """
+
+    max_length = int(properties.get("server.proxy_sequence_max_length"))
+    if max_length <= 0:
+        return False
+    status_code, length = get_sequence_length(properties, seqid)
+    return length is not None and length <= max_length
+
+def should_proxy_ranges(properties, ranges):
+    """Decide whether a 'Range' header request is proxied
+
+    Arguments:
+        properties (Properties): runtime properties, containing the range mode
+            under 'server.range_mode', and the maximum number of proxied
+            bases under 'server.proxy_range_max_length'
+        ranges (list): 0-based, [start, exclusive end] coordinates of each
+            satisfiable range
+
+    Returns:
+        (bool): True if ranges are always proxied, or if the ranges span at
+            most the maximum number of proxied bases, otherwise False
+    """
+
+    if properties.get("server.range_mode") == "proxy":
+        return True
+    max_length = int(properties.get("server.proxy_range_max_length"))
+    n_bases = sum(end - start for start, end in merge_ranges(ranges))
+    return n_bases <= max_length
+
+def should_proxy(properties, datasource, seqid, subseq_type, ranges):
+    """Decide whether a sequence request is proxied, or redirected
+
+    Arguments:
+        properties (Properties): runtime properties
+        datasource (DataSource): datasource serving the sequence
+        seqid (str): requested sequence (checksum identifier)
+        subseq_type (str): 'range' or 'start-end' if a subsequence was
+            requested, otherwise None
+        ranges (list): satisfiable ranges, if subseq_type is 'range'
+
+    Returns:
+        (bool): True if the request is proxied, False if the client is
+            redirected to the datasource
+    """
+
+    if subseq_type == "start-end":
+        return True
+    if datasource.is_pinned(seqid):
+        return True
+    if subseq_type == "range":
+        return should_proxy_ranges(properties, ranges)
+    return should_proxy_sequence(properties, seqid)
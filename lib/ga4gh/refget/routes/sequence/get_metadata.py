@@ -1,16 +1,28 @@
 # -*- coding: utf-8 -*-
-"""Update response to contain redirect to sequence metadata"""
+"""Update response to contain sequence metadata, directly or by redirect"""
 
-import requests
+import json
+from ga4gh.refget.catalog.catalog import resolve_seqid
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.metadata import get_metadata as \
+    get_metadata_object, is_known_seqid
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.middleware.caching import CachingMidware
+from ga4gh.refget.middleware.compression import CompressionMidware
 from ga4gh.refget.middleware.media_type import MediaTypeMidware
-from ga4gh.refget.util.resolve_url import resolve_metadata_url
 
 def get_metadata(properties, request, response):
     """Refget function, get requested sequence metadata
 
     The get_metadata function corresponds to the /sequence/{seqid}/metadata
     endpoint described in the refget API specification. First performs media
-    type validation, then returns redirect to object metadata location 
+    type validation, then either returns redirect to object metadata location,
+    or returns the metadata object directly (from cache, or retrieved from the
+    datasource), based on the 'server.metadata_mode' property. Metadata is
+    always returned directly if the datasource cannot redirect clients, and
+    compressed if the client accepts a supported content encoding. Responses
+    are marked as immutable, and conditional requests are answered with NOT
+    MODIFIED
 
     Arguments:
         properties (Properties): runtime properties
@@ -18,12 +30,33 @@ def get_metadata(properties, request, response):
         response (Response): modifiable, generic refget response
     """
 
+    @CachingMidware(properties, request, response, ["metadata"])
+    @CompressionMidware(properties, request, response)
     @MediaTypeMidware(properties, request, response)
     def worker(properties, request, response):
 
-        seqid = request.get_path_param("seqid")
-        url = resolve_metadata_url(properties, seqid)
-        value = requests.get(url).text
-        response.set_redirect_found(url)
+        # resolve the canonical sequence id if a sequence catalog is
+        # configured. unknown sequences are not found, rather than redirected
+        seqid = resolve_seqid(properties, request.get_path_param("seqid"))
+        if seqid is None or not is_known_seqid(properties, seqid):
+            response.set_error(SC.NOT_FOUND, "sequence %s not found"
+                               % request.get_path_param("seqid"))
+            return
+        url = get_datasource(properties).get_metadata_url(seqid)
+
+        # in proxy mode, the metadata object is returned in the response body
+        if properties.get("server.metadata_mode") == "proxy" or url is None:
+            status_code, metadata = get_metadata_object(properties, seqid)
+            if metadata is not None:
+                response.set_body(json.dumps(metadata))
+            else:
+                response.set_error(
+                    status_code,
+                    "sequence %s not found" % seqid
+                )
+
+        # in redirect mode, client is redirected to the datasource
+        else:
+            response.set_redirect_found(url)
 
     worker(properties, request, response)
@@ -1,14 +1,165 @@
 # -*- coding: utf-8 -*-
 """Update response to contain full/partial sequence, directly or by redirect"""
 
-import requests
+import uuid
+from ga4gh.refget.catalog.catalog import resolve_seqid
 from ga4gh.refget.config.constants import CONTENT_TYPE_TEXT_REFGET_VND, \
     CONTENT_TYPE_TEXT_VND_NEUTRAL
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.metadata import get_sequence_length, \
+    is_known_seqid
+from ga4gh.refget.http.byte_range import get_content_range, merge_ranges
 from ga4gh.refget.http.status_codes import StatusCodes as SC
 from ga4gh.refget.http.response import Response
+from ga4gh.refget.middleware.admission import AdmissionMidware
+from ga4gh.refget.middleware.caching import CachingMidware
+from ga4gh.refget.middleware.compression import CompressionMidware
 from ga4gh.refget.middleware.media_type import MediaTypeMidware
 from ga4gh.refget.middleware.query_parameters import QueryParametersMidware
-from ga4gh.refget.util.resolve_url import resolve_sequence_url
+from ga4gh.refget.policy.policy import should_proxy
+from ga4gh.refget.util.stream import ClosingStream, close_streams
+
+def set_subsequence(properties, datasource, response, seqid, start, end):
+    """Set the response body to a subsequence retrieved from the datasource
+
+    Large subsequences are streamed to the client chunk by chunk, small
+    subsequences are set as the response body directly.
+
+    Arguments:
+        properties (Properties): runtime properties
+        datasource (DataSource): datasource serving the sequence
+        response (Response): modifiable, generic refget response
+        seqid (str): requested sequence (checksum identifier)
+        start (int): 0-based, inclusive subsequence start
+        end (int): 0-based, exclusive subsequence end, or None for the
+            remainder of the sequence
+
+    Returns:
+        (bool): True if the subsequence was retrieved, otherwise False
+    """
+
+    stream_threshold = int(properties.get("server.stream_threshold"))
+    if end is not None and end - start > stream_threshold:
+        seq_stream = datasource.stream_subsequence(seqid, start, end)
+        if seq_stream is None:
+            return False
+        response.put_header("Content-Length", end - start)
+        response.set_body_stream(seq_stream)
+    else:
+        seq = datasource.get_subsequence(seqid, start, end)
+        if seq is None:
+            return False
+        response.put_header("Content-Length", len(seq))
+        response.set_body(seq)
+    return True
+
+def open_part_streams(datasource, seqid, ranges):
+    """Open a subsequence stream for each part of a multipart response
+
+    Arguments:
+        datasource (DataSource): datasource serving the sequence
+        seqid (str): requested sequence (checksum identifier)
+        ranges (list): 0-based, [start, exclusive end] coordinates of each
+            part
+
+    Returns:
+        (list): subsequence stream of each part, or None if any part could not
+            be retrieved, in which case the streams already opened are closed
+
+    Raises:
+        RefgetOverloadedException: when a part fetch is not admitted, in which
+            case the streams already opened are closed
+    """
+
+    part_streams = []
+    try:
+        for start, end in ranges:
+            seq_stream = datasource.stream_subsequence(seqid, start, end)
+            if seq_stream is None:
+                close_streams(part_streams)
+                return None
+            part_streams.append(seq_stream)
+    except Exception:
+        close_streams(part_streams)
+        raise
+    return part_streams
+
+def set_byteranges(properties, datasource, response, seqid, ranges, length):
+    """Set the response body to multiple byte ranges of a sequence
+
+    Overlapping and adjacent ranges are merged. If a single range remains, it
+    is set as the response body directly, otherwise the ranges are set as the
+    parts of a 'multipart/byteranges' body, each with its own 'Content-Range'.
+    Parts are retrieved from the datasource as for a single subsequence, and
+    streamed to the client if their total size exceeds the stream threshold,
+    in which case every part stream is opened before returning
+
+    Arguments:
+        properties (Properties): runtime properties
+        datasource (DataSource): datasource serving the sequence
+        response (Response): modifiable, generic refget response
+        seqid (str): requested sequence (checksum identifier)
+        ranges (list): 0-based, [start, exclusive end] coordinates of each
+            requested range
+        length (int): sequence length
+
+    Returns:
+        (bool): True if all ranges were retrieved, otherwise False
+    """
+
+    ranges = merge_ranges(ranges)
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        if not set_subsequence(properties, datasource, response, seqid, start,
+                               end):
+            return False
+        response.put_header("Content-Range",
+                            get_content_range(start, end, length))
+        return True
+
+    boundary = uuid.uuid4().hex
+    part_headers = [
+        "--%s\r\nContent-Type: %s\r\nContent-Range: %s\r\n\r\n" % (
+            boundary, response.get_header("Content-Type"),
+            get_content_range(start, end, length))
+        for start, end in ranges
+    ]
+    closing = "--%s--\r\n" % boundary
+    n_bases = sum(end - start for start, end in ranges)
+    content_length = n_bases + sum(len(h) + 2 for h in part_headers) \
+        + len(closing)
+
+    stream_threshold = int(properties.get("server.stream_threshold"))
+    if n_bases > stream_threshold:
+        # every part stream is opened before the response is returned, so
+        # that missing parts and rejected fetches are reported by status code
+        # rather than truncating the body. each part is then streamed in turn
+        part_streams = open_part_streams(datasource, seqid, ranges)
+        if part_streams is None:
+            return False
+
+        def iter_parts():
+            for part_header, seq_stream in zip(part_headers, part_streams):
+                yield part_header.encode("ascii")
+                for chunk in seq_stream:
+                    yield chunk
+                yield b"\r\n"
+            yield closing.encode("ascii")
+
+        response.set_body_stream(ClosingStream(iter_parts(), part_streams))
+    else:
+        parts = []
+        for part_header, (start, end) in zip(part_headers, ranges):
+            seq = datasource.get_subsequence(seqid, start, end)
+            if seq is None:
+                return False
+            parts += [part_header, seq, "\r\n"]
+        response.set_body("".join(parts + [closing]))
+
+    response.put_header("Content-Type",
+                        "multipart/byteranges; boundary=%s" % boundary)
+    response.put_header("Content-Length", content_length)
+    return True
 
 def get_sequence(properties, request, response):
     """Refget function, get requested sequence
@@ -16,47 +167,87 @@ def get_sequence(properties, request, response):
     The get_sequence function corresponds to the /sequence/{seqid}
     endpoint described in the refget API specification. First performs media
     type and query parameter validation, then returns redirect to object
-    sequence location 
+    sequence location, or returns the (sub)sequence directly, based on the
+    known sequence length and the requested span (see
+    ga4gh.refget.policy.policy). Proxied sequences are fetched within the
+    server's admission limits, and rejected if the server is overloaded.
+    Responses are marked as immutable, and conditional requests are answered
+    with NOT MODIFIED. Sequences returned directly are compressed if the
+    client accepts a supported content encoding
 
     Arguments:
         properties (Properties): runtime properties
         request (Request): generic refget request
         response (Response): modifiable, generic refget response
     """
-    
-    @MediaTypeMidware(properties, request, response, 
+
+    @CachingMidware(properties, request, response, ["sequence"])
+    @CompressionMidware(properties, request, response)
+    @AdmissionMidware(properties, request, response)
+    @MediaTypeMidware(properties, request, response,
         supported_media_types=[CONTENT_TYPE_TEXT_REFGET_VND,
                                CONTENT_TYPE_TEXT_VND_NEUTRAL])
     @QueryParametersMidware(properties, request, response)
     def worker(properties, request, response):
         # get start, end subsequence positions from middleware,
         # as well as if subsequence was requested by start/end or by Range
-        start, end, subseq_type = [response.get_datum(a) for a \
-                                   in ["start", "end", "subseq-type"]]
-        
-        # get sequence id from request and prepare URL    
-        seqid = request.get_path_param("seqid")
-        url = resolve_sequence_url(properties, seqid)
-
-        # if the full sequence has been requested OR subequence has been 
-        # specified by 'Range' header, then redirect client to datasource
-        # (assuming source can handle partial content response)
-        if subseq_type == None or subseq_type == "range": 
+        start, end, subseq_type, length, ranges = [response.get_datum(a) \
+            for a in ["start", "end", "subseq-type", "length", "ranges"]]
+
+        # get sequence id from request, resolved to the canonical id if a
+        # sequence catalog is configured, and prepare URL. if the datasource
+        # cannot redirect clients (e.g. local files), URL is None. unknown
+        # sequences are not found, rather than redirected to the datasource
+        seqid = resolve_seqid(properties, request.get_path_param("seqid"))
+        if seqid is None or not is_known_seqid(properties, seqid):
+            response.set_error(SC.NOT_FOUND, "sequence %s not found"
+                               % request.get_path_param("seqid"))
+            return
+        datasource = get_datasource(properties)
+        url = datasource.get_sequence_url(seqid)
+
+        # if a large full sequence has been requested OR a large subsequence
+        # has been specified by 'Range' header, then redirect client to
+        # datasource (assuming source can handle partial content response)
+        if url and not should_proxy(properties, datasource, seqid,
+                                    subseq_type, ranges):
             response.set_redirect_found(url)
 
+        elif subseq_type == None: # if the full sequence has been requested
+                                  # and is small, or client cannot be
+                                  # redirected, return the full sequence
+                                  # directly
+            status_code, length = get_sequence_length(properties, seqid)
+            if length is None or \
+                not set_subsequence(properties, datasource, response, seqid,
+                                    0, length):
+                response.set_error(SC.NOT_FOUND, "sequence %s not found" % seqid)
+
+        elif subseq_type == "range": # if subsequence has been specified by
+                                     # 'Range' header and is small, or client
+                                     # cannot be redirected, return the
+                                     # satisfiable byte ranges as partial
+                                     # content
+            if set_byteranges(properties, datasource, response, seqid, ranges,
+                              length):
+                response.set_status_code(SC.PARTIAL_CONTENT)
+            else:
+                response.set_error(SC.NOT_FOUND, "sequence %s not found" % seqid)
+
         elif subseq_type == "start-end": # if subsequence has been specified by
                                          # start/end query parameters, then
                                          # handle parsing subsequence here
-            datasource_response = requests.get(url)
-            # if datasource resource was successfully retrieved, continue to
-            # subsequence, otherwise redirect client to datasource url
-            if SC.is_successful_code(datasource_response.status_code):
-                seq = datasource_response.text
-                start_idx = int(start) if start else 0
-                end_idx = int(end) if end else len(seq)
-                seq = seq[start_idx:end_idx]
-                response.put_header("Content-Length", len(seq))
-                response.set_body(seq)
-            else:
-                response.set_redirect_found(url)
+            start_idx = int(start) if start else 0
+            end_idx = int(end) if end else length
+
+            # request only the subsequence bytes from the datasource. if the
+            # subsequence could not be retrieved, redirect client to
+            # datasource url
+            if not set_subsequence(properties, datasource, response, seqid,
+                                   start_idx, end_idx):
+                if url:
+                    response.set_redirect_found(url)
+                else:
+                    response.set_error(
+                        SC.NOT_FOUND, "sequence %s not found" % seqid)
     worker(properties, request, response)
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Update response to contain a batch of subsequences, fetched concurrently
+
+Each requested subsequence is validated with the same rules as a single
+/sequence/{seqid}?start=&end= request. Valid subsequences are grouped by
+sequence, nearby subsequences of the same sequence are merged into a single
+upstream window (no longer than the subsequence limit), and all windows are
+fetched from the datasource concurrently. All windows are held in memory until
+the response is assembled, so a batch whose windows exceed the in-flight byte
+limit is rejected outright.
+"""
+
+import json
+from ga4gh.refget.catalog.catalog import resolve_seqid
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.metadata import get_sequence_length
+from ga4gh.refget.http.request import Request
+from ga4gh.refget.http.response import Response
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.middleware.admission import AdmissionMidware
+from ga4gh.refget.middleware.compression import CompressionMidware
+from ga4gh.refget.middleware.media_type import MediaTypeMidware
+from ga4gh.refget.middleware.query_parameters import QueryParametersMW
+from ga4gh.refget.util.executor import get_batch_executor
+
+MAX_MERGE_GAP = 4096
+"""Maximum gap (in bases) between subsequences fetched in a single window"""
+
+def parse_batch(properties, body):
+    """Parse the subsequence requests of a batch request body
+
+    Arguments:
+        properties (Properties): runtime properties
+        body (str): batch request body, a JSON object with a 'requests' list of
+            {"seqid", "start", "end"} objects (start and end are optional).
+            seqid must be a string, start and end integers or strings
+
+    Returns:
+        (list): the list of subsequence requests, and an error message (or
+            None if the body is valid)
+    """
+
+    try:
+        items = json.loads(body)["requests"]
+    except (ValueError, TypeError, KeyError):
+        return [None, "request body must be a JSON object with a "
+                      + "'requests' list"]
+
+    if not isinstance(items, list):
+        return [None, "'requests' must be a list"]
+    for item in items:
+        if not isinstance(item, dict) or not item.get("seqid") \
+            or not isinstance(item["seqid"], str):
+            return [None, "each request must be an object with a 'seqid'"]
+        for key in ["start", "end"]:
+            value = item.get(key)
+            if isinstance(value, bool) \
+                or not isinstance(value, (int, str, type(None))):
+                return [None, "'%s' must be an integer or a string" % key]
+
+    max_size = int(properties.get("server.batch_max_size"))
+    if len(items) > max_size:
+        return [None, "batch cannot contain more than %d requests" % max_size]
+    return [items, None]
+
+def validate_item(properties, item):
+    """Validate a single subsequence request of a batch
+
+    The subsequence request is converted to a generic request, and validated
+    by the query parameters middleware exactly as a single request would be
+
+    Arguments:
+        properties (Properties): runtime properties
+        item (dict): subsequence request, with seqid, start, and end
+
+    Returns:
+        (Response): validated response, with 'start', 'end', and 'length' in
+            its data dictionary if the status code is OK
+    """
+
+    request = Request()
+    request.add_path_param("seqid", item["seqid"])
+    for key in ["start", "end"]:
+        if item.get(key) is not None:
+            request.add_query_param(key, str(item[key]))
+
+    response = Response()
+    response.set_status_code(SC.OK)
+    QueryParametersMW(properties, request, response).validate()
+
+    # a request without start/end is validated against the sequence length,
+    # and the subsequence limit, as the full sequence is returned
+    if response.get_status_code() == SC.OK \
+        and response.get_datum("length") is None:
+        status_code, length = get_sequence_length(properties, item["seqid"])
+        limit = int(properties.get("server.subsequence_limit"))
+        if length is None:
+            response.set_error(status_code,
+                               "sequence %s not found" % item["seqid"])
+        elif limit and length > limit:
+            response.set_error(
+                SC.REQUESTED_RANGE_NOT_SATISFIABLE,
+                "requested subsequence exceeds the subsequence limit of %d"
+                % limit)
+        response.put_data("length", length)
+    return response
+
+def get_windows(coords, max_length=0):
+    """Merge the subsequences of a single sequence into upstream windows
+
+    Overlapping subsequences, and subsequences separated by no more than
+    MAX_MERGE_GAP bases, are merged into a single window, unless the merged
+    window would exceed the maximum window length
+
+    Arguments:
+        coords (list): 0-based, (start, exclusive end) subsequence coordinates
+        max_length (int): maximum length of a merged window, 0 for no limit
+
+    Returns:
+        (list): 0-based, [start, exclusive end] windows, ordered by start
+    """
+
+    windows = []
+    for start, end in sorted(coords):
+        if windows and start <= windows[-1][1] + MAX_MERGE_GAP:
+            merged_end = max(windows[-1][1], end)
+            if not max_length or merged_end - windows[-1][0] <= max_length:
+                windows[-1][1] = merged_end
+                continue
+        windows.append([start, end])
+    return windows
+
+def get_sequence_batch(properties, request, response):
+    """Refget function, get a batch of requested subsequences
+
+    The get_sequence_batch function corresponds to the /sequence/batch
+    endpoint. First performs media type validation, then validates each
+    requested subsequence, and fetches all valid subsequences concurrently.
+    Results are returned in request order, each with its own status code and
+    either the subsequence or an error message. If the fetched windows exceed
+    the in-flight byte limit in total, or any upstream fetch is rejected by
+    admission control, the batch is rejected as a whole. The results are
+    compressed if the client accepts a supported content encoding
+
+    Arguments:
+        properties (Properties): runtime properties
+        request (Request): generic refget request
+        response (Response): modifiable, generic refget response
+    """
+
+    @CompressionMidware(properties, request, response)
+    @AdmissionMidware(properties, request, response)
+    @MediaTypeMidware(properties, request, response)
+    def worker(properties, request, response):
+        items, message = parse_batch(properties, request.get_body())
+        if items is None:
+            response.set_error(SC.BAD_REQUEST, message)
+            return
+
+        executor = get_batch_executor(properties)
+        datasource = get_datasource(properties)
+
+        # retrieve the length of each requested sequence concurrently, so that
+        # subsequence validation is served from the metadata cache
+        seqids = sorted(set(item["seqid"] for item in items))
+        list(executor.map(
+            lambda seqid: get_sequence_length(properties, seqid), seqids))
+
+        # validate each subsequence, and group valid subsequences by sequence
+        results = []
+        coords_by_seqid = {}
+        for item in items:
+            item_response = validate_item(properties, item)
+            result = {"seqid": item["seqid"],
+                      "status": item_response.get_status_code()}
+            if result["status"] == SC.OK:
+                start, end, length = [item_response.get_datum(a) for a \
+                    in ["start", "end", "length"]]
+                result["start"] = int(start) if start else 0
+                result["end"] = int(end) if end else length
+                result["canonical"] = resolve_seqid(properties, item["seqid"])
+                coords_by_seqid.setdefault(result["canonical"], []).append(
+                    (result["start"], result["end"]))
+            else:
+                result["message"] = \
+                    json.loads(item_response.get_body())["message"]
+            results.append(result)
+
+        # fetch all upstream windows concurrently. windows are held until
+        # the response is assembled, so their total size is bounded by the
+        # in-flight byte limit, rather than by each fetch's admission only
+        limit = int(properties.get("server.subsequence_limit"))
+        windows = [(seqid, start, end)
+                   for seqid in sorted(coords_by_seqid.keys())
+                   for start, end in get_windows(coords_by_seqid[seqid],
+                                                 limit)]
+        max_bytes = int(properties.get("server.max_inflight_bytes"))
+        n_bytes = sum(end - start for seqid, start, end in windows)
+        if max_bytes and n_bytes > max_bytes:
+            response.set_error(
+                SC.PAYLOAD_TOO_LARGE,
+                "batch subsequences exceed the in-flight byte limit of %d"
+                % max_bytes)
+            return
+        window_seqs = list(executor.map(
+            lambda window: datasource.get_subsequence(*window), windows))
+        fetched = {}
+        for (seqid, start, end), seq in zip(windows, window_seqs):
+            fetched.setdefault(seqid, []).append((start, end, seq))
+
+        # slice each subsequence out of the window containing it
+        for result in results:
+            if result["status"] != SC.OK:
+                continue
+            for start, end, seq in fetched[result.pop("canonical")]:
+                if start <= result["start"] and result["end"] <= end:
+                    break
+            if seq is None:
+                result["status"] = SC.NOT_FOUND
+                result["message"] = "sequence %s not found" % result["seqid"]
+            else:
+                result["sequence"] = \
+                    seq[result["start"] - start:result["end"] - start]
+
+        response.set_body(json.dumps({"results": results}))
+
+    worker(properties, request, response)
@@ -2,6 +2,7 @@
 """Update response to contain web service info"""
 
 import json
+from ga4gh.refget.middleware.caching import CachingMidware
 from ga4gh.refget.middleware.media_type import MediaTypeMidware
 from ga4gh.refget.config.service_info import SERVICE_INFO
 
@@ -10,7 +11,10 @@ def get_service_info(properties, request, response):
 
     The get_service_info function corresponds to the /sequence/service-info
     endpoint described in the refget API specification. First performs media
-    type validation, then returns service info object
+    type validation, then returns service info object, advertising the
+    subsequence limit enforced by the server. Service info may change between
+    deployments, so it is cached for a limited time, and its ETag is derived
+    from its content
 
     Arguments:
         properties (Properties): runtime properties
@@ -18,9 +22,14 @@ def get_service_info(properties, request, response):
         response (Response): modifiable, generic refget response
     """
 
+    service_info = dict(SERVICE_INFO)
+    limit = int(properties.get("server.subsequence_limit"))
+    service_info["subsequence_limit"] = limit if limit else None
+    body = json.dumps({"service": service_info})
+
+    @CachingMidware(properties, request, response, ["service-info", body],
+                    immutable=False)
     @MediaTypeMidware(properties, request, response)
     def worker(properties, request, response):
-        response.set_body(json.dumps({
-            "service": SERVICE_INFO
-        }))
+        response.set_body(body)
     worker(properties, request, response)
\ No newline at end of file
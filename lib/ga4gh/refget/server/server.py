@@ -4,18 +4,33 @@
 import click
 import os
 import sys
+import tornado.httpserver
 import tornado.ioloop
+import tornado.netutil
+import tornado.process
 import tornado.web
+from ga4gh.refget.catalog.bloom import get_bloom_filter
+from ga4gh.refget.catalog.catalog import get_catalog
 from ga4gh.refget.config.logger import logger
 from ga4gh.refget.config.exceptions import \
     RefgetException, RefgetPropertiesFileNotFoundException, \
     RefgetPropertiesParseException, RefgetOpenApiNotFoundException
 from ga4gh.refget.config.properties import Properties
+from ga4gh.refget.datasource.s3_source import reset_s3_clients
+from ga4gh.refget.datasource.upstream import reset_sessions
 from ga4gh.refget.http.request import Request
 from ga4gh.refget.http.response import Response
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.metrics.metrics import CONTENT_TYPE_METRICS, \
+    ROUTE_METHOD_NOT_ALLOWED, observe_request, render_metrics, set_worker
 from ga4gh.refget.routes.sequence.get_metadata import get_metadata
 from ga4gh.refget.routes.sequence.get_service_info import get_service_info
 from ga4gh.refget.routes.sequence.get_sequence import get_sequence
+from ga4gh.refget.routes.sequence.get_sequence_batch import \
+    get_sequence_batch
+from ga4gh.refget.util.executor import reset_executors, run_async, \
+    run_route_async
+from ga4gh.refget.warmup.warmup import get_warmup_seqids, warm_up
 
 class RefgetServer(object):
     """Tornado framework web server application serving all refget routes
@@ -23,6 +38,7 @@ class RefgetServer(object):
     Attributes:
         properties_file (str): path to application .properties file
         properties (Properties): loaded runtime properties from file
+        warmup_seqids (list): sequence ids warmed up before serving, or None
         application (tornado.web.Application): web app serving all refget routes
     """
     
@@ -36,22 +52,92 @@ class RefgetServer(object):
         self.properties_file = properties_file
         self.swagger_ui_dir = "./web/swagger-ui"
         self.properties = None
+        self.warmup_seqids = None
         self.application = None
         self.__setup()
 
-    def run(self):
-        """Run refget server on specified (or default) port"""
+    def run(self, workers=None):
+        """Run refget server on specified (or default) port
+
+        If more than one worker process is requested, the listening socket is
+        bound before forking, and shared by all worker processes. Worker
+        processes that die are restarted. Caches warmed up before forking are
+        inherited by all worker processes, and kept warm by each worker in the
+        background.
+
+        Arguments:
+            workers (int): number of worker processes (0 for one per CPU core),
+                overrides the 'server.workers' property if specified
+        """
 
         port = self.properties.get("server.port")
-        logger.info("running server on port " + str(port))
-        self.application.listen(port)
+        workers = self.get_workers(workers)
+
+        if workers == 1:
+            logger.info("running server on port " + str(port))
+            self.application.listen(port)
+        else:
+            logger.info("running server on port %s with %s worker processes"
+                        % (str(port), str(workers or "one per CPU core")))
+            sockets = tornado.netutil.bind_sockets(port)
+            tornado.process.fork_processes(workers)
+            reset_sessions()
+            reset_s3_clients()
+            reset_executors()
+            set_worker(tornado.process.task_id())
+            http_server = tornado.httpserver.HTTPServer(self.application)
+            http_server.add_sockets(sockets)
+        self.start_warmup_refresh()
         tornado.ioloop.IOLoop.current().start()
 
+    def get_workers(self, workers=None):
+        """Get the number of worker processes to run
+
+        Arguments:
+            workers (int): number of worker processes, overrides the
+                'server.workers' property if specified
+
+        Returns:
+            (int): number of worker processes, 0 for one per CPU core
+        """
+
+        if workers is None:
+            workers = self.properties.get("server.workers")
+        return int(workers)
+
+    def start_warmup_refresh(self):
+        """Periodically repeat warm-up in the background, if configured
+
+        Refreshes are run on the thread pool, every
+        'server.warmup_refresh_interval' seconds, each starting once the
+        previous refresh has completed
+        """
+
+        interval = float(self.properties.get("server.warmup_refresh_interval"))
+        if not self.warmup_seqids or interval <= 0:
+            return
+        tornado.ioloop.PeriodicCallback(
+            self.refresh_warmup, interval * 1000).start()
+
+    async def refresh_warmup(self):
+        """Repeat warm-up, refetching expired or evicted metadata objects and
+        retrying sequences that could not be pinned"""
+
+        stats = await run_async(self.properties, warm_up, self.properties,
+                                self.warmup_seqids)
+        if stats["failed"]:
+            logger.warning("warm-up refresh: %d of %d sequences failed"
+                           % (stats["failed"], stats["sequences"]))
+
     def __setup(self):
         """Load properties from properties file and application routes"""
         
         logger.info("setting server properties")
         self.__setup_properties()
+        logger.info("loading sequence catalog")
+        self.__setup_catalog()
+        logger.info("warming up caches")
+        self.__setup_warmup()
         logger.info("setting OpenAPI routes")
         self.__setup_openapi()
         logger.info("setting server api routes")
@@ -93,6 +179,43 @@ class RefgetServer(object):
         
         self.properties = Properties(props)
     
+    def __setup_catalog(self):
+        """Load the sequence catalog and Bloom filter of known sequence ids, if
+        configured, before serving requests
+
+        Raises:
+            RefgetCatalogException: when the catalog or Bloom filter file is
+                missing or invalid
+        """
+
+        catalog = get_catalog(self.properties)
+        if catalog is not None:
+            logger.info("loaded sequence catalog %s: %d sequences, %d aliases"
+                        % (catalog.path, catalog.n_sequences,
+                           catalog.n_aliases))
+        bloom_filter = get_bloom_filter(self.properties)
+        if bloom_filter is not None:
+            logger.info("loaded Bloom filter of known sequence ids: %d bits"
+                        % bloom_filter.n_bits)
+
+    def __setup_warmup(self):
+        """Fetch the metadata of, and pin, the sequences listed for warm-up,
+        if configured, before serving requests
+
+        Raises:
+            RefgetWarmupException: when the warm-up list file could not be read
+        """
+
+        self.warmup_seqids = get_warmup_seqids(self.properties)
+        if self.warmup_seqids is None:
+            logger.info("no warm-up list provided")
+            return
+        stats = warm_up(self.properties, self.warmup_seqids)
+        logger.info("warmed up %d sequences: %d metadata objects, %d pinned "
+                    "sequences, %d failed" % (
+                        stats["sequences"], stats["metadata"],
+                        stats["pinned"], stats["failed"]))
+
     def __setup_openapi(self):
         
         openapi_file = self.properties.get("local.openapi_file")
@@ -118,6 +241,11 @@ class RefgetServer(object):
                 GetServiceInfoHandler,
                 dict(properties=self.properties)
             ),
+            (
+                r"/sequence/batch",
+                GetSequenceBatchHandler,
+                dict(properties=self.properties)
+            ),
             (
                 r"/sequence/(?P<seqid>[^/]+)",
                 GetSequenceHandler,
@@ -127,6 +255,10 @@ class RefgetServer(object):
                 r"/sequence/(?P<seqid>[^/]+)/metadata",
                 GetMetadataHandler,
                 dict(properties=self.properties)
+            ),
+            (
+                r"/metrics",
+                MetricsHandler
             )
         ]
 
@@ -147,11 +279,14 @@ class RefgetRequestHandler(tornado.web.RequestHandler):
     and an empty refget response object that will be modified by the method.
 
     Attributes:
+        route_name (str): route name recorded in request metrics
         properties (Properties): runtime properties imported from server
         g_request (Request): generic refget request created from Tornado request
         g_response (Response): generic refget response modified by route methods
     """
 
+    route_name = None
+
     def initialize(self, properties):
         """Initialize the request handler by loading server Properties"""
 
@@ -169,6 +304,20 @@ class RefgetRequestHandler(tornado.web.RequestHandler):
         self.g_request = self.get_generic_request()
         self.g_response = Response()
     
+    def on_finish(self):
+        """Record the completed request in the request metrics
+
+        Requests with an HTTP method the route does not support are recorded
+        separately from the route's requests.
+        """
+
+        if self.route_name:
+            route_name = self.route_name
+            if self.get_status() == SC.METHOD_NOT_ALLOWED:
+                route_name = ROUTE_METHOD_NOT_ALLOWED
+            observe_request(route_name, self.get_status(),
+                            self.request.request_time())
+
     def get_generic_request(self):
         """Instantiate a generic refget request from Tornado request object
 
@@ -183,6 +332,7 @@ class RefgetRequestHandler(tornado.web.RequestHandler):
             g_request.add_query_param(key, self.get_query_argument(key))
         for key, value in self.request.headers.get_all():
             g_request.add_header(key, value)
+        g_request.set_body(self.request.body.decode("utf-8", "replace"))
         return g_request
     
     def finalize_response(self):
@@ -197,10 +347,57 @@ class RefgetRequestHandler(tornado.web.RequestHandler):
         headers = self.g_response.get_headers()
         for key in headers.keys():
             self.set_header(key, headers[key])
-        self.write(self.g_response.get_body())
+        # bodiless responses (e.g. NOT MODIFIED) cannot be written to
+        body = self.g_response.get_body()
+        if body:
+            self.write(body)
+
+    async def finalize_streamed_response(self):
+        """Converts the completed generic response, streaming a streamed body
+
+        Streamed response bodies are written to the client chunk by chunk.
+        Each chunk is read from the stream on the thread pool, and is written
+        to the client before the next chunk is read, so only a single chunk per
+        request is held in memory. Chunks are passed to the HTTP connection
+        directly (rather than through the handler's write buffer), so that
+        memoryview chunks (e.g. slices of memory-mapped files) reach the socket
+        without being copied. Non-streamed responses are written as in
+        finalize_response.
+        """
+
+        body_stream = self.g_response.get_body_stream()
+        if body_stream is None:
+            self.finalize_response()
+            return
+
+        self.set_status(self.g_response.get_status_code())
+        headers = self.g_response.get_headers()
+        for key in headers.keys():
+            self.set_header(key, headers[key])
+
+        chunks = iter(body_stream)
+        try:
+            # write headers, then write each chunk once the previous chunk
+            # has been written to the socket
+            await self.flush()
+            while True:
+                chunk = await run_async(self.properties, next, chunks, None)
+                if chunk is None:
+                    break
+                await self.request.connection.write(chunk)
+        finally:
+            # release the upstream connection, even if the client disconnected
+            if hasattr(chunks, "close"):
+                chunks.close()
 
 class GetServiceInfoHandler(RefgetRequestHandler):
-    """Request handler for get service info refget function"""
+    """Request handler for get service info refget function
+
+    Service info does not require any upstream requests, so the refget function
+    is called directly on the event loop
+    """
+
+    route_name = "service-info"
 
     def get(self):
         """Get service info HTTP response"""
@@ -211,21 +408,48 @@ class GetServiceInfoHandler(RefgetRequestHandler):
 class GetSequenceHandler(RefgetRequestHandler):
     """Request handler for get sequence refget function"""
 
-    def get(self, seqid):
+    route_name = "sequence"
+
+    async def get(self, seqid):
         """Get sequence HTTP response"""
 
-        get_sequence(self.properties, self.g_request, self.g_response)
+        await run_route_async(get_sequence, self.properties, self.g_request,
+                              self.g_response)
+        await self.finalize_streamed_response()
+
+class GetSequenceBatchHandler(RefgetRequestHandler):
+    """Request handler for get sequence batch refget function"""
+
+    route_name = "sequence-batch"
+
+    async def post(self):
+        """Get sequence batch HTTP response"""
+
+        await run_route_async(get_sequence_batch, self.properties,
+                              self.g_request, self.g_response)
         self.finalize_response()
 
 class GetMetadataHandler(RefgetRequestHandler):
     """Request handler for get metadata refget function"""
 
-    def get(self, seqid):
+    route_name = "metadata"
+
+    async def get(self, seqid):
         """Get metadata HTTP response"""
 
-        get_metadata(self.properties, self.g_request, self.g_response)
+        await run_route_async(get_metadata, self.properties, self.g_request,
+                              self.g_response)
         self.finalize_response()
 
+class MetricsHandler(tornado.web.RequestHandler):
+    """Request handler for server metrics, in Prometheus exposition format"""
+
+    def get(self):
+        """Get server metrics HTTP response"""
+
+        self.set_header("Content-Type", CONTENT_TYPE_METRICS)
+        self.write(render_metrics())
+
 class SwaggerUIHandler(tornado.web.RequestHandler):
     
     def get(self):
@@ -233,6 +457,9 @@ class SwaggerUIHandler(tornado.web.RequestHandler):
 
 @click.command()
 @click.option('--properties-file', help='Path to server properties file')
+@click.option('--workers', type=int, default=None,
+              help='Number of worker processes, 0 for one per CPU core '
+                   + '(overrides server.workers property)')
 def run_server(**kwargs):
     """Run refget tornado web server
 
@@ -243,7 +470,7 @@ def run_server(**kwargs):
     logger.info("program started")
     try:
         server = RefgetServer(kwargs['properties_file'])
-        server.run()
+        server.run(workers=kwargs['workers'])
     except RefgetException as ex:
         msg_template = "exiting program: exit_code: {}, message: {}"
         msg = msg_template.format(str(ex.get_exit_code()), str(ex.get_message()))
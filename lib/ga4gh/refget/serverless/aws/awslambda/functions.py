@@ -1,17 +1,75 @@
 # -*- coding: utf-8 -*-
-"""Wraps refget functions into serverless AWS lambda functions"""
+"""Wraps refget functions into serverless AWS lambda functions
 
+Module load time is part of every AWS lambda cold start. Only the lightweight
+request/response and properties modules are imported at module load, each
+refget function (along with its middleware, datasource and HTTP client
+dependencies) is imported the first time its handler is invoked. Properties
+are resolved from environment variables once per container, and reused by all
+subsequent invocations.
+
+Lambda containers are reused between invocations, so the process-wide
+metadata cache, sequence block cache, and pooled HTTP session persist across
+invocations in the same container. Unless set explicitly, cache sizes are
+derived from the memory configured for the function.
+"""
+
+import base64
 import os
-from ga4gh.refget.config.defaults import DEFAULT_ALLOWED_PROPERTY_KEYS
+from ga4gh.refget.config.defaults import DEFAULT_ALLOWED_PROPERTY_KEYS, \
+    DEFAULT_CACHE_MEMORY_FRACTION
 from ga4gh.refget.config.properties import Properties
 from ga4gh.refget.http.request import Request
 from ga4gh.refget.http.response import Response
-from ga4gh.refget.routes.sequence.get_metadata import get_metadata as gmetadata
-from ga4gh.refget.routes.sequence.get_sequence import get_sequence as gsequence
-from ga4gh.refget.routes.sequence.get_service_info import get_service_info as \
-    gserviceinfo
 
-def get_properties(context):
+MEMORY_SIZE_ENVVAR = "AWS_LAMBDA_FUNCTION_MEMORY_SIZE"
+"""Environment variable containing the function memory (in MB)"""
+
+METADATA_CACHE_SHARE = 0.125
+"""Share of the cache memory used for the metadata cache"""
+
+METADATA_ENTRY_BYTES = 1024
+"""Estimated memory (in bytes) of a cached metadata object"""
+
+container_properties = None
+"""Properties resolved once per AWS lambda container"""
+
+def get_memory_limit(context):
+    """Get the memory configured for the AWS lambda function
+
+    Arguments:
+        context (LambdaContext): AWS lambda context object
+
+    Returns:
+        (int): function memory in MB, or None if unknown
+    """
+
+    memory_limit = getattr(context, "memory_limit_in_mb", None) \
+        or os.getenv(MEMORY_SIZE_ENVVAR)
+    return int(memory_limit) if memory_limit else None
+
+def get_cache_sizes(memory_limit, memory_fraction):
+    """Derive cache sizes from the AWS lambda function memory
+
+    A fraction of the function memory is used for caches, of which a small
+    share holds metadata objects and the remainder holds sequence blocks
+
+    Arguments:
+        memory_limit (int): function memory in MB
+        memory_fraction (float): fraction of function memory used for caches
+
+    Returns:
+        (dict): 'cache.metadata_size' and 'cache.sequence_bytes' properties
+    """
+
+    cache_bytes = int(memory_limit * 1024 * 1024 * memory_fraction)
+    metadata_bytes = int(cache_bytes * METADATA_CACHE_SHARE)
+    return {
+        "cache.metadata_size": metadata_bytes // METADATA_ENTRY_BYTES,
+        "cache.sequence_bytes": cache_bytes - metadata_bytes
+    }
+
+def load_properties(context=None):
     """Load Properties object from environment variables
 
     In the server context, properties are passed via properties file. In the 
@@ -21,6 +79,12 @@ def get_properties(context):
 
         source.base_url -> SOURCE_BASE_URL
         server.port -> SERVER_PORT
+
+    Cache sizes not set by environment variables are derived from the
+    function memory, if known (see get_cache_sizes)
+
+    Arguments:
+        context (LambdaContext): AWS lambda context object
     
     Returns:
         (Properties): loaded properties from environment variables
@@ -32,8 +96,32 @@ def get_properties(context):
         envvar_value = os.getenv(envvar_name)
         if envvar_value:
             new_props[property_key] = envvar_value
+
+    memory_limit = get_memory_limit(context)
+    if memory_limit:
+        memory_fraction = float(new_props.get("cache.memory_fraction",
+                                              DEFAULT_CACHE_MEMORY_FRACTION))
+        cache_sizes = get_cache_sizes(memory_limit, memory_fraction)
+        for property_key in cache_sizes.keys():
+            if property_key not in new_props:
+                new_props[property_key] = cache_sizes[property_key]
     return Properties(new_props)
 
+def get_properties(context):
+    """Get the Properties object of the AWS lambda container
+
+    Environment variables of an AWS lambda function cannot change within a
+    container, so properties are loaded on the first invocation only
+
+    Returns:
+        (Properties): loaded properties from environment variables
+    """
+
+    global container_properties
+    if container_properties is None:
+        container_properties = load_properties(context)
+    return container_properties
+
 def get_generic_request(event):
     """Instantiate a generic refget request from AWS serverless event object
 
@@ -64,6 +152,12 @@ def get_generic_request(event):
         if event_dict:
             for key in event_dict.keys():
                 add_method(key, event_dict[key])
+
+    body = event.get("body")
+    if body:
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", "replace")
+        request.set_body(body)
     
     return request
 
@@ -96,17 +190,25 @@ def finalize_response(response):
     the generic response as an AWS lambda-formatted response, so that the
     overall serverless function will return valid HTTP responses. The AWS
     lambda-formatted response is simply a dictionary with keys for statusCode,
-    headers, and body
+    headers, and body. AWS lambda cannot stream response bodies, so streamed
+    bodies are read in full. Encoded (compressed) bodies are binary, and are
+    returned base64-encoded
 
     Returns:
         (dict): AWS lambda-formatted response dictionary
     """
     
-    return {
+    response.join_body_stream()
+    body = response.get_body()
+    lambda_response = {
         "statusCode": response.get_status_code(),
         "headers": response.get_headers(),
-        "body": response.get_body()
+        "body": body
     }
+    if isinstance(body, bytes):
+        lambda_response["body"] = base64.b64encode(body).decode("ascii")
+        lambda_response["isBase64Encoded"] = True
+    return lambda_response
 
 def get_sequence(event, context):
     """Serverless request handler for get sequence refget function
@@ -115,10 +217,26 @@ def get_sequence(event, context):
         (dict): finalized sequence serverless response
     """
 
+    from ga4gh.refget.routes.sequence.get_sequence import get_sequence as gsequence
+
     props, request, response = get_properties_request_response(event, context)
     gsequence(props, request, response)
     return finalize_response(response)
 
+def get_sequence_batch(event, context):
+    """Serverless request handler for get sequence batch refget function
+
+    Returns:
+        (dict): finalized sequence batch serverless response
+    """
+
+    from ga4gh.refget.routes.sequence.get_sequence_batch import \
+        get_sequence_batch as gsequencebatch
+
+    props, request, response = get_properties_request_response(event, context)
+    gsequencebatch(props, request, response)
+    return finalize_response(response)
+
 def get_metadata(event, context):
     """Serverless request handler for get metadata refget function
 
@@ -126,6 +244,8 @@ def get_metadata(event, context):
         (dict): finalized metadata serverless response
     """
 
+    from ga4gh.refget.routes.sequence.get_metadata import get_metadata as gmetadata
+
     props, request, response = get_properties_request_response(event, context)
     gmetadata(props, request, response)
     return finalize_response(response)
@@ -137,6 +257,8 @@ def get_service_info(event, context):
         (dict): finalized service info serverless response
     """
     
+    from ga4gh.refget.routes.sequence.get_service_info import get_service_info as gserviceinfo
+
     props, request, response = get_properties_request_response(event, context)
     gserviceinfo(props, request, response)
     return finalize_response(response)
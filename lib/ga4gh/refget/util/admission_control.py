@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Admission control of proxied upstream fetches
+
+Each server process bounds the number of concurrent upstream subsequence
+fetches it performs on behalf of proxied requests, and the total size of the
+subsequences read in full (rather than streamed) by those fetches. Fetches
+exceeding either limit are rejected immediately, rather than queued, so that
+a burst of large proxied requests cannot exhaust process memory, and the
+client is asked to retry later. Cheap work (service info, redirects, and
+subsequences served entirely from cache) is never subject to admission.
+"""
+
+import threading
+from ga4gh.refget.config.exceptions import RefgetOverloadedException
+from ga4gh.refget.metrics.metrics import observe_rejected
+
+class AdmissionController(object):
+    """Bounds concurrent upstream fetches and in-flight bytes
+
+    Attributes:
+        max_fetches (int): maximum number of concurrent fetches, 0 for no limit
+        max_bytes (int): maximum total in-flight bytes, 0 for no limit
+        fetches (int): number of admitted, in-flight fetches
+        bytes (int): total in-flight bytes of admitted fetches
+        lock (threading.Lock): lock guarding in-flight counters
+    """
+
+    def __init__(self, max_fetches, max_bytes):
+        """AdmissionController constructor
+
+        Arguments:
+            max_fetches (int): maximum number of concurrent fetches, 0 for no
+                limit
+            max_bytes (int): maximum total in-flight bytes, 0 for no limit
+        """
+
+        self.max_fetches = max_fetches
+        self.max_bytes = max_bytes
+        self.fetches = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def acquire(self, n_bytes):
+        """Admit a fetch, or reject it if it would exceed the limits
+
+        A single fetch larger than the byte limit is admitted if no other bytes
+        are in flight, so that it is not rejected indefinitely
+
+        Arguments:
+            n_bytes (int): bytes held in memory by the fetch
+
+        Raises:
+            RefgetOverloadedException: when the fetch exceeds the limits
+        """
+
+        with self.lock:
+            if self.max_fetches and self.fetches >= self.max_fetches:
+                reason = "fetches"
+            elif self.max_bytes and self.bytes \
+                and self.bytes + n_bytes > self.max_bytes:
+                reason = "bytes"
+            else:
+                self.fetches += 1
+                self.bytes += n_bytes
+                return
+        observe_rejected(reason)
+        raise RefgetOverloadedException(
+            "server is overloaded, too many concurrent %s" % reason)
+
+    def release(self, n_bytes):
+        """Release an admitted fetch
+
+        Arguments:
+            n_bytes (int): bytes held in memory by the fetch, as acquired
+        """
+
+        with self.lock:
+            self.fetches -= 1
+            self.bytes -= n_bytes
+
+admission_controllers = {}
+"""Process-wide admission controllers, by fetch and byte limits"""
+
+admission_controllers_lock = threading.Lock()
+"""Lock guarding creation of process-wide admission controllers"""
+
+def get_admission_controller(properties):
+    """Get the process-wide admission controller
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            number of concurrent fetches under 'server.max_upstream_fetches',
+            and the maximum in-flight bytes under 'server.max_inflight_bytes'
+
+    Returns:
+        (AdmissionController): admission controller
+    """
+
+    key = (int(properties.get("server.max_upstream_fetches")),
+           int(properties.get("server.max_inflight_bytes")))
+    with admission_controllers_lock:
+        if key not in admission_controllers:
+            admission_controllers[key] = AdmissionController(*key)
+        return admission_controllers[key]
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Content encodings for compressing response bodies, in full or streamed
+
+gzip is always available. brotli ('br') and zstd are available when the
+optional brotli and zstandard packages are installed (e.g. via
+'pip install refget-cloud[compression]'), and are otherwise never negotiated.
+"""
+
+import zlib
+from ga4gh.refget.util.stream import ClosingStream
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_LEVEL = 6
+"""gzip compression level"""
+
+BROTLI_QUALITY = 5
+"""brotli compression quality, favouring speed for on-the-fly compression"""
+
+ZSTD_LEVEL = 3
+"""zstd compression level"""
+
+def get_available_encodings():
+    """Get the content encodings supported by installed packages
+
+    Returns:
+        (set): available content encoding names
+    """
+
+    encodings = {"gzip"}
+    if brotli is not None:
+        encodings.add("br")
+    if zstandard is not None:
+        encodings.add("zstd")
+    return encodings
+
+def parse_accept_encoding(accept_encoding):
+    """Parse an Accept-Encoding header into content encoding quality values
+
+    Arguments:
+        accept_encoding (str): Accept-Encoding header value
+
+    Returns:
+        (dict): quality value (float) of each listed content encoding
+    """
+
+    qvalues = {}
+    for entry in accept_encoding.split(","):
+        parts = [p.strip() for p in entry.split(";")]
+        if not parts[0]:
+            continue
+        qvalue = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    qvalue = float(param[2:])
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[parts[0].lower()] = qvalue
+    return qvalues
+
+def negotiate_encoding(accept_encoding, preferred_encodings):
+    """Select the content encoding of a response
+
+    The encoding accepted by the client with the highest quality value is
+    selected, ties are broken by server preference
+
+    Arguments:
+        accept_encoding (str): Accept-Encoding header value, or None
+        preferred_encodings (list): content encodings offered by the server,
+            most preferred first
+
+    Returns:
+        (str): selected content encoding, or None if the response should not
+            be compressed
+    """
+
+    if not accept_encoding:
+        return None
+
+    qvalues = parse_accept_encoding(accept_encoding)
+    available = get_available_encodings()
+    selected, selected_q = None, 0.0
+    for encoding in preferred_encodings:
+        if encoding not in available:
+            continue
+        qvalue = qvalues.get(encoding, qvalues.get("*", 0.0))
+        if qvalue > selected_q:
+            selected, selected_q = encoding, qvalue
+    return selected
+
+class Compressor(object):
+    """Incremental compressor for a single response body
+
+    Attributes:
+        encoding (str): content encoding
+        compressobj: underlying compression object
+    """
+
+    def __init__(self, encoding):
+        """Compressor constructor
+
+        Arguments:
+            encoding (str): content encoding, one of the available encodings
+        """
+
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressobj = brotli.Compressor(quality=BROTLI_QUALITY)
+        elif encoding == "zstd":
+            self.compressobj = zstandard.ZstdCompressor(
+                level=ZSTD_LEVEL).compressobj()
+        else:
+            # wbits of 31 writes a gzip header and trailer
+            self.compressobj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        """Compress a chunk of the body
+
+        Arguments:
+            chunk (bytes): uncompressed chunk
+
+        Returns:
+            (bytes): compressed output, possibly empty
+        """
+
+        if self.encoding == "br":
+            return self.compressobj.process(chunk)
+        return self.compressobj.compress(chunk)
+
+    def flush(self):
+        """Finish compressing the body
+
+        Returns:
+            (bytes): remaining compressed output
+        """
+
+        if self.encoding == "br":
+            return self.compressobj.finish()
+        return self.compressobj.flush()
+
+def compress_body(body, encoding):
+    """Compress a full response body
+
+    Arguments:
+        body (bytes): uncompressed body
+        encoding (str): content encoding
+
+    Returns:
+        (bytes): compressed body
+    """
+
+    compressor = Compressor(encoding)
+    return compressor.compress(body) + compressor.flush()
+
+def iter_compressed(chunks, encoding):
+    """Compress bytes chunks, yielding non-empty compressed chunks
+
+    Arguments:
+        chunks (iterable): uncompressed bytes chunks
+        encoding (str): content encoding
+
+    Returns:
+        (generator): compressed, non-empty bytes chunks
+    """
+
+    compressor = Compressor(encoding)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    compressed = compressor.flush()
+    if compressed:
+        yield compressed
+
+def compress_stream(chunks, encoding):
+    """Compress a streamed response body, chunk by chunk
+
+    Closing the compressed stream closes the underlying stream, even if the
+    compressed stream was never read
+
+    Arguments:
+        chunks (iterable): uncompressed bytes chunks
+        encoding (str): content encoding
+
+    Returns:
+        (ClosingStream): compressed, non-empty bytes chunks
+    """
+
+    return ClosingStream(iter_compressed(chunks, encoding), [chunks])
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Methods for running blocking refget functions without blocking an event loop
+
+Refget functions (and the middleware they are wrapped in) perform blocking
+requests to the upstream datasource. In an event loop-based deployment context
+(e.g. Tornado Server), these functions are run on a process-wide thread pool,
+so that a slow upstream request does not stall other in-flight requests. The
+refget functions themselves are unchanged, and may still be called directly in
+synchronous deployment contexts (e.g. AWS lambda).
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+executors = {}
+"""Process-wide thread pool executors, by maximum number of threads"""
+
+batch_executors = {}
+"""Process-wide batch fetch thread pool executors, by maximum threads"""
+
+part_executors = {}
+"""Process-wide part fetch thread pool executors, by maximum threads"""
+
+executors_lock = threading.Lock()
+"""Lock guarding creation of process-wide thread pool executors"""
+
+def get_executor(properties):
+    """Get the process-wide thread pool executor for blocking refget functions
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            number of threads under 'server.io_threads'
+
+    Returns:
+        (concurrent.futures.ThreadPoolExecutor): thread pool executor
+    """
+
+    max_workers = int(properties.get("server.io_threads"))
+    with executors_lock:
+        if max_workers not in executors:
+            executors[max_workers] = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="refget-io")
+        return executors[max_workers]
+
+def get_batch_executor(properties):
+    """Get the process-wide thread pool executor for batch upstream fetches
+
+    Batch refget functions (themselves running on the refget function thread
+    pool) fan out upstream requests on a separate thread pool, so that waiting
+    on these requests cannot exhaust the pool they are waited on from
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            number of threads under 'server.batch_concurrency'
+
+    Returns:
+        (concurrent.futures.ThreadPoolExecutor): thread pool executor
+    """
+
+    max_workers = int(properties.get("server.batch_concurrency"))
+    with executors_lock:
+        if max_workers not in batch_executors:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="refget-batch")
+            batch_executors[max_workers] = executor
+        return batch_executors[max_workers]
+
+def get_part_executor(properties):
+    """Get the process-wide thread pool executor for parallel part fetches
+
+    Large subsequences may be fetched from the datasource as several parts in
+    parallel. Part fetches are made on their own thread pool, as they are
+    waited on from both the refget function and the batch thread pools
+
+    Arguments:
+        properties (Properties): runtime properties, containing the maximum
+            number of threads under 'source.s3_part_concurrency'
+
+    Returns:
+        (concurrent.futures.ThreadPoolExecutor): thread pool executor
+    """
+
+    max_workers = int(properties.get("source.s3_part_concurrency"))
+    with executors_lock:
+        if max_workers not in part_executors:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="refget-part")
+            part_executors[max_workers] = executor
+        return part_executors[max_workers]
+
+def reset_executors():
+    """Discard process-wide thread pool executors inherited from a parent
+    process
+
+    The threads of executors created before worker processes are forked (e.g.
+    during warm-up) do not exist in the workers, so work submitted to them
+    would never run. Each worker starts its own threads once the inherited
+    executors are discarded
+    """
+
+    with executors_lock:
+        for executors_dict in [executors, batch_executors, part_executors]:
+            executors_dict.clear()
+
+async def run_async(properties, func, *args, **kwargs):
+    """Await a blocking function, run on the process-wide thread pool
+
+    Arguments:
+        properties (Properties): runtime properties
+        func (function): blocking function to run
+        args (list): positional arguments passed to function
+        kwargs (dict): keyword arguments passed to function
+
+    Returns:
+        return value of the blocking function
+    """
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        get_executor(properties), functools.partial(func, *args, **kwargs))
+
+async def run_route_async(route, properties, request, response):
+    """Await a refget function, run on the process-wide thread pool
+
+    Async-capable path for all generic refget functions. The refget function
+    modifies the generic response exactly as it would if called directly.
+
+    Arguments:
+        route (function): refget function (e.g. get_sequence)
+        properties (Properties): runtime properties
+        request (Request): generic refget request
+        response (Response): modifiable, generic refget response
+    """
+
+    await run_async(properties, route, properties, request, response)
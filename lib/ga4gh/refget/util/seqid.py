@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Syntactic validation of requested sequence identifiers
+
+Refget sequence identifiers are checksums of the sequence content, so a
+requested id that is not a well-formed checksum cannot identify any sequence.
+Such ids are rejected before any upstream request is made. Supported forms:
+    md5 -> 32 lowercase hex characters
+    trunc512 -> 48 lowercase hex characters
+    ga4gh -> 'ga4gh:SQ.' followed by 32 base64url characters
+"""
+
+import re
+
+MD5_PATTERN = re.compile(r"[0-9a-f]{32}")
+"""Pattern of md5 checksum sequence ids"""
+
+TRUNC512_PATTERN = re.compile(r"[0-9a-f]{48}")
+"""Pattern of trunc512 checksum sequence ids"""
+
+GA4GH_PATTERN = re.compile(r"ga4gh:SQ\.[0-9A-Za-z_-]{32}")
+"""Pattern of ga4gh sequence identifiers"""
+
+SEQID_PATTERNS = {
+    "md5": MD5_PATTERN,
+    "trunc512": TRUNC512_PATTERN,
+    "ga4gh": GA4GH_PATTERN
+}
+"""Sequence id patterns, by checksum algorithm"""
+
+def get_seqid_type(seqid):
+    """Get the checksum algorithm of a sequence id
+
+    Arguments:
+        seqid (str): requested sequence id
+
+    Returns:
+        (str): 'md5', 'trunc512', or 'ga4gh', or None if the id is not a
+            well-formed checksum
+    """
+
+    for seqid_type, pattern in SEQID_PATTERNS.items():
+        if pattern.fullmatch(seqid):
+            return seqid_type
+    return None
+
+def is_valid_seqid(seqid):
+    """Check a sequence id is a well-formed checksum
+
+    Arguments:
+        seqid (str): requested sequence id
+
+    Returns:
+        (bool): True if the id is a well-formed md5, trunc512, or ga4gh id
+    """
+
+    return seqid is not None and get_seqid_type(seqid) is not None
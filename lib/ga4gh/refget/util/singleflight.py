@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Coalescing of concurrent, identical upstream fetches into a single fetch
+
+When a popular sequence's metadata or subsequence is missing from cache (e.g.
+on a cold start, or after eviction), many concurrent requests would each fetch
+the same object from the datasource. While a fetch for a given key (e.g. an
+upstream url and byte range) is in flight, later callers with the same key
+wait for, and share, its result instead of issuing their own fetch. Results
+are not retained once the fetch completes, caching is left to the caches.
+"""
+
+import threading
+
+class Call(object):
+    """A single in-flight fetch, awaited by all callers with the same key
+
+    Attributes:
+        done (threading.Event): set once the fetch has completed
+        waiters (int): number of callers waiting for, and sharing, the result
+        result: fetch result
+        exception (Exception): exception raised by the fetch, or None
+    """
+
+    def __init__(self):
+        """Call constructor"""
+
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.exception = None
+
+class SingleFlight(object):
+    """Coalesces concurrent calls with the same key into a single call
+
+    Attributes:
+        calls (dict): in-flight calls, by key
+        lock (threading.Lock): lock guarding in-flight calls
+    """
+
+    def __init__(self):
+        """SingleFlight constructor"""
+
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, func, *args):
+        """Call a function, unless a call with the same key is in flight
+
+        If a call with the same key is in flight, waits for it to complete and
+        shares its result (or exception) instead
+
+        Arguments:
+            key (tuple): hashable key identifying identical calls
+            func (function): function to call
+            args (list): positional arguments passed to func
+
+        Returns:
+            (list): function result, and True if the result was shared from
+                another caller's call, otherwise False
+        """
+
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = Call()
+                self.calls[key] = call
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return [call.result, True]
+
+        try:
+            call.result = func(*args)
+        except Exception as e:
+            call.exception = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return [call.result, False]
+
+flights = SingleFlight()
+"""Process-wide coalescing of upstream fetches"""
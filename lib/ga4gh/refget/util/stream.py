@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Response body streams derived from upstream subsequence streams
+
+A body stream derived from other streams (e.g. multipart or compressed
+bodies) is usually a generator. Closing a generator that has not been started
+does not execute its cleanup code, so a response body that is discarded
+before it is written (e.g. on NOT MODIFIED or SERVICE UNAVAILABLE) would keep
+its upstream connections and admitted fetches open. A ClosingStream closes
+its upstream streams when it is closed, whether or not it was started.
+"""
+
+def close_streams(streams):
+    """Close streams, if closeable
+
+    Arguments:
+        streams (list): bytes chunks iterables
+    """
+
+    for stream in streams:
+        if hasattr(stream, "close"):
+            stream.close()
+
+class ClosingStream(object):
+    """Stream of bytes chunks, closing its upstream streams once exhausted or
+    closed
+
+    Attributes:
+        chunks (iterator): bytes chunks derived from the upstream streams
+        streams (list): upstream bytes chunks iterables
+        closed (bool): whether the stream has been closed
+    """
+
+    def __init__(self, chunks, streams):
+        """ClosingStream constructor
+
+        Arguments:
+            chunks (iterable): bytes chunks derived from the upstream streams
+            streams (list): upstream bytes chunks iterables
+        """
+
+        self.chunks = iter(chunks)
+        self.streams = streams
+        self.closed = False
+
+    def __iter__(self):
+        """Get the stream iterator
+
+        Returns:
+            (ClosingStream): this stream
+        """
+
+        return self
+
+    def __next__(self):
+        """Get the next bytes chunk
+
+        Returns:
+            (bytes): bytes chunk
+        """
+
+        try:
+            return next(self.chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Close the derived chunks and the upstream streams, once"""
+
+        if self.closed:
+            return
+        self.closed = True
+        close_streams([self.chunks] + list(self.streams))
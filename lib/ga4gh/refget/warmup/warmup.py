@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Warm-up of process-wide caches from a configured list of sequence ids
+
+A newly started server has nothing cached, so its first requests for popular
+sequences all miss and reach the datasource at once. If a warm-up list is
+configured under 'local.warmup_file' (e.g. the sequence ids of a reference
+assembly), the metadata object of every listed sequence is fetched into the
+metadata cache before the server starts accepting requests. If pinning is
+enabled ('cache.pinned_bytes' greater than 0), listed sequences of at most
+'cache.pin_max_length' bases are also pinned in memory in full (see
+ga4gh.refget.datasource.pinned_source).
+
+The warm-up list file contains one sequence id (or catalog alias) per line,
+blank lines and lines starting with '#' are ignored, as is anything after the
+first whitespace-separated column.
+
+Warm-up may be repeated periodically in the background, which refetches any
+metadata objects that have since expired or been evicted, and retries any
+sequences that could not be pinned. Sequences already pinned are not
+refetched.
+"""
+
+import concurrent.futures
+from ga4gh.refget.catalog.catalog import resolve_seqid
+from ga4gh.refget.config.exceptions import RefgetWarmupException
+from ga4gh.refget.config.logger import logger
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.metadata import get_metadata, \
+    get_sequence_length
+
+def read_warmup_file(path):
+    """Read the sequence ids of a warm-up list file
+
+    Arguments:
+        path (str): path to warm-up list file
+
+    Returns:
+        (list): listed sequence ids, in file order, without duplicates
+
+    Raises:
+        RefgetWarmupException: when the file could not be read
+    """
+
+    try:
+        with open(path, "r") as fh:
+            lines = fh.readlines()
+    except (OSError, UnicodeDecodeError):
+        raise RefgetWarmupException(
+            "warm-up file could not be read: " + path)
+
+    seqids = []
+    for line in lines:
+        columns = line.split()
+        if not columns or columns[0].startswith("#"):
+            continue
+        seqids.append(columns[0])
+    return list(dict.fromkeys(seqids))
+
+def get_warmup_seqids(properties):
+    """Get the sequence ids listed for warm-up, if configured
+
+    Arguments:
+        properties (Properties): runtime properties, containing the path to the
+            warm-up list file under 'local.warmup_file'
+
+    Returns:
+        (list): listed sequence ids, or None if no warm-up file is configured
+
+    Raises:
+        RefgetWarmupException: when the file could not be read
+    """
+
+    path = properties.get("local.warmup_file")
+    if not path:
+        return None
+    return read_warmup_file(path)
+
+def warm_up_sequence(properties, seqid):
+    """Fetch the metadata of a listed sequence, and pin the sequence if small
+
+    Arguments:
+        properties (Properties): runtime properties
+        seqid (str): listed sequence id or catalog alias
+
+    Returns:
+        (list): True if the metadata object was fetched, and True if the
+            sequence is pinned
+    """
+
+    seqid = resolve_seqid(properties, seqid)
+    if seqid is None:
+        return [False, False]
+    status_code, metadata = get_metadata(properties, seqid)
+    if metadata is None:
+        return [False, False]
+
+    max_length = int(properties.get("cache.pin_max_length"))
+    status_code, length = get_sequence_length(properties, seqid)
+    if length is None or length > max_length:
+        return [True, False]
+    return [True, get_datasource(properties).pin_sequence(seqid, length)]
+
+def warm_up(properties, seqids):
+    """Warm up process-wide caches for a list of sequences
+
+    Sequences are warmed up concurrently, on a thread pool of at most
+    'server.batch_concurrency' threads, which is shut down once warm-up
+    completes (so that no threads are left running before worker processes
+    are forked). Sequences that fail to warm up (e.g. due to upstream errors)
+    are logged and counted, and do not fail warm-up as a whole
+
+    Arguments:
+        properties (Properties): runtime properties
+        seqids (list): sequence ids to warm up
+
+    Returns:
+        (dict): number of listed sequences, metadata objects fetched,
+            sequences pinned, and sequences that failed to warm up
+    """
+
+    def warm_up_or_log(seqid):
+        try:
+            return warm_up_sequence(properties, seqid)
+        except Exception as e:
+            logger.warning("could not warm up sequence %s: %s"
+                           % (seqid, str(e)))
+            return None
+
+    max_workers = max(int(properties.get("server.batch_concurrency")), 1)
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="refget-warmup") as pool:
+        results = list(pool.map(warm_up_or_log, seqids))
+
+    completed = [result for result in results if result is not None]
+    return {
+        "sequences": len(seqids),
+        "metadata": sum(1 for result in completed if result[0]),
+        "pinned": sum(1 for result in completed if result[1]),
+        "failed": sum(1 for result in results if result is None)
+    }
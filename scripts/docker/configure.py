@@ -9,19 +9,14 @@ refget server points to.
 """
 
 import os
+from ga4gh.refget.config.defaults import DEFAULT_ALLOWED_PROPERTY_KEYS
 
 def configure_properties_file():
     """Write refget-specific environment variables to properties file"""
     
     content = []
     properties_file = "./config/application.properties"
-    properties = [
-        "source.base_url",
-        "source.sequence_path",
-        "source.metadata_path",
-        "server.port",
-        "local.openapi_file"
-    ]
+    properties = sorted(DEFAULT_ALLOWED_PROPERTY_KEYS)
     for prop in properties:
         envvar_name = prop.replace(".", "_").upper()
         envvar_value = os.getenv(envvar_name)
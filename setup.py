@@ -43,9 +43,17 @@ setuptools.setup(
     package_data={'': ['web/*/*', 'schemas/*']},
     packages=setuptools.find_packages(),
     install_requires=install_requires,
+    extras_require={
+        'compression': ['brotli', 'zstandard'],
+        'packed': ['numpy'],
+        's3': ['botocore']
+    },
     entry_points={
         'console_scripts': [
-            'refget-server = ga4gh.refget.server.server:run_server'
+            'refget-server = ga4gh.refget.server.server:run_server',
+            'refget-catalog = ga4gh.refget.catalog.builder:run_builder',
+            'refget-bloom = ga4gh.refget.catalog.builder:run_bloom_builder',
+            'refget-pack = ga4gh.refget.packed.converter:run_converter'
         ]
     },
     classifiers=(
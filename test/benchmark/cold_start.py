@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""AWS lambda cold start benchmark
+
+Simulates AWS lambda cold starts by invoking each serverless handler in a
+fresh Python process, pointed at the stand-in upstream datasource. For each
+cold start, the following are measured:
+
+    * process: wall-clock time from process launch to exit
+    * import: time to import the serverless functions module
+    * first_invocation: time of the first (cold) handler invocation
+    * warm_invocation: time of a second invocation in the same process
+
+Results are written as JSON, with p50/p95/p99 of each measure per handler.
+
+Run from the repository root:
+
+    PYTHONPATH=lib/ python -m test.benchmark.cold_start --help
+"""
+
+import click
+import json
+import os
+import subprocess
+import sys
+import time
+from test.benchmark.load import PERCENTILES, percentile
+from test.benchmark.run_benchmark import LIB_DIR, SEQID
+from test.benchmark.standin import StandInConfig, start_standin
+
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from ga4gh.refget.serverless.aws.awslambda import functions
+imported = time.perf_counter()
+handler = getattr(functions, sys.argv[1])
+event = json.loads(sys.argv[2])
+response = handler(event, None)
+invoked = time.perf_counter()
+handler(event, None)
+reinvoked = time.perf_counter()
+print(json.dumps({
+    "status": response["statusCode"],
+    "import": imported - started,
+    "first_invocation": invoked - imported,
+    "warm_invocation": reinvoked - invoked
+}))
+"""
+"""Script run in each fresh process, timing import and handler invocations"""
+
+EVENTS = {
+    "get_service_info": {
+        "pathParameters": {},
+        "queryStringParameters": {},
+        "headers": {}
+    },
+    "get_metadata": {
+        "pathParameters": {"seqid": SEQID},
+        "queryStringParameters": {},
+        "headers": {}
+    },
+    "get_sequence": {
+        "pathParameters": {"seqid": SEQID},
+        "queryStringParameters": {"start": "25", "end": "50"},
+        "headers": {}
+    }
+}
+"""Event passed to each serverless handler"""
+
+MEASURES = ["process", "import", "first_invocation", "warm_invocation"]
+"""Measures recorded for each cold start"""
+
+def run_cold_start(handler, env):
+    """Invoke a serverless handler in a fresh Python process
+
+    Arguments:
+        handler (str): serverless handler function name
+        env (dict): process environment variables
+
+    Returns:
+        (dict): response status code, and each measure in seconds
+    """
+
+    started = time.perf_counter()
+    output = subprocess.check_output(
+        [sys.executable, "-c", CHILD_SCRIPT, handler,
+         json.dumps(EVENTS[handler])], env=env)
+    result = json.loads(output.decode("utf-8").strip().split("\n")[-1])
+    result["process"] = time.perf_counter() - started
+    return result
+
+def summarize_cold_starts(results):
+    """Summarize the measures of repeated cold starts
+
+    Arguments:
+        results (list): cold start results, see run_cold_start
+
+    Returns:
+        (dict): status code counts, and mean/percentiles of each measure in
+            milliseconds
+    """
+
+    summary = {"runs": len(results), "status_codes": {}}
+    for result in results:
+        code = str(result["status"])
+        summary["status_codes"][code] = summary["status_codes"].get(code, 0) + 1
+
+    for measure in MEASURES:
+        values = sorted(result[measure] * 1000.0 for result in results)
+        summary[measure + "_ms"] = dict(
+            [("p%d" % pct, percentile(values, pct)) for pct in PERCENTILES]
+            + [("mean", sum(values) / len(values))])
+    return summary
+
+@click.command()
+@click.option('--runs', type=int, default=20,
+              help='Number of cold starts per handler')
+@click.option('--latency', type=float, default=0.0,
+              help='Stand-in datasource latency per response, in milliseconds')
+@click.option('--handler', 'handlers', multiple=True,
+              type=click.Choice(sorted(EVENTS.keys())),
+              help='Serverless handler to benchmark (repeatable), default all')
+@click.option('--output', type=click.Path(), default=None,
+              help='Path to JSON results file, default stdout')
+def run_cold_start_benchmark(**kwargs):
+    """Benchmark AWS lambda handler cold starts
+
+    Arguments:
+        kwargs (dict): dictionary of commandline options
+    """
+
+    standin_port = start_standin(
+        StandInConfig(latency=kwargs["latency"] / 1000.0))
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [LIB_DIR] + [p for p in [env.get("PYTHONPATH")] if p])
+    env["SOURCE_BASE_URL"] = "http://127.0.0.1:%d" % standin_port
+    env["SOURCE_SEQUENCE_PATH"] = "/sequence/{seqid}"
+    env["SOURCE_METADATA_PATH"] = "/sequence/{seqid}/metadata"
+
+    handlers = kwargs["handlers"] or sorted(EVENTS.keys())
+    results = {}
+    for handler in handlers:
+        results[handler] = summarize_cold_starts(
+            [run_cold_start(handler, env) for i in range(kwargs["runs"])])
+
+    output = json.dumps({
+        "config": {
+            "runs": kwargs["runs"],
+            "standin": {"latency_ms": kwargs["latency"]},
+            "python": sys.version.split()[0]
+        },
+        "handlers": results
+    }, indent=2)
+
+    if kwargs["output"]:
+        with open(kwargs["output"], "w") as fh:
+            fh.write(output + "\n")
+    else:
+        click.echo(output)
+
+if __name__ == "__main__":
+    run_cold_start_benchmark()
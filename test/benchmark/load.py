@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Concurrent load generator for benchmarking the refget server
+
+Sends a fixed number of requests to the server, keeping a fixed number of
+requests in flight, and summarizes the throughput and latency distribution.
+Redirects are not followed, so that a redirect response is measured as the
+refget server's own latency.
+"""
+
+import asyncio
+import math
+import time
+import tornado.httpclient
+
+PERCENTILES = [50, 95, 99]
+"""Latency percentiles reported for each scenario"""
+
+def percentile(sorted_values, pct):
+    """Get a percentile of sorted values, by the nearest-rank method
+
+    Arguments:
+        sorted_values (list): values, sorted ascending
+        pct (float): percentile, between 0 and 100
+
+    Returns:
+        (float): percentile value, or None if there are no values
+    """
+
+    if not sorted_values:
+        return None
+    rank = max(int(math.ceil(pct / 100.0 * len(sorted_values))), 1)
+    return sorted_values[rank - 1]
+
+def summarize(latencies, status_codes, errors, elapsed):
+    """Summarize the results of a load run
+
+    Arguments:
+        latencies (list): per-request latencies, in seconds
+        status_codes (dict): number of responses by status code
+        errors (int): number of requests that failed without a response
+            (recorded as status code 599), or returned an unexpected status
+            code
+        elapsed (float): wall-clock duration of the load run, in seconds
+
+    Returns:
+        (dict): request count, error count, status code counts, throughput
+            (requests per second) and latency (milliseconds) summary
+    """
+
+    sorted_ms = sorted(latency * 1000.0 for latency in latencies)
+    latency_ms = {"p%d" % pct: percentile(sorted_ms, pct)
+                  for pct in PERCENTILES}
+    latency_ms["mean"] = sum(sorted_ms) / len(sorted_ms) if sorted_ms else None
+    latency_ms["max"] = sorted_ms[-1] if sorted_ms else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": {str(code): count for code, count
+                         in sorted(status_codes.items())},
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else None,
+        "latency_ms": latency_ms
+    }
+
+async def run_load(url, headers=None, requests=1000, concurrency=16,
+                   expected_status=None, timeout=60.0):
+    """Send requests to a url, keeping a fixed number of requests in flight
+
+    Arguments:
+        url (str): requested url
+        headers (dict): request headers
+        requests (int): total number of requests to send
+        concurrency (int): number of requests kept in flight
+        expected_status (int): expected response status code, other status
+            codes are counted as errors
+        timeout (float): per-request timeout, in seconds
+
+    Returns:
+        (dict): load run summary, see summarize
+    """
+
+    client = tornado.httpclient.AsyncHTTPClient(
+        force_instance=True, max_clients=concurrency)
+    latencies = []
+    status_codes = {}
+    counters = {"remaining": requests, "errors": 0}
+
+    async def worker():
+        while counters["remaining"] > 0:
+            counters["remaining"] -= 1
+            started = time.perf_counter()
+            try:
+                response = await client.fetch(
+                    url, headers=headers, follow_redirects=False,
+                    raise_error=False, request_timeout=timeout,
+                    decompress_response=False)
+                code = response.code
+            except Exception:
+                code = 599
+            latencies.append(time.perf_counter() - started)
+            status_codes[code] = status_codes.get(code, 0) + 1
+            if code == 599 or \
+                (expected_status and code != expected_status):
+                counters["errors"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for i in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    client.close()
+    return summarize(latencies, status_codes, counters["errors"], elapsed)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""End-to-end refget server benchmark
+
+Starts a stand-in upstream datasource and a refget server (as a separate
+process, exactly as 'refget-server' would run it) pointed at the stand-in,
+then drives each route and subsequence mode with the concurrent load
+generator. Results are written as JSON, so that builds can be compared.
+
+Run from the repository root:
+
+    PYTHONPATH=lib/ python -m test.benchmark.run_benchmark --help
+"""
+
+import asyncio
+import click
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tornado.httpclient
+from test.benchmark.load import run_load
+from test.benchmark.standin import StandInConfig, get_synthetic_seqid, \
+    start_standin
+
+LIB_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), "lib")
+"""Directory of the refget server package under test"""
+
+SEQID = "2085c82d80500a91dd0b8aa9237b0e43f1c07809bd6e6785"
+"""Sequence id of the (small) fixture sequence requested by most scenarios"""
+
+LARGE_SEQID = "959cb1883fc1ca9ae1394ceb475a356ead1ecceff5824ae7"
+"""Sequence id of the (large) fixture sequence requested by redirect
+scenarios"""
+
+SERVER_STARTUP_TIMEOUT = 30.0
+"""Seconds to wait for the refget server to accept requests"""
+
+def get_scenarios(metadata_mode, range_mode, synthetic_length):
+    """Get the benchmark scenarios, covering each route and subsequence mode
+
+    Arguments:
+        metadata_mode (str): 'redirect' or 'proxy', server metadata mode
+        range_mode (str): 'redirect' or 'proxy', server range mode
+        synthetic_length (int): length of the synthetic sequence, 0 if there
+            is no synthetic sequence
+
+    Returns:
+        (list): scenarios, as (name, path, request headers, expected status)
+    """
+
+    scenarios = [
+        ("service-info", "/sequence/service-info", None, 200),
+        ("metadata", "/sequence/%s/metadata" % SEQID, None,
+         200 if metadata_mode == "proxy" else 302),
+        ("sequence-full", "/sequence/%s" % SEQID, None, 200),
+        ("sequence-full-redirect", "/sequence/%s" % LARGE_SEQID, None, 302),
+        ("sequence-range", "/sequence/%s" % SEQID,
+         {"Range": "bytes=25-49"}, 206),
+        ("sequence-start-end", "/sequence/%s?start=25&end=50" % SEQID,
+         None, 200)
+    ]
+    if range_mode == "redirect":
+        # large ranges are redirected, unless ranges are always proxied
+        scenarios.insert(5, (
+            "sequence-range-redirect", "/sequence/%s" % LARGE_SEQID,
+            {"Range": "bytes=0-99999"}, 302))
+    if synthetic_length:
+        scenarios.append(
+            ("sequence-start-end-large", "/sequence/%s?start=0&end=%d" % (
+                get_synthetic_seqid(synthetic_length), synthetic_length),
+             None, 200))
+    return scenarios
+
+def get_unused_port():
+    """Get a currently unused local TCP port
+
+    Returns:
+        (int): port number
+    """
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+def write_properties_file(properties):
+    """Write refget server properties to a temporary properties file
+
+    Arguments:
+        properties (dict): refget server properties
+
+    Returns:
+        (str): path to the properties file
+    """
+
+    fd, path = tempfile.mkstemp(prefix="refget-benchmark-",
+                                suffix=".properties")
+    with os.fdopen(fd, "w") as fh:
+        fh.write("\n".join("%s=%s" % (key, value)
+                           for key, value in properties.items()))
+    return path
+
+def start_server(properties_file):
+    """Start the refget server in a separate process
+
+    Arguments:
+        properties_file (str): path to the server properties file
+
+    Returns:
+        (subprocess.Popen): refget server process
+    """
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [LIB_DIR] + [p for p in [env.get("PYTHONPATH")] if p])
+    return subprocess.Popen(
+        [sys.executable, "-c",
+         "from ga4gh.refget.server.server import run_server; run_server()",
+         "--properties-file", properties_file],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_for_server(base_url, process):
+    """Wait until the refget server accepts requests
+
+    Arguments:
+        base_url (str): refget server base url
+        process (subprocess.Popen): refget server process
+
+    Raises:
+        click.ClickException: if the server exited or did not start in time
+    """
+
+    client = tornado.httpclient.HTTPClient()
+    deadline = time.monotonic() + SERVER_STARTUP_TIMEOUT
+    try:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise click.ClickException(
+                    "refget server exited with code %d" % process.returncode)
+            try:
+                client.fetch(base_url + "/sequence/service-info")
+                return
+            except (OSError, tornado.httpclient.HTTPError):
+                time.sleep(0.1)
+    finally:
+        client.close()
+    raise click.ClickException("refget server did not start in time")
+
+@click.command()
+@click.option('--requests', type=int, default=1000,
+              help='Number of requests per scenario')
+@click.option('--concurrency', type=int, default=16,
+              help='Number of requests kept in flight')
+@click.option('--warmup', type=int, default=50,
+              help='Number of unmeasured requests per scenario')
+@click.option('--latency', type=float, default=0.0,
+              help='Stand-in datasource latency per response, in milliseconds')
+@click.option('--bandwidth', type=int, default=0,
+              help='Stand-in datasource bandwidth in bytes per second, '
+                   + '0 for unlimited')
+@click.option('--range-support/--no-range-support', default=True,
+              help='Whether the stand-in datasource honours Range requests')
+@click.option('--synthetic-length', type=int, default=4194304,
+              help='Length of the large synthetic sequence, 0 to skip the '
+                   + 'large subsequence scenario')
+@click.option('--scenario', 'scenarios', multiple=True,
+              help='Scenario to run (repeatable), default all')
+@click.option('--server-property', 'server_properties', multiple=True,
+              help='Additional refget server property as key=value '
+                   + '(repeatable), e.g. server.workers=4')
+@click.option('--output', type=click.Path(), default=None,
+              help='Path to JSON results file, default stdout')
+def run_benchmark(**kwargs):
+    """Benchmark the refget server against a stand-in datasource
+
+    Arguments:
+        kwargs (dict): dictionary of commandline options
+    """
+
+    standin_config = StandInConfig(
+        latency=kwargs["latency"] / 1000.0,
+        bandwidth=kwargs["bandwidth"],
+        range_support=kwargs["range_support"],
+        synthetic_length=kwargs["synthetic_length"])
+    standin_port = start_standin(standin_config)
+
+    server_port = get_unused_port()
+    properties = {
+        "source.base_url": "http://127.0.0.1:%d" % standin_port,
+        "source.sequence_path": "/sequence/{seqid}",
+        "source.metadata_path": "/sequence/{seqid}/metadata",
+        "server.port": server_port,
+        # the large subsequence scenario exceeds the default subsequence limit
+        "server.subsequence_limit": 0
+    }
+    for server_property in kwargs["server_properties"]:
+        key, value = server_property.split("=", 1)
+        properties[key] = value
+    properties_file = write_properties_file(properties)
+
+    scenarios = get_scenarios(
+        properties.get("server.metadata_mode", "redirect"),
+        properties.get("server.range_mode", "redirect"),
+        kwargs["synthetic_length"])
+    if kwargs["scenarios"]:
+        scenarios = [s for s in scenarios if s[0] in kwargs["scenarios"]]
+
+    base_url = "http://127.0.0.1:%d" % server_port
+    process = start_server(properties_file)
+    results = []
+    loop = asyncio.get_event_loop()
+    try:
+        wait_for_server(base_url, process)
+        for name, path, headers, expected_status in scenarios:
+            if kwargs["warmup"]:
+                loop.run_until_complete(run_load(
+                    base_url + path, headers=headers,
+                    requests=kwargs["warmup"],
+                    concurrency=kwargs["concurrency"]))
+            result = loop.run_until_complete(run_load(
+                base_url + path, headers=headers,
+                requests=kwargs["requests"],
+                concurrency=kwargs["concurrency"],
+                expected_status=expected_status))
+            result["scenario"] = name
+            results.append(result)
+    finally:
+        process.terminate()
+        process.wait()
+        os.remove(properties_file)
+
+    output = json.dumps({
+        "config": {
+            "requests": kwargs["requests"],
+            "concurrency": kwargs["concurrency"],
+            "standin": {
+                "latency_ms": kwargs["latency"],
+                "bandwidth": kwargs["bandwidth"],
+                "range_support": kwargs["range_support"],
+                "synthetic_length": kwargs["synthetic_length"]
+            },
+            "server_properties": properties
+        },
+        "scenarios": results
+    }, indent=2)
+
+    if kwargs["output"]:
+        with open(kwargs["output"], "w") as fh:
+            fh.write(output + "\n")
+    else:
+        click.echo(output)
+
+if __name__ == "__main__":
+    run_benchmark()
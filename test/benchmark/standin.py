@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""Stand-in upstream datasource for benchmarking the refget server
+
+Serves sequence and metadata objects the same way a cloud object store would
+('/sequence/{seqid}' and '/sequence/{seqid}/metadata'), with a configurable
+latency added to every response, a configurable bandwidth limit on response
+bodies, and optional support for HTTP 'Range' requests. Objects are served
+from the fixture fileserver tree, plus one synthetic sequence of configurable
+length, so that large (streamed) subsequences can also be benchmarked.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import tornado.httpserver
+import tornado.netutil
+import tornado.web
+
+FILESERVER_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "common", "fileserver")
+"""Directory of the fixture fileserver tree"""
+
+WRITE_CHUNK_SIZE = 16384
+"""Size (in bytes) of body chunks written by the stand-in datasource"""
+
+SYNTHETIC_BASES = b"ACGT"
+"""Bases the synthetic sequence is built from"""
+
+def get_synthetic_seqid(length):
+    """Get the sequence id of the synthetic sequence of a given length
+
+    Arguments:
+        length (int): synthetic sequence length
+
+    Returns:
+        (str): trunc512-shaped sequence id, unique per length
+    """
+
+    return "%048x" % length
+
+def get_synthetic_sequence(length):
+    """Build a deterministic synthetic sequence
+
+    Arguments:
+        length (int): synthetic sequence length
+
+    Returns:
+        (bytes): synthetic sequence
+    """
+
+    repeat = (length // len(SYNTHETIC_BASES)) + 1
+    return (SYNTHETIC_BASES * repeat)[:length]
+
+class StandInConfig(object):
+    """Behaviour of the stand-in datasource
+
+    Attributes:
+        latency (float): seconds added before every response
+        bandwidth (int): response body bytes per second, 0 for unlimited
+        range_support (bool): if True, 'Range' requests are answered with
+            partial content, otherwise the complete object is returned
+        synthetic_length (int): length of the synthetic sequence, 0 for none
+        objects (dict): sequence bytes and metadata by sequence id
+    """
+
+    def __init__(self, latency=0.0, bandwidth=0, range_support=True,
+                 synthetic_length=0):
+        """StandInConfig constructor
+
+        Arguments:
+            latency (float): seconds added before every response
+            bandwidth (int): response body bytes per second, 0 for unlimited
+            range_support (bool): if True, answer 'Range' requests with
+                partial content
+            synthetic_length (int): length of the synthetic sequence, 0 for
+                none
+        """
+
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.range_support = range_support
+        self.synthetic_length = synthetic_length
+        self.objects = {}
+        self.__load_objects()
+
+    def __load_objects(self):
+        """Load fixture sequences and build the synthetic sequence"""
+
+        seq_dir = os.path.join(FILESERVER_DIR, "sequence")
+        for seqid in sorted(os.listdir(seq_dir)):
+            seq_file = os.path.join(seq_dir, seqid, "index.html")
+            metadata_file = os.path.join(seq_dir, seqid, "metadata")
+            seq = open(seq_file, "rb").read() \
+                if os.path.exists(seq_file) else None
+            metadata = open(metadata_file, "rb").read() \
+                if os.path.exists(metadata_file) else None
+            self.objects[seqid] = {"sequence": seq, "metadata": metadata}
+
+        if self.synthetic_length:
+            seqid = get_synthetic_seqid(self.synthetic_length)
+            metadata = {"metadata": {"md5": None, "trunc512": seqid,
+                        "length": self.synthetic_length, "aliases": []}}
+            self.objects[seqid] = {
+                "sequence": get_synthetic_sequence(self.synthetic_length),
+                "metadata": json.dumps(metadata).encode("utf-8")
+            }
+
+class StandInHandler(tornado.web.RequestHandler):
+    """Serves a stand-in sequence or metadata object
+
+    Attributes:
+        config (StandInConfig): stand-in datasource behaviour
+    """
+
+    def initialize(self, config):
+        """Initialize the request handler with the stand-in configuration"""
+
+        self.config = config
+
+    def get_object(self, seqid, kind):
+        """Get a stand-in object
+
+        Arguments:
+            seqid (str): sequence id
+            kind (str): 'sequence' or 'metadata'
+
+        Returns:
+            (bytes): object body, or None if the object does not exist
+        """
+
+        entry = self.config.objects.get(seqid)
+        return entry[kind] if entry else None
+
+    def get_range(self, length):
+        """Parse a single 'bytes=start-end' 'Range' header
+
+        Arguments:
+            length (int): complete object length
+
+        Returns:
+            (tuple): 0-based, inclusive start and exclusive end, or None if no
+                (supported) 'Range' header was sent
+        """
+
+        if not self.config.range_support:
+            return None
+        match = re.match(r"^bytes=(\d+)-(\d*)$",
+                         self.request.headers.get("Range", ""))
+        if not match:
+            return None
+        start = int(match.group(1))
+        end = int(match.group(2)) + 1 if match.group(2) else length
+        return (start, min(end, length))
+
+    async def write_body(self, body):
+        """Write a response body chunk by chunk, limited to the bandwidth
+
+        Arguments:
+            body (bytes): response body
+        """
+
+        self.set_header("Content-Length", len(body))
+        for offset in range(0, len(body), WRITE_CHUNK_SIZE):
+            chunk = body[offset:offset + WRITE_CHUNK_SIZE]
+            self.write(chunk)
+            await self.flush()
+            if self.config.bandwidth:
+                await asyncio.sleep(len(chunk) / self.config.bandwidth)
+
+    async def serve(self, seqid, kind):
+        """Serve a stand-in object after the configured latency
+
+        Arguments:
+            seqid (str): sequence id
+            kind (str): 'sequence' or 'metadata'
+        """
+
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+
+        body = self.get_object(seqid, kind)
+        if body is None:
+            self.set_status(404)
+            return
+
+        if kind == "sequence":
+            byte_range = self.get_range(len(body))
+            if byte_range:
+                start, end = byte_range
+                if start >= len(body):
+                    self.set_status(416)
+                    self.set_header("Content-Range", "bytes */%d" % len(body))
+                    return
+                self.set_status(206)
+                self.set_header("Content-Range", "bytes %d-%d/%d" % (
+                    start, end - 1, len(body)))
+                body = body[start:end]
+        await self.write_body(body)
+
+class StandInSequenceHandler(StandInHandler):
+    """Serves a stand-in sequence object"""
+
+    async def get(self, seqid):
+        await self.serve(seqid, "sequence")
+
+class StandInMetadataHandler(StandInHandler):
+    """Serves a stand-in metadata object"""
+
+    async def get(self, seqid):
+        await self.serve(seqid, "metadata")
+
+def get_standin_application(config):
+    """Get the stand-in datasource web application
+
+    Arguments:
+        config (StandInConfig): stand-in datasource behaviour
+
+    Returns:
+        (tornado.web.Application): stand-in datasource web application
+    """
+
+    return tornado.web.Application([
+        (r"/sequence/(?P<seqid>[^/]+)/metadata", StandInMetadataHandler,
+         dict(config=config)),
+        (r"/sequence/(?P<seqid>[^/]+)", StandInSequenceHandler,
+         dict(config=config))
+    ])
+
+def start_standin(config):
+    """Start the stand-in datasource on an unused port, in a daemon thread
+
+    The stand-in datasource runs on its own event loop, so that it does not
+    compete with the load generator.
+
+    Arguments:
+        config (StandInConfig): stand-in datasource behaviour
+
+    Returns:
+        (int): port the stand-in datasource is listening on
+    """
+
+    sockets = tornado.netutil.bind_sockets(0, "127.0.0.1")
+    port = sockets[0].getsockname()[1]
+    started = threading.Event()
+
+    def serve():
+        async def main():
+            server = tornado.httpserver.HTTPServer(
+                get_standin_application(config))
+            server.add_sockets(sockets)
+            started.set()
+            await asyncio.Event().wait()
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(main())
+
+    threading.Thread(target=serve, name="standin", daemon=True).start()
+    started.wait()
+    return port
@@ -5,3 +5,22 @@ FILESERVER_PROPS_DICT = {
     "source.base_url": "http://localhost:8080",
     "source.metadata_path": "/sequence/{seqid}/metadata"
 }
+LOCAL_PROPS_DICT = {
+    "source.type": "local",
+    "source.base_url": "test/common/fileserver",
+    "source.sequence_path": "/sequence/{seqid}/index.html",
+    "source.metadata_path": "/sequence/{seqid}/metadata"
+}
+PACKED_PROPS_DICT = {
+    "source.base_url": "http://localhost:8080",
+    "source.sequence_path": "/packed/sequence/{seqid}/index.html",
+    "source.metadata_path": "/sequence/{seqid}/metadata",
+    "source.format": "2bit"
+}
+LOCAL_PACKED_PROPS_DICT = {
+    "source.type": "local",
+    "source.base_url": "test/common/fileserver",
+    "source.sequence_path": "/packed/sequence/{seqid}/index.html",
+    "source.metadata_path": "/sequence/{seqid}/metadata",
+    "source.format": "2bit"
+}
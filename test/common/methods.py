@@ -22,6 +22,8 @@ def setup_request(request_dict):
         if dict_key in request_dict.keys():
             for key in request_dict[dict_key].keys():
                 method(key, request_dict[dict_key][key])
+    if "body" in request_dict.keys():
+        request.set_body(request_dict["body"])
     return request
 
 def setup_properties_request_response(props_dict, request_dict):
@@ -29,4 +31,29 @@ def setup_properties_request_response(props_dict, request_dict):
         setup_properties(props_dict),
         setup_request(request_dict),
         Response()
-    ]
\ No newline at end of file
+    ]
+
+def fetch_from_application(application, path, **kwargs):
+    """Serve a Tornado application on an unused port, and fetch a single path
+
+    Returns:
+        (tornado.httpclient.HTTPResponse): response, not following redirects
+    """
+
+    from tornado.httpclient import AsyncHTTPClient
+    from tornado.httpserver import HTTPServer
+    from tornado.ioloop import IOLoop
+    from tornado.testing import bind_unused_port
+
+    async def fetch():
+        sock, port = bind_unused_port()
+        server = HTTPServer(application)
+        server.add_sockets([sock])
+        try:
+            url = "http://127.0.0.1:%d%s" % (port, path)
+            return await AsyncHTTPClient().fetch(
+                url, raise_error=False, follow_redirects=False, **kwargs)
+        finally:
+            server.stop()
+
+    return IOLoop.current().run_sync(fetch)
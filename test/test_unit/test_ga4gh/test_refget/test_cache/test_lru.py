@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for LRUCache class"""
+
+import pytest
+import time
+from ga4gh.refget.cache.lru import LRUCache
+
+testdata_eviction = [
+    # least recently used key is evicted once maxsize is exceeded
+    (2, ["a", "b", "c"], [], ["b", "c"], ["a"]),
+    # reading a key marks it as most recently used
+    (2, ["a", "b", "c"], ["a"], ["a", "c"], ["b"]),
+    # a cache of size 0 stores nothing
+    (0, ["a"], [], [], ["a"])
+]
+
+@pytest.mark.parametrize("maxsize,put_keys,read_keys,exp_present,exp_absent",
+                         testdata_eviction)
+def test_lru_eviction(maxsize, put_keys, read_keys, exp_present, exp_absent):
+    cache = LRUCache(maxsize)
+    for i, key in enumerate(put_keys):
+        if i == len(put_keys) - 1:
+            for read_key in read_keys:
+                cache.get(read_key)
+        cache.put(key, key.upper())
+
+    for key in exp_present:
+        assert cache.get(key) == key.upper()
+    for key in exp_absent:
+        assert cache.get(key) is None
+
+def test_lru_ttl():
+    cache = LRUCache(4, ttl=0.01)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+def test_lru_stats():
+    cache = LRUCache(4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    assert cache.get_hits() == 2
+    assert cache.get_misses() == 1
+    assert cache.get_stats() == {"hits": 2, "misses": 1, "size": 1,
+                                 "currsize": 1, "maxsize": 4}
+    cache.clear()
+    assert cache.get_stats() == {"hits": 0, "misses": 0, "size": 0,
+                                 "currsize": 0, "maxsize": 4}
+
+def test_lru_sizeof():
+    cache = LRUCache(10, sizeof=len)
+    cache.put("a", "AAAA")
+    cache.put("b", "CCCC")
+    assert cache.get_stats()["currsize"] == 8
+    # adding 4 more bytes evicts least recently used entry
+    cache.put("c", "GGGG")
+    assert cache.get("a") is None
+    assert cache.get_stats()["currsize"] == 8
+    # replacing an entry updates the total size
+    cache.put("b", "CC")
+    assert cache.get_stats()["currsize"] == 6
+    # values larger than the cache are not cached
+    cache.put("d", "T" * 11)
+    assert cache.get("d") is None
+    assert cache.get("c") == "GGGG"
+
+def test_lru_contains():
+    cache = LRUCache(2, ttl=0.01)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.contains("a")
+    assert not cache.contains("c")
+    # contains does not mark entries as used, or count hits
+    cache.put("c", 3)
+    assert not cache.contains("a")
+    assert cache.get_hits() == 0
+    time.sleep(0.02)
+    assert not cache.contains("c")
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for PinnedStore class"""
+
+import pytest
+from ga4gh.refget.cache.pinned import PinnedStore
+
+testdata_pin = [
+    # values are pinned until the store is full, and never evicted
+    (10, ["aaaa", "bbbb", "cccc"], ["aaaa", "bbbb"], ["cccc"]),
+    # smaller values are pinned once larger values are refused
+    (10, ["aaaa", "bbbbbbbb", "cc"], ["aaaa", "cc"], ["bbbbbbbb"]),
+    # a store of size 0 pins nothing
+    (0, ["a"], [], ["a"])
+]
+
+@pytest.mark.parametrize("maxsize,values,exp_pinned,exp_refused",
+                         testdata_pin)
+def test_pinned_store_pin(maxsize, values, exp_pinned, exp_refused):
+    store = PinnedStore(maxsize)
+    results = {value: store.pin(value, value.upper()) for value in values}
+
+    for value in exp_pinned:
+        assert results[value]
+        assert store.contains(value)
+        assert store.get(value) == value.upper()
+    for value in exp_refused:
+        assert not results[value]
+        assert not store.contains(value)
+        assert store.get(value) is None
+    assert store.currsize == sum(len(value) for value in exp_pinned)
+
+def test_pinned_store_repin():
+    store = PinnedStore(10)
+    assert store.pin("a", "AAAAAAAA")
+    # repinned value replaces, rather than adds to, the previous value
+    assert store.pin("a", "AAAAAAAAAA")
+    assert store.get_stats() == {"size": 1, "currsize": 10, "maxsize": 10}
+    store.clear()
+    assert store.get_stats() == {"size": 0, "currsize": 0, "maxsize": 10}
+    assert store.get("a") is None
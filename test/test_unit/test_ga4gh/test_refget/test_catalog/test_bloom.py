@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for Bloom filter of known sequence ids"""
+
+import pytest
+from click.testing import CliRunner
+from ga4gh.refget.catalog.bloom import BloomFilter, get_bloom_filter
+from ga4gh.refget.catalog.builder import run_bloom_builder
+from ga4gh.refget.config.exceptions import RefgetCatalogException
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE, \
+    TRUNC512_NONEXISTENT
+from test.common.methods import setup_properties
+
+def test_bloom_filter(tmp_path):
+    known = ["%048x" % i for i in range(1000)]
+    bloom_filter = BloomFilter.for_capacity(len(known), 0.01)
+    for seqid in known:
+        bloom_filter.add(seqid)
+
+    # no false negatives, few false positives
+    assert all(seqid in bloom_filter for seqid in known)
+    unknown = ["%048x" % i for i in range(1000, 11000)]
+    false_positives = sum(seqid in bloom_filter for seqid in unknown)
+    assert false_positives < 300
+
+    path = str(tmp_path / "bloom.bin")
+    bloom_filter.save(path)
+    loaded = BloomFilter.load(path)
+    assert (loaded.n_bits, loaded.n_hashes) == \
+        (bloom_filter.n_bits, bloom_filter.n_hashes)
+    assert all(seqid in loaded for seqid in known)
+
+def test_invalid_bloom_filter(tmp_path):
+    invalid_file = tmp_path / "invalid.bin"
+    invalid_file.write_bytes(b"not a bloom filter")
+    for path in [str(invalid_file), str(tmp_path / "nonexistent.bin")]:
+        with pytest.raises(RefgetCatalogException):
+            BloomFilter.load(path)
+
+def test_run_bloom_builder(tmp_path):
+    ids_file = tmp_path / "ids.txt"
+    ids_file.write_text("\n".join([TRUNC512_PHAGE, TRUNC512_CEREVISIAE, ""]))
+    path = str(tmp_path / "bloom.bin")
+    result = CliRunner().invoke(run_bloom_builder, [
+        "--ids-file", str(ids_file), "--output", path])
+    assert result.exit_code == 0
+
+    properties = setup_properties({"local.bloom_file": path})
+    bloom_filter = get_bloom_filter(properties)
+    assert get_bloom_filter(properties) is bloom_filter
+    assert TRUNC512_PHAGE in bloom_filter
+    assert TRUNC512_CEREVISIAE in bloom_filter
+    assert TRUNC512_NONEXISTENT not in bloom_filter
+    assert get_bloom_filter(setup_properties({})) is None
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for sequence catalog builder"""
+
+import pytest
+from click.testing import CliRunner
+from ga4gh.refget.catalog.builder import get_aliases, iter_metadata, \
+    build_catalog, run_builder
+from ga4gh.refget.catalog.catalog import Catalog
+from test.common.constants import TRUNC512_PHAGE
+
+testdata_aliases = [
+    (
+        {"md5": "a" * 32, "trunc512": TRUNC512_PHAGE, "aliases": []},
+        ["a" * 32, TRUNC512_PHAGE, "ga4gh:SQ.IIXILYBQCpHdC4qpI3sOQ_HAeAm9bmeF"]
+    ),
+    (
+        {"md5": "a" * 32, "aliases": [
+            {"alias": "NC_001422.1", "naming_authority": "insdc"}]},
+        ["a" * 32, "NC_001422.1"]
+    )
+]
+
+@pytest.mark.parametrize("metadata,exp_aliases", testdata_aliases)
+def test_get_aliases(metadata, exp_aliases):
+    assert get_aliases(metadata) == exp_aliases
+
+def test_iter_metadata():
+    lengths = [m["length"] for m in iter_metadata("test/common/fileserver")]
+    assert sorted(lengths) == [5386, 230218]
+
+def test_build_catalog_canonical_md5(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    assert build_catalog(iter_metadata("test/common/fileserver"), path,
+                         canonical="md5") == [2, 6]
+    assert Catalog(path).lookup(TRUNC512_PHAGE) == \
+        ["3332ed720ac7eaa9b3655c06f6b9e196", 5386]
+
+def test_run_builder(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    runner = CliRunner()
+    result = runner.invoke(run_builder, [
+        "--metadata-dir", "test/common/fileserver", "--output", path])
+    assert result.exit_code == 0
+    assert Catalog(path).n_sequences == 2
+
+    result = runner.invoke(run_builder, [
+        "--metadata-dir", str(tmp_path), "--output", path])
+    assert result.exit_code == 1
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for sequence catalog"""
+
+import pytest
+from ga4gh.refget.catalog.builder import build_catalog, iter_metadata
+from ga4gh.refget.catalog.catalog import Catalog, get_catalog, \
+    get_ga4gh_identifier, resolve_seqid
+from ga4gh.refget.config.exceptions import RefgetCatalogException
+from ga4gh.refget.datasource.metadata import get_sequence_length
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE, \
+    TRUNC512_NONEXISTENT
+from test.common.methods import setup_properties
+
+MD5_PHAGE = "3332ed720ac7eaa9b3655c06f6b9e196"
+MD5_CEREVISIAE = "6681ac2f62509cfc220d78751b8dc524"
+GA4GH_PHAGE = "ga4gh:SQ.IIXILYBQCpHdC4qpI3sOQ_HAeAm9bmeF"
+
+@pytest.fixture(scope="module")
+def catalog_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("catalog") / "catalog.bin")
+    build_catalog(iter_metadata("test/common/fileserver"), path)
+    return path
+
+def test_get_ga4gh_identifier():
+    assert get_ga4gh_identifier(TRUNC512_PHAGE) == GA4GH_PHAGE
+
+testdata_lookup = [
+    (TRUNC512_PHAGE, [TRUNC512_PHAGE, 5386]),
+    (MD5_PHAGE, [TRUNC512_PHAGE, 5386]),
+    (GA4GH_PHAGE, [TRUNC512_PHAGE, 5386]),
+    (TRUNC512_CEREVISIAE, [TRUNC512_CEREVISIAE, 230218]),
+    (MD5_CEREVISIAE, [TRUNC512_CEREVISIAE, 230218]),
+    (TRUNC512_NONEXISTENT, None),
+    ("0" * 49, None),
+    ("", None)
+]
+
+@pytest.mark.parametrize("alias,exp_entry", testdata_lookup)
+def test_lookup(catalog_file, alias, exp_entry):
+    catalog = Catalog(catalog_file)
+    assert catalog.n_sequences == 2
+    assert catalog.n_aliases == 6
+    assert catalog.lookup(alias) == exp_entry
+
+def test_invalid_catalog(tmp_path):
+    invalid_file = tmp_path / "invalid.bin"
+    invalid_file.write_bytes(b"not a catalog file")
+    for path in [str(invalid_file), str(tmp_path / "nonexistent.bin")]:
+        with pytest.raises(RefgetCatalogException):
+            Catalog(path)
+
+def test_resolve_seqid(catalog_file):
+    properties = setup_properties({})
+    assert get_catalog(properties) is None
+    assert resolve_seqid(properties, MD5_PHAGE) == MD5_PHAGE
+
+    properties = setup_properties({"local.catalog_file": catalog_file})
+    assert get_catalog(properties) is get_catalog(properties)
+    assert resolve_seqid(properties, MD5_PHAGE) == TRUNC512_PHAGE
+    assert resolve_seqid(properties, TRUNC512_NONEXISTENT) is None
+
+def test_get_sequence_length(catalog_file, monkeypatch):
+    # lengths are resolved from the catalog, without upstream requests
+    properties = setup_properties({"local.catalog_file": catalog_file,
+                                   "source.base_url": "http://invalid"})
+    assert get_sequence_length(properties, GA4GH_PHAGE) == [200, 5386]
+    assert get_sequence_length(properties, TRUNC512_NONEXISTENT) == \
+        [404, None]
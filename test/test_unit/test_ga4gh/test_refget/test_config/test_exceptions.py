@@ -4,13 +4,18 @@
 import pytest
 from ga4gh.refget.config.exceptions import RefgetException, \
     RefgetInvalidPropertyException, RefgetPropertiesFileNotFoundException, \
-    RefgetPropertiesParseException
+    RefgetPropertiesParseException, RefgetOpenApiNotFoundException, \
+    RefgetCatalogException, RefgetOverloadedException, RefgetWarmupException
 
 testdata = [
     (RefgetException, "invalid operation", 1),
     (RefgetInvalidPropertyException, "invalid property", 2),
     (RefgetPropertiesFileNotFoundException, "file not found", 3),
-    (RefgetPropertiesParseException, "could not parse file", 4)
+    (RefgetPropertiesParseException, "could not parse file", 4),
+    (RefgetOpenApiNotFoundException, "openapi file not found", 5),
+    (RefgetCatalogException, "catalog file not found", 6),
+    (RefgetOverloadedException, "server is overloaded", 7),
+    (RefgetWarmupException, "warm-up file could not be read", 8)
 ]
 
 @pytest.mark.parametrize("exc_class,message,exp_exit_code", testdata)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for AdmittedDataSource class"""
+
+import pytest
+from ga4gh.refget.config.exceptions import RefgetOverloadedException
+from ga4gh.refget.datasource.admitted_source import AdmittedDataSource
+from ga4gh.refget.datasource.cached_source import CachedDataSource
+from ga4gh.refget.datasource.http_source import HttpDataSource
+from ga4gh.refget.datasource.local_source import LocalDataSource
+from ga4gh.refget.datasource.pinned_source import PinnedDataSource, \
+    get_pinned_store
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_NONEXISTENT, \
+    FILESERVER_PROPS_DICT, LOCAL_PROPS_DICT
+from test.common.methods import setup_properties
+
+def get_admitted_source(props_dict, cached=False):
+    props_dict = dict(props_dict)
+    # unique limits, so that each test has its own admission controller
+    props_dict["server.max_upstream_fetches"] = "1"
+    props_dict["server.max_inflight_bytes"] = str(1000 + len(props_dict)
+                                                  + int(cached) * 7919)
+    properties = setup_properties(props_dict)
+    if cached:
+        datasource = CachedDataSource(properties, HttpDataSource(properties))
+    else:
+        datasource = LocalDataSource(properties)
+    return AdmittedDataSource(properties, datasource)
+
+def test_get_subsequence():
+    datasource = get_admitted_source(LOCAL_PROPS_DICT)
+    assert datasource.get_subsequence(TRUNC512_PHAGE, 25, 30) == "AAGTT"
+    assert datasource.get_subsequence(TRUNC512_NONEXISTENT, 25, 30) is None
+    assert [datasource.admission.fetches, datasource.admission.bytes] == [0, 0]
+
+def test_get_subsequence_rejected():
+    datasource = get_admitted_source(LOCAL_PROPS_DICT)
+    datasource.admission.acquire(0)
+    with pytest.raises(RefgetOverloadedException):
+        datasource.get_subsequence(TRUNC512_PHAGE, 25, 30)
+    with pytest.raises(RefgetOverloadedException):
+        datasource.stream_subsequence(TRUNC512_PHAGE, 25, 30)
+    datasource.admission.release(0)
+
+def test_get_subsequence_cached():
+    # subsequences served entirely from cache are not subject to admission
+    datasource = get_admitted_source(FILESERVER_PROPS_DICT, cached=True)
+    datasource.datasource.block_cache.clear()
+    assert not datasource.is_cached(TRUNC512_PHAGE, 25, 30)
+    assert datasource.get_subsequence(TRUNC512_PHAGE, 25, 30) == "AAGTT"
+    assert datasource.is_cached(TRUNC512_PHAGE, 25, 30)
+    datasource.admission.acquire(0)
+    assert datasource.get_subsequence(TRUNC512_PHAGE, 25, 30) == "AAGTT"
+    datasource.admission.release(0)
+
+def test_stream_subsequence():
+    datasource = get_admitted_source(LOCAL_PROPS_DICT)
+
+    # fetch is held until the stream is exhausted
+    stream = datasource.stream_subsequence(TRUNC512_PHAGE, 25, 30)
+    assert datasource.admission.fetches == 1
+    assert b"".join(bytes(chunk) for chunk in stream) == b"AAGTT"
+    assert datasource.admission.fetches == 0
+
+    # or closed, even if never read
+    stream = datasource.stream_subsequence(TRUNC512_PHAGE, 25, 30)
+    stream.close()
+    stream.close()
+    assert datasource.admission.fetches == 0
+
+    assert datasource.stream_subsequence(TRUNC512_NONEXISTENT, 25, 30) is None
+    assert datasource.admission.fetches == 0
+
+def test_stream_subsequence_in_memory():
+    # streams of pinned or entirely cached subsequences are not subject to
+    # admission, even when the fetch limit is saturated
+    props_dict = dict(FILESERVER_PROPS_DICT)
+    props_dict["server.max_upstream_fetches"] = "1"
+    props_dict["server.max_inflight_bytes"] = "1013"
+    props_dict["cache.pinned_bytes"] = "10000"
+    properties = setup_properties(props_dict)
+    get_pinned_store(properties).clear()
+    cached = CachedDataSource(properties, HttpDataSource(properties))
+    cached.block_cache.clear()
+    datasource = AdmittedDataSource(
+        properties, PinnedDataSource(properties, cached))
+
+    datasource.admission.acquire(0)
+    try:
+        with pytest.raises(RefgetOverloadedException):
+            datasource.stream_subsequence(TRUNC512_PHAGE, 25, 30)
+
+        # entirely cached subsequence
+        assert cached.get_subsequence(TRUNC512_PHAGE, 25, 30) == "AAGTT"
+        stream = datasource.stream_subsequence(TRUNC512_PHAGE, 25, 30)
+        assert b"".join(stream) == b"AAGTT"
+
+        # pinned sequence
+        assert datasource.pin_sequence(TRUNC512_PHAGE, 5386)
+        stream = datasource.stream_subsequence(TRUNC512_PHAGE, 1000, 1005)
+        assert b"".join(stream) == b"ATGTC"
+        assert datasource.admission.fetches == 1
+    finally:
+        datasource.admission.release(0)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for CachedDataSource class"""
+
+import pytest
+import threading
+import time
+from ga4gh.refget.cache.lru import LRUCache
+from ga4gh.refget.datasource import cached_source
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.datasource.cached_source import CachedDataSource, \
+    get_block_cache
+from test.common.methods import setup_properties
+
+SEQ = "ACGTTGCAAC" * 10
+
+class RecordingDataSource(DataSource):
+    """Stand-in datasource, recording each requested range"""
+
+    def __init__(self, properties):
+        super(RecordingDataSource, self).__init__(properties)
+        self.requests = []
+
+    def get_subsequence(self, seqid, start, end):
+        self.requests.append((start, end))
+        return SEQ[start:end]
+
+    def stream_subsequence(self, seqid, start, end):
+        self.requests.append(("stream", start, end))
+        return [SEQ[start:end].encode("ascii")]
+
+testdata = [
+    # single block
+    ([(2, 8)], [(0, 10)]),
+    # subsequence spanning several blocks, fetched in a single request
+    ([(5, 35)], [(0, 40)]),
+    # second request is assembled entirely from cached blocks
+    ([(5, 35), (12, 28)], [(0, 40)]),
+    # only missing blocks are requested
+    ([(12, 18), (32, 38), (5, 45)], [(10, 20), (30, 40), (0, 10), (20, 30),
+                                     (40, 50)]),
+    # final, short block at the end of the sequence
+    ([(95, 100), (97, 100)], [(90, 100)])
+]
+
+@pytest.mark.parametrize("ranges,exp_requests", testdata)
+def test_cached_subsequence(ranges, exp_requests):
+    properties = setup_properties({
+        "cache.sequence_bytes": "1000",
+        "cache.sequence_block_size": "10"
+    })
+    get_block_cache(properties).clear()
+    wrapped = RecordingDataSource(properties)
+    datasource = CachedDataSource(properties, wrapped)
+
+    for start, end in ranges:
+        assert datasource.get_subsequence("seq", start, end) == SEQ[start:end]
+    assert wrapped.requests == exp_requests
+
+def test_cached_subsequence_eviction():
+    properties = setup_properties({
+        "cache.sequence_bytes": "20",
+        "cache.sequence_block_size": "10"
+    })
+    block_cache = get_block_cache(properties)
+    block_cache.clear()
+    wrapped = RecordingDataSource(properties)
+    datasource = CachedDataSource(properties, wrapped)
+
+    datasource.get_subsequence("seq", 0, 30)
+    assert block_cache.get_stats()["currsize"] == 20
+    # first block was evicted, and is requested again
+    datasource.get_subsequence("seq", 0, 5)
+    assert wrapped.requests == [(0, 30), (0, 10)]
+
+def test_get_block_cache_concurrent(monkeypatch):
+    # concurrent first calls share a single process-wide cache
+    def slow_lru_cache(*args, **kwargs):
+        time.sleep(0.01)
+        return LRUCache(*args, **kwargs)
+    monkeypatch.setattr(cached_source, "LRUCache", slow_lru_cache)
+    properties = setup_properties({"cache.sequence_bytes": "1717"})
+    caches = []
+    threads = [threading.Thread(target=lambda: caches.append(
+        get_block_cache(properties))) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(caches) == 8
+    assert all(cache is caches[0] for cache in caches)
+
+def test_cached_stream_subsequence():
+    properties = setup_properties({
+        "cache.sequence_bytes": "1001",
+        "cache.sequence_block_size": "10"
+    })
+    get_block_cache(properties).clear()
+    wrapped = RecordingDataSource(properties)
+    datasource = CachedDataSource(properties, wrapped)
+
+    # streams are passed through uncached, unless every block is cached
+    assert b"".join(datasource.stream_subsequence("seq", 5, 35)) == \
+        SEQ[5:35].encode("ascii")
+    assert datasource.get_subsequence("seq", 5, 25) == SEQ[5:25]
+    assert b"".join(datasource.stream_subsequence("seq", 5, 25)) == \
+        SEQ[5:25].encode("ascii")
+    assert wrapped.requests == [("stream", 5, 35), (0, 30)]
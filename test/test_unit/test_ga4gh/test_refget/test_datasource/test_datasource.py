@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for datasource selection"""
+
+import pytest
+from ga4gh.refget.config.exceptions import RefgetInvalidPropertyException
+from ga4gh.refget.datasource.admitted_source import AdmittedDataSource
+from ga4gh.refget.datasource.cached_source import CachedDataSource
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.http_source import HttpDataSource
+from ga4gh.refget.datasource.local_source import LocalDataSource
+from ga4gh.refget.datasource.packed_source import PackedDataSource
+from ga4gh.refget.datasource.pinned_source import PinnedDataSource
+from test.common.methods import setup_properties
+
+testdata = [
+    ({}, CachedDataSource),
+    ({"source.type": "http"}, CachedDataSource),
+    ({"source.type": "http", "cache.sequence_bytes": "0"}, HttpDataSource),
+    ({"source.type": "local"}, LocalDataSource),
+    ({"source.base_url": "file:///data/refget"}, LocalDataSource),
+    ({"source.type": "ftp"}, None),
+    ({"source.type": "local", "source.format": "2bit"}, PackedDataSource),
+    ({"source.format": "2bit"}, CachedDataSource),
+    ({"source.format": "fasta"}, None),
+    # remote sequences are pinned if enabled, local sequences are not
+    ({"cache.pinned_bytes": "1000"}, PinnedDataSource),
+    ({"source.type": "local", "cache.pinned_bytes": "1000"}, LocalDataSource)
+]
+
+testdata_admission = [
+    ({}, True),
+    ({"server.max_upstream_fetches": "0"}, True),
+    ({"server.max_upstream_fetches": "0", "server.max_inflight_bytes": "0"},
+     False)
+]
+
+@pytest.mark.parametrize("props_dict,exp_class", testdata)
+def test_get_datasource(props_dict, exp_class):
+    properties = setup_properties(props_dict)
+    try:
+        datasource = get_datasource(properties)
+        # subsequence fetches are admitted by default
+        assert isinstance(datasource, AdmittedDataSource)
+        assert isinstance(datasource.datasource, exp_class)
+    except RefgetInvalidPropertyException as e:
+        assert exp_class is None
+
+@pytest.mark.parametrize("props_dict,exp_admitted", testdata_admission)
+def test_get_datasource_admission(props_dict, exp_admitted):
+    datasource = get_datasource(setup_properties(props_dict))
+    assert isinstance(datasource, AdmittedDataSource) == exp_admitted
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for LocalDataSource class"""
+
+import os
+import pytest
+from ga4gh.refget.datasource.local_source import LocalDataSource
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE, \
+    TRUNC512_NONEXISTENT, LOCAL_PROPS_DICT
+from test.common.methods import setup_properties
+
+testdata_subsequence = [
+    (TRUNC512_PHAGE, 25, 50, "AAGTTAACACTTTCGGATATTTCTG"),
+    (TRUNC512_PHAGE, 5366, None, "ATTGGCGTATCCAACCTGCA"),
+    (TRUNC512_PHAGE, 25, 25, ""),
+    # sequence file not present in local directory
+    (TRUNC512_CEREVISIAE, 25, 50, None),
+    (TRUNC512_NONEXISTENT, 25, 50, None)
+]
+
+testdata_metadata = [
+    (TRUNC512_PHAGE, SC.OK, 5386),
+    (TRUNC512_NONEXISTENT, SC.NOT_FOUND, None)
+]
+
+def get_local_datasource(base_url=LOCAL_PROPS_DICT["source.base_url"]):
+    props_dict = dict(LOCAL_PROPS_DICT)
+    props_dict["source.base_url"] = base_url
+    return LocalDataSource(setup_properties(props_dict))
+
+@pytest.mark.parametrize("seqid,start,end,exp_seq", testdata_subsequence)
+def test_local_subsequence(seqid, start, end, exp_seq):
+    datasource = get_local_datasource()
+    assert datasource.get_subsequence(seqid, start, end) == exp_seq
+
+    seq_stream = datasource.stream_subsequence(seqid, start, end)
+    if exp_seq is None:
+        assert seq_stream is None
+    else:
+        chunks = list(seq_stream)
+        assert all(isinstance(chunk, memoryview) for chunk in chunks)
+        assert b"".join(chunks).decode("ascii") == exp_seq
+
+@pytest.mark.parametrize("seqid,exp_sc,exp_length", testdata_metadata)
+def test_local_metadata(seqid, exp_sc, exp_length):
+    datasource = get_local_datasource()
+    status_code, metadata = datasource.get_metadata(seqid)
+    assert status_code == exp_sc
+    if exp_length is None:
+        assert metadata is None
+    else:
+        assert metadata["metadata"]["length"] == exp_length
+
+def test_local_file_url():
+    base_url = "file://" + os.path.abspath(LOCAL_PROPS_DICT["source.base_url"])
+    datasource = get_local_datasource(base_url)
+    assert datasource.get_sequence_url(TRUNC512_PHAGE) is None
+    assert datasource.get_metadata_url(TRUNC512_PHAGE) is None
+    assert datasource.get_subsequence(TRUNC512_PHAGE, 25, 30) == "AAGTT"
+
+testdata_unsafe = [
+    "../../../u7secret",
+    "..",
+    "a/b",
+    "..\\..\\u7secret"
+]
+
+@pytest.mark.parametrize("seqid", testdata_unsafe)
+def test_local_unsafe_seqid(tmp_path, seqid):
+    # objects outside the local directory are never read
+    (tmp_path / "u7secret.json").write_text('{"metadata": {"length": 1}}')
+    (tmp_path / "u7secret").write_text("ACGT")
+    base_dir = tmp_path / "store" / "sequence" / "metadata"
+    base_dir.mkdir(parents=True)
+    props_dict = dict(LOCAL_PROPS_DICT, **{
+        "source.base_url": str(base_dir),
+        "source.sequence_path": "/{seqid}",
+        "source.metadata_path": "/{seqid}.json"
+    })
+    datasource = LocalDataSource(setup_properties(props_dict))
+    assert datasource.get_path(seqid, "metadata") is None
+    assert datasource.get_metadata(seqid) == [SC.NOT_FOUND, None]
+    assert datasource.get_subsequence(seqid, 0, 4) is None
+    assert datasource.stream_subsequence(seqid, 0, 4) is None
+
+testdata_stream_past_end = [
+    # streams past the end of the file are not truncated below their length
+    (5380, 5387, None),
+    (5380, 5386, b"CCTGCA"),
+    (5380, None, b"CCTGCA")
+]
+
+@pytest.mark.parametrize("start,end,exp_seq", testdata_stream_past_end)
+def test_local_stream_past_end(start, end, exp_seq):
+    datasource = get_local_datasource()
+    seq_stream = datasource.stream_subsequence(TRUNC512_PHAGE, start, end)
+    if exp_seq is None:
+        assert seq_stream is None
+    else:
+        assert b"".join(seq_stream) == exp_seq
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for metadata datasource methods"""
+
+import pytest
+import threading
+import time
+from ga4gh.refget.cache.lru import LRUCache
+from ga4gh.refget.catalog.bloom import BloomFilter
+from ga4gh.refget.datasource import metadata
+from ga4gh.refget.datasource.metadata import get_metadata, \
+    get_metadata_cache, get_negative_cache, get_sequence_length, \
+    is_known_seqid
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE, \
+    TRUNC512_NONEXISTENT, FILESERVER_PROPS_DICT
+from test.common.methods import setup_properties
+
+@pytest.mark.parametrize("get_cache", [get_metadata_cache, get_negative_cache])
+def test_get_cache_concurrent(monkeypatch, get_cache):
+    # concurrent first calls share a single process-wide cache
+    def slow_lru_cache(*args, **kwargs):
+        time.sleep(0.01)
+        return LRUCache(*args, **kwargs)
+    monkeypatch.setattr(metadata, "LRUCache", slow_lru_cache)
+    props_dict = dict(FILESERVER_PROPS_DICT)
+    props_dict["cache.metadata_size"] = "17"
+    props_dict["cache.negative_size"] = "17"
+    properties = setup_properties(props_dict)
+    caches = []
+    threads = [threading.Thread(target=lambda: caches.append(
+        get_cache(properties))) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(caches) == 8
+    assert all(cache is caches[0] for cache in caches)
+
+testdata = [
+    (TRUNC512_PHAGE, SC.OK, 5386),
+    (TRUNC512_CEREVISIAE, SC.OK, 230218),
+    (TRUNC512_NONEXISTENT, SC.NOT_FOUND, None)
+]
+
+@pytest.mark.parametrize("seqid,exp_sc,exp_length", testdata)
+def test_get_sequence_length(seqid, exp_sc, exp_length):
+    properties = setup_properties(FILESERVER_PROPS_DICT)
+    assert get_sequence_length(properties, seqid) == [exp_sc, exp_length]
+
+def test_get_metadata_cached(monkeypatch):
+    props_dict = dict(FILESERVER_PROPS_DICT)
+    props_dict["cache.metadata_size"] = "8"
+    properties = setup_properties(props_dict)
+    cache = get_metadata_cache(properties)
+    cache.clear()
+
+    status_code, metadata_obj = get_metadata(properties, TRUNC512_PHAGE)
+    assert status_code == SC.OK
+    assert metadata_obj["metadata"]["trunc512"] == TRUNC512_PHAGE
+    assert cache.get_stats()["misses"] == 1
+
+    # second lookup is served from cache, without any upstream request
+    monkeypatch.setattr(metadata, "get_datasource", fail_get_datasource)
+    assert get_metadata(properties, TRUNC512_PHAGE) == [SC.OK, metadata_obj]
+    assert cache.get_stats()["hits"] == 1
+
+    # unsuccessful lookups are not cached
+    monkeypatch.undo()
+    get_metadata(properties, TRUNC512_NONEXISTENT)
+    assert cache.get_stats()["size"] == 1
+
+def fail_get_datasource(properties):
+    raise AssertionError("unexpected datasource request")
+
+def test_get_metadata_negative_cached(monkeypatch):
+    props_dict = dict(FILESERVER_PROPS_DICT)
+    props_dict["cache.negative_size"] = "8"
+    properties = setup_properties(props_dict)
+    negative_cache = get_negative_cache(properties)
+    negative_cache.clear()
+
+    # first lookup of an unknown sequence reaches the datasource
+    assert is_known_seqid(properties, TRUNC512_NONEXISTENT)
+    assert get_metadata(properties, TRUNC512_NONEXISTENT) == \
+        [SC.NOT_FOUND, None]
+    assert negative_cache.get_stats()["size"] == 1
+
+    # subsequent lookups are rejected without any upstream request
+    monkeypatch.setattr(metadata, "get_datasource", fail_get_datasource)
+    assert not is_known_seqid(properties, TRUNC512_NONEXISTENT)
+    assert get_metadata(properties, TRUNC512_NONEXISTENT) == \
+        [SC.NOT_FOUND, None]
+
+testdata_malformed = [
+    "abc",
+    "3332ED720AC7EAA9B3655C06F6B9E196",
+    TRUNC512_PHAGE + "0",
+    "ga4gh:SQ.tooshort",
+    "../../etc/passwd"
+]
+
+@pytest.mark.parametrize("seqid", testdata_malformed)
+def test_get_metadata_malformed(seqid, monkeypatch):
+    properties = setup_properties(FILESERVER_PROPS_DICT)
+    monkeypatch.setattr(metadata, "get_datasource", fail_get_datasource)
+    assert not is_known_seqid(properties, seqid)
+    assert get_metadata(properties, seqid) == [SC.NOT_FOUND, None]
+
+def test_get_metadata_bloom_filter(tmp_path, monkeypatch):
+    bloom_file = str(tmp_path / "bloom.bin")
+    bloom_filter = BloomFilter.for_capacity(1, 0.001)
+    bloom_filter.add(TRUNC512_PHAGE)
+    bloom_filter.save(bloom_file)
+
+    props_dict = dict(FILESERVER_PROPS_DICT)
+    props_dict["local.bloom_file"] = bloom_file
+    properties = setup_properties(props_dict)
+    assert is_known_seqid(properties, TRUNC512_PHAGE)
+
+    # sequences absent from the Bloom filter never reach the datasource
+    monkeypatch.setattr(metadata, "get_datasource", fail_get_datasource)
+    unknown_seqid = "%048x" % 1
+    assert not is_known_seqid(properties, unknown_seqid)
+    assert get_metadata(properties, unknown_seqid) == [SC.NOT_FOUND, None]
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for packed sequence datasource"""
+
+import pytest
+from ga4gh.refget.datasource import packed_source
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.local_source import LocalDataSource
+from ga4gh.refget.datasource.packed_source import PackedDataSource
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.packed.twobit import HEADER, encode_sequence
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_NONEXISTENT, \
+    PACKED_PROPS_DICT, LOCAL_PACKED_PROPS_DICT
+from test.common.methods import setup_properties
+
+phage_seq = open(
+    "test/common/fileserver/sequence/%s/index.html" % TRUNC512_PHAGE, "r"
+).read()
+
+testdata_subsequence = [
+    (TRUNC512_PHAGE, 25, 50, phage_seq[25:50]),
+    (TRUNC512_PHAGE, 0, 1, "G"),
+    (TRUNC512_PHAGE, 5380, None, phage_seq[5380:]),
+    (TRUNC512_PHAGE, 5000, 6000, phage_seq[5000:]),
+    (TRUNC512_PHAGE, 5386, None, ""),
+    (TRUNC512_PHAGE, 0, None, phage_seq),
+    (TRUNC512_NONEXISTENT, 0, 10, None)
+]
+
+@pytest.mark.parametrize("props_dict", [PACKED_PROPS_DICT,
+                                        LOCAL_PACKED_PROPS_DICT])
+@pytest.mark.parametrize("seqid,start,end,exp_seq", testdata_subsequence)
+def test_get_subsequence(props_dict, seqid, start, end, exp_seq):
+    properties = setup_properties(props_dict)
+    datasource = get_datasource(properties)
+    assert datasource.get_sequence_url(seqid) is None
+    assert datasource.get_subsequence(seqid, start, end) == exp_seq
+
+@pytest.mark.parametrize("props_dict", [PACKED_PROPS_DICT,
+                                        LOCAL_PACKED_PROPS_DICT])
+@pytest.mark.parametrize("seqid,start,end,exp_seq", testdata_subsequence)
+def test_stream_subsequence(props_dict, seqid, start, end, exp_seq):
+    properties = setup_properties(props_dict)
+    datasource = get_datasource(properties)
+    stream = datasource.stream_subsequence(seqid, start, end)
+    if exp_seq is None:
+        assert stream is None
+    else:
+        assert b"".join(stream).decode("ascii") == exp_seq
+
+def test_stream_subsequence_chunks(monkeypatch):
+    # packed bytes arrive in chunks that are decoded independently
+    properties = setup_properties(LOCAL_PACKED_PROPS_DICT)
+    monkeypatch.setattr("ga4gh.refget.datasource.local_source.READ_CHUNK_SIZE",
+                        7)
+    datasource = get_datasource(properties)
+    chunks = list(datasource.stream_subsequence(TRUNC512_PHAGE, 3, 1001))
+    assert len(chunks) > 1
+    assert b"".join(chunks).decode("ascii") == phage_seq[3:1001]
+
+def test_get_index_cached(monkeypatch):
+    properties = setup_properties(LOCAL_PACKED_PROPS_DICT)
+    packed_source.packed_indexes.clear()
+    datasource = PackedDataSource(properties, LocalDataSource(properties))
+    reads = []
+    read_bytes = datasource.read_bytes
+    monkeypatch.setattr(datasource, "read_bytes",
+        lambda *args: reads.append(args) or read_bytes(*args))
+
+    index = datasource.get_index(TRUNC512_PHAGE)
+    assert index.length == 5386
+    assert datasource.get_index(TRUNC512_PHAGE) is index
+    # local files are not truncated to the first read, so an object shorter
+    # than the first read is read in full
+    assert reads == [(TRUNC512_PHAGE, 0, packed_source.INDEX_READ_SIZE),
+                     (TRUNC512_PHAGE, 0, None)]
+
+    # packed bytes only are read for subsequences
+    reads.clear()
+    datasource.get_subsequence(TRUNC512_PHAGE, 400, 800)
+    assert reads == [(TRUNC512_PHAGE, index.data_offset + 100,
+                      index.data_offset + 200)]
+
+def test_get_index_large(tmp_path, monkeypatch):
+    # indexes larger than the first read are read in a second request
+    seq = b"ACGTN" * 100
+    (tmp_path / "sequence").mkdir()
+    (tmp_path / "sequence" / TRUNC512_PHAGE).write_bytes(
+        encode_sequence(seq))
+    props_dict = dict(LOCAL_PACKED_PROPS_DICT)
+    props_dict["source.base_url"] = str(tmp_path)
+    props_dict["source.sequence_path"] = "/sequence/{seqid}"
+    properties = setup_properties(props_dict)
+    monkeypatch.setattr(packed_source, "INDEX_READ_SIZE", HEADER.size)
+
+    datasource = get_datasource(properties)
+    assert datasource.get_subsequence(TRUNC512_PHAGE, 2, 498) == \
+        seq[2:498].decode("ascii")
+    assert datasource.datasource.get_index(TRUNC512_PHAGE).data_offset == \
+        HEADER.size + 100 * 16
+
+def test_get_index_not_packed():
+    props_dict = dict(LOCAL_PACKED_PROPS_DICT)
+    props_dict["source.sequence_path"] = "/sequence/{seqid}/index.html"
+    properties = setup_properties(props_dict)
+    packed_source.packed_indexes.clear()
+    datasource = get_datasource(properties)
+    assert datasource.get_subsequence(TRUNC512_PHAGE, 0, 10) is None
+
+def test_get_metadata():
+    properties = setup_properties(LOCAL_PACKED_PROPS_DICT)
+    status_code, metadata = get_datasource(properties).get_metadata(
+        TRUNC512_PHAGE)
+    assert status_code == SC.OK
+    assert metadata["metadata"]["length"] == 5386
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for PinnedDataSource class"""
+
+import pytest
+import threading
+import time
+from ga4gh.refget.cache.pinned import PinnedStore
+from ga4gh.refget.datasource import pinned_source
+from ga4gh.refget.datasource.base import DataSource
+from ga4gh.refget.datasource.pinned_source import PinnedDataSource, \
+    get_pinned_store
+from test.common.methods import setup_properties
+
+SEQ = "ACGTTGCAAC" * 10
+
+class RecordingDataSource(DataSource):
+    """Stand-in datasource, recording each requested range"""
+
+    def __init__(self, properties):
+        super(RecordingDataSource, self).__init__(properties)
+        self.requests = []
+
+    def get_subsequence(self, seqid, start, end):
+        self.requests.append((start, end))
+        return SEQ[start:end]
+
+    def stream_subsequence(self, seqid, start, end):
+        self.requests.append((start, end))
+        if seqid == "missing":
+            return None
+        return iter([SEQ[start:end].encode("ascii")])
+
+def setup_datasource(pinned_bytes):
+    properties = setup_properties({"cache.pinned_bytes": str(pinned_bytes)})
+    get_pinned_store(properties).clear()
+    inner = RecordingDataSource(properties)
+    return [PinnedDataSource(properties, inner), inner]
+
+def test_pinned_subsequence():
+    datasource, inner = setup_datasource(1000)
+    assert not datasource.is_pinned("abc")
+    assert datasource.pin_sequence("abc", len(SEQ))
+    assert datasource.is_pinned("abc")
+    assert datasource.is_cached("abc", 0, None)
+    # already pinned sequences are not fetched again
+    assert datasource.pin_sequence("abc", len(SEQ))
+    assert inner.requests == [(0, len(SEQ))]
+
+    # pinned subsequences are served without requests to wrapped datasource
+    assert datasource.get_subsequence("abc", 5, 15) == SEQ[5:15]
+    assert datasource.get_subsequence("abc", 95, None) == SEQ[95:]
+    stream = datasource.stream_subsequence("abc", 10, 90)
+    assert b"".join(stream) == SEQ[10:90].encode("ascii")
+    assert inner.requests == [(0, len(SEQ))]
+
+    # sequences that are not pinned are passed through
+    assert datasource.get_subsequence("def", 5, 15) == SEQ[5:15]
+    assert not datasource.is_cached("def", 5, 15)
+    assert inner.requests == [(0, len(SEQ)), (5, 15)]
+
+testdata_refused = [
+    # sequence could not be retrieved
+    (1000, "missing", len(SEQ)),
+    # retrieved sequence is shorter than its expected length
+    (1000, "abc", len(SEQ) + 10),
+    # sequence does not fit in the store
+    (50, "abc", len(SEQ))
+]
+
+@pytest.mark.parametrize("pinned_bytes,seqid,length", testdata_refused)
+def test_pinned_refused(pinned_bytes, seqid, length):
+    datasource, inner = setup_datasource(pinned_bytes)
+    assert not datasource.pin_sequence(seqid, length)
+    assert not datasource.is_pinned(seqid)
+
+def test_get_pinned_store_concurrent(monkeypatch):
+    # concurrent first calls share a single process-wide store
+    def slow_pinned_store(*args, **kwargs):
+        time.sleep(0.01)
+        return PinnedStore(*args, **kwargs)
+    monkeypatch.setattr(pinned_source, "PinnedStore", slow_pinned_store)
+    properties = setup_properties({"cache.pinned_bytes": "1717"})
+    stores = []
+    threads = [threading.Thread(target=lambda: stores.append(
+        get_pinned_store(properties))) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(stores) == 8
+    assert all(store is stores[0] for store in stores)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for S3DataSource class, against the local fileserver as an
+S3-compatible stand-in"""
+
+import io
+import pytest
+from ga4gh.refget.config.exceptions import RefgetInvalidPropertyException
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.s3_source import S3DataSource, alias_keys, \
+    get_s3_client, reset_s3_clients, resolve_key
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.routes.sequence.get_sequence import get_sequence
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_NONEXISTENT
+from test.common.methods import setup_properties, \
+    setup_properties_request_response
+
+botocore = pytest.importorskip("botocore")
+
+S3_PROPS_DICT = {
+    "source.type": "s3",
+    "source.s3_bucket": "sequence",
+    "source.s3_region": "us-east-1",
+    "source.s3_endpoint_url": "http://localhost:8080",
+    "source.sequence_path": "/{seqid}/index.html",
+    "source.metadata_path": "/{seqid}/metadata"
+}
+
+phage_seq = open(
+    "test/common/fileserver/sequence/%s/index.html" % TRUNC512_PHAGE).read()
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+def setup_datasource(props_dict={}):
+    return S3DataSource(setup_properties(dict(S3_PROPS_DICT, **props_dict)))
+
+def test_resolve_key():
+    properties = setup_properties({})
+    assert resolve_key(properties, "abc", "sequence") == "sequence/abc"
+    assert resolve_key(properties, "abc", "metadata") == \
+        "metadata/json/abc.json"
+
+testdata_metadata = [
+    (TRUNC512_PHAGE, SC.OK, 5386),
+    (TRUNC512_NONEXISTENT, SC.NOT_FOUND, None)
+]
+
+@pytest.mark.parametrize("seqid,exp_sc,exp_length", testdata_metadata)
+def test_s3_metadata(seqid, exp_sc, exp_length):
+    status_code, metadata = setup_datasource().get_metadata(seqid)
+    assert status_code == exp_sc
+    if exp_length is None:
+        assert metadata is None
+    else:
+        assert metadata["metadata"]["length"] == exp_length
+
+testdata_subsequence = [
+    # single ranged call
+    ({}, TRUNC512_PHAGE, 25, 50, phage_seq[25:50]),
+    ({}, TRUNC512_PHAGE, 5380, None, phage_seq[5380:]),
+    ({}, TRUNC512_PHAGE, 50, 50, ""),
+    # parallel part calls, including parts beyond the end of the sequence
+    ({"source.s3_part_size": "1000"}, TRUNC512_PHAGE, 0, 5386, phage_seq),
+    ({"source.s3_part_size": "1000"}, TRUNC512_PHAGE, 10, 8000,
+     phage_seq[10:]),
+    # sequence not found
+    ({}, TRUNC512_NONEXISTENT, 0, 10, None),
+    ({"source.s3_part_size": "4"}, TRUNC512_NONEXISTENT, 0, 10, None)
+]
+
+@pytest.mark.parametrize("props_dict,seqid,start,end,exp_seq",
+                         testdata_subsequence)
+def test_s3_subsequence(props_dict, seqid, start, end, exp_seq):
+    datasource = setup_datasource(props_dict)
+    assert datasource.get_subsequence(seqid, start, end) == exp_seq
+
+    stream = datasource.stream_subsequence(seqid, start, end)
+    if exp_seq is None:
+        assert stream is None
+    else:
+        assert b"".join(stream) == exp_seq.encode("ascii")
+
+testdata_url = [
+    # clients are redirected to presigned urls
+    ({}, True, 3600),
+    ({"source.s3_presign_ttl": "60"}, True, 60),
+    # clients are not redirected
+    ({"source.s3_presign_ttl": "0"}, False, 0)
+]
+
+@pytest.mark.parametrize("props_dict,exp_presigned,exp_ttl", testdata_url)
+def test_s3_url(props_dict, exp_presigned, exp_ttl):
+    datasource = setup_datasource(props_dict)
+    url = datasource.get_sequence_url(TRUNC512_PHAGE)
+    metadata_url = datasource.get_metadata_url(TRUNC512_PHAGE)
+    assert datasource.get_url_ttl() == exp_ttl
+    if not exp_presigned:
+        assert url is None and metadata_url is None
+        return
+    assert url.startswith(
+        "http://localhost:8080/sequence/%s/index.html?" % TRUNC512_PHAGE)
+    assert "X-Amz-Expires=%d" % exp_ttl in url
+    assert metadata_url.startswith(
+        "http://localhost:8080/sequence/%s/metadata?" % TRUNC512_PHAGE)
+
+def test_s3_client():
+    properties = setup_properties(S3_PROPS_DICT)
+    client = get_s3_client(properties)
+    assert client is get_s3_client(properties)
+    assert client is not get_s3_client(setup_properties(
+        dict(S3_PROPS_DICT, **{"source.pool_maxsize": "8"})))
+    # clients inherited from a parent process are replaced
+    reset_s3_clients()
+    assert get_s3_client(properties) is not client
+
+def test_s3_datasource_properties():
+    datasource = get_datasource(setup_properties(S3_PROPS_DICT))
+    assert isinstance(datasource.datasource.datasource, S3DataSource)
+    with pytest.raises(RefgetInvalidPropertyException):
+        get_datasource(setup_properties(
+            dict(S3_PROPS_DICT, **{"source.s3_bucket": ""})))
+
+testdata_route = [
+    # small sequences are proxied
+    ({}, {}, SC.OK, phage_seq, None),
+    # large sequences are redirected to presigned urls, which expire
+    ({"server.proxy_sequence_max_length": "0"}, {}, SC.REDIRECT_FOUND, "",
+     "public, max-age=1800"),
+    ({"server.proxy_sequence_max_length": "0", "source.s3_presign_ttl": "0"},
+     {}, SC.OK, phage_seq, None),
+    (
+        {},
+        {"query": {"start": "25", "end": "50"}},
+        SC.OK,
+        phage_seq[25:50],
+        None
+    )
+]
+
+@pytest.mark.parametrize("props_dict,request_dict,exp_sc,exp_body,"
+                         + "exp_cache_control", testdata_route)
+def test_s3_get_sequence(props_dict, request_dict, exp_sc, exp_body,
+                         exp_cache_control):
+    properties, request, response = setup_properties_request_response(
+        dict(S3_PROPS_DICT, **props_dict),
+        dict({"path": {"seqid": TRUNC512_PHAGE}}, **request_dict))
+    get_sequence(properties, request, response)
+    assert response.get_status_code() == exp_sc
+    response.join_body_stream()
+    assert response.get_body() == exp_body
+    headers = response.get_headers()
+    if exp_cache_control:
+        # expired redirects are never revalidated
+        assert headers["Cache-Control"] == exp_cache_control
+        assert "ETag" not in headers
+    else:
+        assert "immutable" in headers["Cache-Control"]
+
+class AliasClient(object):
+    """Stand-in S3 client, serving an alias object redirecting to a sequence
+    object"""
+
+    def __init__(self):
+        self.calls = []
+        self.objects = {
+            "sequence/md5": (b"", "/sequence/trunc512"),
+            "sequence/trunc512": (b"ACGTACGTAC", None)
+        }
+
+    def get_response(self, key, data):
+        location = self.objects[key][1]
+        s3_response = {"ContentLength": len(data),
+                       "Body": botocore.response.StreamingBody(
+                           io.BytesIO(data), len(data))}
+        if location:
+            s3_response["WebsiteRedirectLocation"] = location
+        return s3_response
+
+    def head_object(self, Bucket, Key):
+        self.calls.append(("head", Key))
+        return self.get_response(Key, self.objects[Key][0])
+
+    def get_object(self, Bucket, Key, Range=None):
+        self.calls.append(("get", Key))
+        data = self.objects[Key][0]
+        if Range:
+            first, last = Range[len("bytes="):].split("-")
+            if int(first) >= len(data):
+                raise botocore.exceptions.ClientError(
+                    {"Error": {"Code": "InvalidRange"},
+                     "ResponseMetadata": {"HTTPStatusCode": 416}},
+                    "GetObject")
+            data = data[int(first):int(last) + 1 if last else None]
+        s3_response = self.get_response(Key, data)
+        s3_response["ResponseMetadata"] = {
+            "HTTPStatusCode": 206 if Range else 200}
+        return s3_response
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        return "https://s3/" + Params["Key"]
+
+testdata_alias = [
+    # alias objects are followed, read from a HEAD call as ranged calls to
+    # empty objects are not satisfiable
+    (2, 6, "GTAC", [("get", "sequence/md5"), ("head", "sequence/md5"),
+                    ("get", "sequence/trunc512")]),
+    (0, None, "ACGTACGTAC", [("get", "sequence/md5"), ("head", "sequence/md5"),
+                             ("get", "sequence/trunc512")])
+]
+
+@pytest.mark.parametrize("start,end,exp_seq,exp_calls", testdata_alias)
+def test_s3_alias(monkeypatch, start, end, exp_seq, exp_calls):
+    alias_keys.clear()
+    datasource = setup_datasource(
+        {"source.sequence_path": "/sequence/{seqid}"})
+    client = AliasClient()
+    monkeypatch.setattr(datasource, "client", client)
+
+    stream = datasource.stream_subsequence("md5", start, end)
+    assert b"".join(stream) == exp_seq.encode("ascii")
+    assert client.calls == exp_calls
+
+    # resolved alias keys are cached
+    client.calls = []
+    stream = datasource.stream_subsequence("md5", start, end)
+    assert b"".join(stream) == exp_seq.encode("ascii")
+    assert client.calls == [("get", "sequence/trunc512")]
+    # clients are redirected to the object the alias redirects to
+    assert datasource.get_sequence_url("md5") == "https://s3/sequence/trunc512"
+    assert datasource.get_sequence_url("trunc512") == \
+        "https://s3/sequence/trunc512"
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for upstream datasource methods"""
+
+import concurrent.futures
+import pytest
+import threading
+from ga4gh.refget.datasource import upstream
+from ga4gh.refget.datasource.upstream import get_metadata, \
+    get_range_header, get_session, get_subsequence, reset_sessions
+from ga4gh.refget.metrics.metrics import upstream_coalesced_total
+from ga4gh.refget.util.singleflight import flights
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.util.resolve_url import resolve_metadata_url, \
+    resolve_sequence_url
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_NONEXISTENT, \
+    FILESERVER_PROPS_DICT
+from test.common.methods import setup_properties
+
+properties = setup_properties(FILESERVER_PROPS_DICT)
+
+testdata_range_header = [
+    (25, 50, "bytes=25-49"),
+    (0, 1, "bytes=0-0"),
+    (100, None, "bytes=100-")
+]
+
+testdata_fileserver = [
+    # fileserver does not honour Range, subsequence read from full object
+    (TRUNC512_PHAGE, 25, 50, "AAGTTAACACTTTCGGATATTTCTG"),
+    (TRUNC512_PHAGE, 5380, None, "CCTGCA"),
+    (TRUNC512_PHAGE, 25, 25, ""),
+    (TRUNC512_NONEXISTENT, 25, 50, None)
+]
+
+class MockPartialResponse(object):
+    """Stand-in for a datasource response that honours the Range header"""
+
+    def __init__(self, content):
+        self.status_code = SC.PARTIAL_CONTENT
+        self.content = content
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+class MockSession(object):
+    """Stand-in for the process-wide session, recording request headers"""
+
+    def __init__(self, response):
+        self.response = response
+        self.headers = {}
+
+    def get(self, url, headers, stream):
+        self.headers.update(headers)
+        return self.response
+
+@pytest.mark.parametrize("start,end,exp_header", testdata_range_header)
+def test_get_range_header(start, end, exp_header):
+    assert get_range_header(start, end) == exp_header
+
+@pytest.mark.parametrize("seqid,start,end,exp_seq", testdata_fileserver)
+def test_get_subsequence_fileserver(seqid, start, end, exp_seq):
+    url = resolve_sequence_url(properties, seqid)
+    assert get_subsequence(properties, url, start, end) == exp_seq
+
+def test_get_subsequence_partial_content(monkeypatch):
+    session = MockSession(MockPartialResponse(b"ACGT"))
+    monkeypatch.setattr(upstream, "get_session", lambda properties: session)
+    url = "http://example.com/seq"
+    assert get_subsequence(properties, url, 10, 14) == "ACGT"
+    assert session.headers["Range"] == "bytes=10-13"
+    assert session.response.closed
+
+def test_get_session():
+    pooled_properties = setup_properties({
+        "source.pool_connections": "2",
+        "source.pool_maxsize": "8"
+    })
+    session = get_session(pooled_properties)
+    assert session is get_session(pooled_properties)
+    assert session is not get_session(properties)
+    adapter = session.get_adapter("http://localhost:8080")
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 8
+
+    # sessions inherited from a parent process are replaced
+    reset_sessions()
+    assert get_session(pooled_properties) is not session
+
+testdata_coalesced = [
+    (
+        "request_subsequence", get_subsequence, "sequence",
+        [resolve_sequence_url(properties, TRUNC512_PHAGE), 25, 50],
+        "AAGTTAACACTTTCGGATATTTCTG"
+    ),
+    (
+        "request_metadata", get_metadata, "metadata",
+        [resolve_metadata_url(properties, TRUNC512_PHAGE)],
+        [SC.OK, {"metadata": {"length": 5386}}]
+    )
+]
+
+@pytest.mark.parametrize("request_name,function,call,args,exp_result",
+                         testdata_coalesced)
+def test_get_coalesced(request_name, function, call, args, exp_result,
+                       monkeypatch):
+    n_callers = 4
+    requests = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def held_request(properties, *args):
+        requests.append(args)
+        started.set()
+        release.wait()
+        return exp_result
+
+    monkeypatch.setattr(upstream, request_name, held_request)
+    key = (call, *args)
+    coalesced = upstream_coalesced_total.get(call)
+
+    # identical concurrent fetches share a single upstream request
+    with concurrent.futures.ThreadPoolExecutor(n_callers) as executor:
+        futures = [executor.submit(function, properties, *args)]
+        started.wait()
+        futures += [executor.submit(function, properties, *args)
+                    for i in range(n_callers - 1)]
+        while flights.calls[key].waiters < n_callers - 1:
+            release.wait(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert requests == [tuple(args)]
+    assert results == [exp_result] * n_callers
+    assert upstream_coalesced_total.get(call) == coalesced + n_callers - 1
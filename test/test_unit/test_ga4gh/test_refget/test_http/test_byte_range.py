@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for byte_range module"""
+
+import pytest
+from ga4gh.refget.http.byte_range import parse_range_header, resolve_ranges, \
+    merge_ranges, get_content_range
+
+testdata_parse_range_header = [
+    ("bytes=25-49", [[25, 49]]),
+    ("bytes=25-", [[25, None]]),
+    ("bytes=-25", [[None, 25]]),
+    ("bytes=0-9, 20-29,-5", [[0, 9], [20, 29], [None, 5]]),
+    ("Bytes=0-9,", [[0, 9]]),
+    ("bytes=50-25", [[50, 25]]),
+    ("TwentyFiveToFifty", None),
+    ("items=0-9", None),
+    ("bytes=", None),
+    ("bytes=-", None),
+    ("bytes=a-9", None),
+    ("bytes=0-9,x", None),
+    ("bytes=25-50abc", None)
+]
+
+testdata_resolve_ranges = [
+    ([[25, 49]], 100, [[25, 50]]),
+    ([[25, 500]], 100, [[25, 100]]),
+    ([[25, None]], 100, [[25, 100]]),
+    ([[None, 25]], 100, [[75, 100]]),
+    ([[None, 500]], 100, [[0, 100]]),
+    ([[None, 0]], 100, []),
+    ([[100, 200], [0, 9]], 100, [[0, 10]]),
+    ([[100, None]], 100, []),
+    ([[None, 5]], 0, [])
+]
+
+testdata_merge_ranges = [
+    ([[0, 10]], [[0, 10]]),
+    ([[20, 30], [0, 10]], [[0, 10], [20, 30]]),
+    ([[0, 10], [10, 20]], [[0, 20]]),
+    ([[0, 10], [5, 8], [9, 15], [40, 50]], [[0, 15], [40, 50]])
+]
+
+@pytest.mark.parametrize("range_header,exp_specs", testdata_parse_range_header)
+def test_parse_range_header(range_header, exp_specs):
+    assert parse_range_header(range_header) == exp_specs
+
+@pytest.mark.parametrize("specs,length,exp_ranges", testdata_resolve_ranges)
+def test_resolve_ranges(specs, length, exp_ranges):
+    assert resolve_ranges(specs, length) == exp_ranges
+
+@pytest.mark.parametrize("ranges,exp_merged", testdata_merge_ranges)
+def test_merge_ranges(ranges, exp_merged):
+    assert merge_ranges(ranges) == exp_merged
+
+def test_get_content_range():
+    assert get_content_range(25, 50, 5386) == "bytes 25-49/5386"
@@ -45,3 +45,10 @@ def test_query(key, value):
     request.add_query_param(key, value)
     assert request.get_query_param(key) == value
     assert request.get_query_params()[key] == value
+
+def test_body():
+
+    request = Request()
+    assert request.get_body() == ""
+    request.set_body('{"requests": []}')
+    assert request.get_body() == '{"requests": []}'
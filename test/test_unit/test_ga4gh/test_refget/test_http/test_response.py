@@ -61,6 +61,15 @@ def test_header(key, value):
     assert response.get_header(key) == value
     assert response.get_headers()[key] == value
 
+@pytest.mark.parametrize("key,value", testdata_header)
+def test_remove_header(key, value):
+    response = Response()
+    response.put_header(key, value)
+    response.remove_header(key)
+    assert key not in response.get_headers()
+    # removing an absent header has no effect
+    response.remove_header(key)
+
 @pytest.mark.parametrize("key,value", testdata_data)
 def test_data(key, value):
     response = Response()
@@ -79,3 +88,21 @@ def test_redirect(url):
     response.set_redirect_found(url)
     assert response.get_status_code() == SC.REDIRECT_FOUND
     assert response.get_header("Location") == url
+
+@pytest.mark.parametrize("body", testdata_body)
+def test_body_stream(body):
+    response = Response()
+    assert not response.is_streamed()
+    chunks = [body[i:i + 4].encode("ascii") for i in range(0, len(body), 4)]
+    response.set_body_stream(iter(chunks))
+    assert response.is_streamed()
+    response.join_body_stream()
+    assert not response.is_streamed()
+    assert response.get_body() == body
+
+def test_body_stream_encoded():
+    response = Response()
+    response.put_header("Content-Encoding", "gzip")
+    response.set_body_stream(iter([b"\x1f\x8b", b"\x08\x00"]))
+    response.join_body_stream()
+    assert response.get_body() == b"\x1f\x8b\x08\x00"
@@ -8,11 +8,15 @@ testdata_is_successful = [
     (SC.OK, True),
     (SC.PARTIAL_CONTENT, True),
     (SC.REDIRECT_FOUND, False),
+    (SC.NOT_MODIFIED, False),
     (SC.BAD_REQUEST, False),
     (SC.NOT_FOUND, False),
+    (SC.METHOD_NOT_ALLOWED, False),
     (SC.NOT_ACCEPTABLE, False),
+    (SC.PAYLOAD_TOO_LARGE, False),
     (SC.REQUESTED_RANGE_NOT_SATISFIABLE, False),
-    (SC.NOT_IMPLEMENTED, False)
+    (SC.NOT_IMPLEMENTED, False),
+    (SC.SERVICE_UNAVAILABLE, False)
 ]
 
 @pytest.mark.parametrize("code,successful", testdata_is_successful)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for refget server metrics"""
+
+import pytest
+from ga4gh.refget.metrics.metrics import get_outcome, observe_request, \
+    observe_upstream, render_metrics, requests_total, set_worker, \
+    upstream_requests_total
+
+testdata_outcome = [
+    (200, "body"),
+    (206, "body"),
+    (302, "redirect"),
+    (304, "not_modified"),
+    (404, "error"),
+    (416, "error")
+]
+
+@pytest.mark.parametrize("status_code,exp_outcome", testdata_outcome)
+def test_get_outcome(status_code, exp_outcome):
+    assert get_outcome(status_code) == exp_outcome
+
+def test_observe():
+    count = requests_total.get("metadata", "redirect", "302")
+    observe_request("metadata", 302, 0.002)
+    assert requests_total.get("metadata", "redirect", "302") == count + 1
+
+    count = upstream_requests_total.get("metadata", "404")
+    observe_upstream("metadata", 404, 0.03)
+    assert upstream_requests_total.get("metadata", "404") == count + 1
+
+    text = render_metrics()
+    assert 'refget_request_duration_seconds_bucket{route="metadata",' \
+        + 'outcome="redirect",worker="0",le="0.0025"}' in text
+    assert "# TYPE refget_cache_hits_total counter" in text
+
+def test_set_worker():
+    set_worker(3)
+    text = render_metrics()
+    set_worker(None)
+    assert 'refget_upstream_requests_total{call="metadata",status="404",' \
+        + 'worker="3"}' in text
+    assert 'refget_cache_size{cache="metadata",worker="3"}' in text
+    assert 'worker="0"' not in text
+    assert 'worker="0"' in render_metrics()
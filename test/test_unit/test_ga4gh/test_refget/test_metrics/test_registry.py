@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for metric types and registry"""
+
+import pytest
+from ga4gh.refget.metrics.registry import Counter, Histogram, Registry, \
+    format_labels
+
+testdata_labels = [
+    ([], (), None, ""),
+    (["route"], ("sequence",), None, '{route="sequence"}'),
+    (["route"], ("seq\"uence",), [("le", "0.5")],
+     '{route="seq\\"uence",le="0.5"}')
+]
+
+@pytest.mark.parametrize("names,values,extra,exp_labels", testdata_labels)
+def test_format_labels(names, values, extra, exp_labels):
+    assert format_labels(names, values, extra) == exp_labels
+
+def test_counter():
+    counter = Counter("test_total", "Test counter", ["route"])
+    counter.inc("sequence")
+    counter.inc("sequence", amount=2)
+    counter.inc("metadata")
+    assert counter.get("sequence") == 3
+    assert counter.render() == [
+        "# HELP test_total Test counter",
+        "# TYPE test_total counter",
+        'test_total{route="metadata"} 1',
+        'test_total{route="sequence"} 3'
+    ]
+
+def test_histogram():
+    histogram = Histogram("test_seconds", "Test histogram", ["route"],
+                          [0.1, 1.0])
+    for value in [0.05, 0.1, 0.5, 5.0]:
+        histogram.observe(value, "sequence")
+    assert histogram.get_count("sequence") == 4
+    assert histogram.render() == [
+        "# HELP test_seconds Test histogram",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="sequence",le="0.1"} 2',
+        'test_seconds_bucket{route="sequence",le="1"} 3',
+        'test_seconds_bucket{route="sequence",le="+Inf"} 4',
+        'test_seconds_sum{route="sequence"} 5.65',
+        'test_seconds_count{route="sequence"} 4'
+    ]
+
+def test_registry():
+    registry = Registry()
+    counter = registry.register(Counter("test_total", "Test counter"))
+    counter.inc()
+    registry.register_collector(lambda: ["test_gauge 7"])
+    assert registry.render() == "\n".join([
+        "# HELP test_total Test counter",
+        "# TYPE test_total counter",
+        "test_total 1",
+        "test_gauge 7"
+    ]) + "\n"
+
+def test_registry_const_labels():
+    registry = Registry([("worker", "0")])
+    counter = registry.register(Counter("test_total", "Test counter",
+                                        ["route"]))
+    histogram = registry.register(Histogram("test_seconds", "Test histogram",
+                                            [], [1.0]))
+    counter.inc("sequence")
+    histogram.observe(0.5)
+    registry.set_const_labels([("worker", "2")])
+    assert registry.render() == "\n".join([
+        "# HELP test_total Test counter",
+        "# TYPE test_total counter",
+        'test_total{route="sequence",worker="2"} 1',
+        "# HELP test_seconds Test histogram",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{worker="2",le="1"} 1',
+        'test_seconds_bucket{worker="2",le="+Inf"} 1',
+        'test_seconds_sum{worker="2"} 0.5',
+        'test_seconds_count{worker="2"} 1'
+    ]) + "\n"
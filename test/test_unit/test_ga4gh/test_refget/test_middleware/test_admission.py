@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for Admission Middleware class"""
+
+import json
+from ga4gh.refget.config.exceptions import RefgetOverloadedException
+from ga4gh.refget.config.properties import Properties
+from ga4gh.refget.http.response import Response
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.middleware.admission import AdmissionMidware
+from test.common.methods import setup_request
+
+class ClosableStream(object):
+    closed = False
+
+    def __iter__(self):
+        return iter([b"ACGT"])
+
+    def close(self):
+        self.closed = True
+
+def test_admission_middleware_rejected():
+    properties = Properties({"server.retry_after": "5"})
+    request = setup_request({})
+    response = Response()
+    stream = ClosableStream()
+
+    @AdmissionMidware(properties, request, response)
+    def dummy_function(properties, request, response):
+        response.set_status_code(SC.OK)
+        response.put_header("Content-Length", 4)
+        response.set_body_stream(stream)
+        raise RefgetOverloadedException("server is overloaded")
+    dummy_function(properties, request, response)
+
+    assert response.get_status_code() == SC.SERVICE_UNAVAILABLE
+    assert response.get_header("Retry-After") == "5"
+    assert "Content-Length" not in response.get_headers()
+    assert not response.is_streamed()
+    assert stream.closed
+    assert response.get_body() == \
+        json.dumps({"message": "server is overloaded"})
+
+def test_admission_middleware_admitted():
+    properties = Properties({})
+    request = setup_request({})
+    response = Response()
+
+    @AdmissionMidware(properties, request, response)
+    def dummy_function(properties, request, response):
+        response.set_status_code(SC.OK)
+        response.set_body("ACGT")
+    dummy_function(properties, request, response)
+
+    assert response.get_status_code() == SC.OK
+    assert "Retry-After" not in response.get_headers()
+    assert response.get_body() == "ACGT"
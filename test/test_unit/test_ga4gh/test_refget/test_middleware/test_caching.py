@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for Caching Middleware class"""
+
+import pytest
+from ga4gh.refget.config.properties import Properties
+from ga4gh.refget.http.response import Response
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.middleware.caching import CachingMidware, LAST_MODIFIED
+from test.common.methods import setup_request
+
+seq_request = {"path": {"seqid": "abc"}, "query": {"start": "0"}}
+
+def run_cached(props_dict, request_dict, status_code=SC.OK, immutable=True):
+    properties = Properties(props_dict)
+    request = setup_request(request_dict)
+    response = Response()
+    calls = []
+
+    @CachingMidware(properties, request, response, ["sequence"],
+                    immutable=immutable)
+    def dummy_function(properties, request, response):
+        calls.append(True)
+        response.set_status_code(status_code)
+        response.set_body("ACGT")
+    dummy_function(properties, request, response)
+    return [response, len(calls)]
+
+def get_etag(request_dict):
+    response, calls = run_cached({}, request_dict)
+    return response.get_header("ETag")
+
+testdata_headers = [
+    # successful and redirect responses are cacheable
+    (SC.OK, True),
+    (SC.PARTIAL_CONTENT, True),
+    (SC.REDIRECT_FOUND, True),
+    # error responses are not
+    (SC.NOT_FOUND, False),
+    (SC.SERVICE_UNAVAILABLE, False)
+]
+
+@pytest.mark.parametrize("status_code,exp_cacheable", testdata_headers)
+def test_caching_headers(status_code, exp_cacheable):
+    response, calls = run_cached({}, seq_request, status_code)
+    headers = response.get_headers()
+    assert response.get_status_code() == status_code
+    if exp_cacheable:
+        assert headers["Cache-Control"] == \
+            "public, max-age=31536000, immutable"
+        assert headers["Last-Modified"] == LAST_MODIFIED
+        assert headers["ETag"].startswith('"')
+    else:
+        for key in ["Cache-Control", "Last-Modified", "ETag"]:
+            assert key not in headers
+
+def test_caching_headers_mutable():
+    response, calls = run_cached({"server.cache_max_age_mutable": "60"},
+                                 seq_request, immutable=False)
+    headers = response.get_headers()
+    assert headers["Cache-Control"] == "public, max-age=60"
+    assert "Last-Modified" not in headers
+
+def test_caching_disabled():
+    response, calls = run_cached(
+        {"server.cache_max_age": "0"},
+        {"path": {"seqid": "abc"}, "header": {"If-None-Match": "*"}})
+    assert response.get_status_code() == SC.OK
+    assert "Cache-Control" not in response.get_headers()
+
+def test_etag():
+    etag = get_etag(seq_request)
+    # identical requests have identical entity tags
+    assert get_etag(seq_request) == etag
+    # requests for other sequences, subsequences, media types, or encodings
+    # have different entity tags
+    assert get_etag({"path": {"seqid": "abd"}, "query": {"start": "0"}}) \
+        != etag
+    assert get_etag({"path": {"seqid": "abc"}, "query": {"start": "1"}}) \
+        != etag
+    assert get_etag(dict(seq_request, header={"Accept": "text/plain"})) \
+        != etag
+    assert get_etag(dict(seq_request, header={"Accept-Encoding": "gzip"})) \
+        != etag
+    # Accept-Encoding only matters through the negotiated encoding
+    assert get_etag(dict(seq_request, header={"Accept-Encoding": "identity"})) \
+        == etag
+
+testdata_conditional = [
+    # matching entity tag, in a list, or weak: inner function is not executed
+    (lambda etag: {"If-None-Match": etag}, True, 0),
+    (lambda etag: {"If-None-Match": '"other", %s' % etag}, True, 0),
+    (lambda etag: {"If-None-Match": "W/" + etag}, True, 0),
+    # wildcard is only evaluated against a successful response
+    (lambda etag: {"If-None-Match": "*"}, True, 1),
+    # entity tag does not match
+    (lambda etag: {"If-None-Match": '"other"'}, False, 1),
+    # If-None-Match takes precedence over If-Modified-Since
+    (lambda etag: {"If-None-Match": '"other"',
+                   "If-Modified-Since": LAST_MODIFIED}, False, 1),
+    # immutable responses are never modified since any date
+    (lambda etag: {"If-Modified-Since": LAST_MODIFIED}, True, 1),
+    (lambda etag: {"if-modified-since": "Sat, 17 Oct 2026 10:00:00 GMT"},
+     True, 1),
+    (lambda etag: {"If-Modified-Since": "yesterday"}, False, 1),
+    # unconditional request
+    (lambda etag: {}, False, 1)
+]
+
+@pytest.mark.parametrize("get_headers,exp_not_modified,exp_calls",
+                         testdata_conditional)
+def test_conditional_request(get_headers, exp_not_modified, exp_calls):
+    etag = get_etag(seq_request)
+    response, calls = run_cached(
+        {}, dict(seq_request, header=get_headers(etag)))
+    assert calls == exp_calls
+    if exp_not_modified:
+        assert response.get_status_code() == SC.NOT_MODIFIED
+        assert response.get_body() == ""
+        assert response.get_header("ETag") == etag
+        assert response.get_header("Vary") == "Accept-Encoding"
+    else:
+        assert response.get_status_code() == SC.OK
+
+testdata_conditional_error = [
+    ({"If-None-Match": "*"}, SC.NOT_FOUND),
+    ({"If-Modified-Since": LAST_MODIFIED}, SC.NOT_FOUND),
+    ({"If-None-Match": "*"}, SC.BAD_REQUEST),
+    ({"If-Modified-Since": LAST_MODIFIED}, SC.REQUESTED_RANGE_NOT_SATISFIABLE)
+]
+
+@pytest.mark.parametrize("header,status_code", testdata_conditional_error)
+def test_conditional_request_error(header, status_code):
+    # wildcard and date conditions never hide an unsuccessful response
+    response, calls = run_cached(
+        {}, dict(seq_request, header=header), status_code)
+    assert calls == 1
+    assert response.get_status_code() == status_code
+    assert response.get_body() == "ACGT"
+
+def test_conditional_request_stream():
+    # a body stream set by the route is closed when answering NOT MODIFIED
+    properties = Properties({})
+    request = setup_request(
+        dict(seq_request, header={"If-None-Match": "*"}))
+    response = Response()
+    closed = []
+
+    class DummyStream(object):
+        def __iter__(self):
+            return iter([b"ACGT"])
+
+        def close(self):
+            closed.append(True)
+
+    @CachingMidware(properties, request, response, ["sequence"])
+    def dummy_function(properties, request, response):
+        response.set_status_code(SC.OK)
+        response.set_body_stream(DummyStream())
+        response.put_header("Content-Length", "4")
+    dummy_function(properties, request, response)
+    assert response.get_status_code() == SC.NOT_MODIFIED
+    assert response.get_body_stream() is None
+    assert "Content-Length" not in response.get_headers()
+    assert closed == [True]
+
+def test_conditional_request_mutable():
+    # If-Modified-Since is not evaluated for responses that may change
+    response, calls = run_cached(
+        {}, dict(seq_request, header={"If-Modified-Since": LAST_MODIFIED}),
+        immutable=False)
+    assert response.get_status_code() == SC.OK
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for Compression Middleware class"""
+
+import gzip
+import pytest
+from ga4gh.refget.config.properties import Properties
+from ga4gh.refget.http.response import Response
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.middleware.compression import CompressionMidware
+from test.common.methods import setup_request
+
+body = "ACGT" * 1000
+
+testdata = [
+    # compressed if accepted, and body is at least the minimum size
+    ({"header": {"Accept-Encoding": "gzip"}}, {}, SC.OK, body, "gzip"),
+    ({"header": {"accept-encoding": "gzip"}}, {}, SC.OK, body, "gzip"),
+    # not compressed if not accepted
+    ({}, {}, SC.OK, body, None),
+    ({"header": {"Accept-Encoding": "identity"}}, {}, SC.OK, body, None),
+    # not compressed if smaller than the minimum size
+    ({"header": {"Accept-Encoding": "gzip"}}, {}, SC.OK, "ACGT", None),
+    (
+        {"header": {"Accept-Encoding": "gzip"}},
+        {"server.compression_min_size": "10000"},
+        SC.OK, body, None
+    ),
+    # not compressed if no encodings are offered
+    (
+        {"header": {"Accept-Encoding": "gzip"}},
+        {"server.compression_encodings": ""},
+        SC.OK, body, None
+    ),
+    # error and partial content responses are not compressed
+    ({"header": {"Accept-Encoding": "gzip"}}, {}, SC.NOT_FOUND, body, None),
+    (
+        {"header": {"Accept-Encoding": "gzip"}}, {},
+        SC.PARTIAL_CONTENT, body, None
+    )
+]
+
+@pytest.mark.parametrize("request_dict,props_dict,status_code,body,exp_encoding",
+                         testdata)
+def test_compression_middleware(request_dict, props_dict, status_code, body,
+                                exp_encoding):
+    properties = Properties(props_dict)
+    request = setup_request(request_dict)
+    response = Response()
+
+    @CompressionMidware(properties, request, response)
+    def dummy_function(properties, request, response):
+        response.set_status_code(status_code)
+        response.put_header("Content-Length", len(body))
+        response.set_body(body)
+    dummy_function(properties, request, response)
+
+    headers = response.get_headers()
+    assert headers.get("Content-Encoding") == exp_encoding
+    if status_code == SC.OK:
+        assert headers["Vary"] == "Accept-Encoding"
+    if exp_encoding:
+        assert gzip.decompress(response.get_body()) == body.encode("ascii")
+        assert headers["Content-Length"] == len(response.get_body())
+    else:
+        assert response.get_body() == body
+
+def test_compression_middleware_streamed():
+    properties = Properties({})
+    request = setup_request({"header": {"Accept-Encoding": "gzip"}})
+    response = Response()
+
+    @CompressionMidware(properties, request, response)
+    def dummy_function(properties, request, response):
+        response.set_status_code(SC.OK)
+        response.put_header("Content-Length", len(body))
+        response.set_body_stream(iter([body.encode("ascii")[i:i + 100]
+                                       for i in range(0, len(body), 100)]))
+    dummy_function(properties, request, response)
+
+    assert response.get_header("Content-Encoding") == "gzip"
+    assert "Content-Length" not in response.get_headers()
+    response.join_body_stream()
+    assert gzip.decompress(response.get_body()) == body.encode("ascii")
@@ -53,6 +53,54 @@ testdata = [
         SC.OK,
         ""
     ),
+    # valid open-ended, suffix, and multiple range header
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "header": {"Range": "bytes=25-"}},
+        SC.OK,
+        ""
+    ),
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "header": {"Range": "bytes=-25"}},
+        SC.OK,
+        ""
+    ),
+    (
+        {
+            "path": {"seqid": TRUNC512_PHAGE},
+            "header": {"Range": "bytes=0-9, 20-29, -5"}
+        },
+        SC.OK,
+        ""
+    ),
+    # valid, one of multiple ranges is satisfiable
+    (
+        {
+            "path": {"seqid": TRUNC512_PHAGE},
+            "header": {"Range": "bytes=9000-9999,0-9"}
+        },
+        SC.OK,
+        ""
+    ),
+    # invalid, no satisfiable ranges
+    (
+        {
+            "path": {"seqid": TRUNC512_PHAGE},
+            "header": {"Range": "bytes=9000-9999,-0"}
+        },
+        SC.REQUESTED_RANGE_NOT_SATISFIABLE,
+        json.dumps({"message": "Invalid sequence range provided"})
+    ),
+    # invalid, circular range in multiple ranges
+    (
+        {
+            "path": {"seqid": TRUNC512_PHAGE},
+            "header": {"Range": "bytes=0-9,30-20"}
+        },
+        SC.REQUESTED_RANGE_NOT_SATISFIABLE,
+        json.dumps({
+            "message": "server DOES NOT support circular sequences, end MUST "
+                       + "be higher than start"})
+    ),
     # invalid, start is not an unsigned int
     (
         {"path": {"seqid": TRUNC512_PHAGE}, "query": {"start": "TwentyFive"}},
@@ -107,3 +155,34 @@ def test_query_parameters_middleware(request_dict, exp_sc, exp_body):
     
     assert response.get_status_code() == exp_sc
     assert response.get_body() == exp_body
+
+testdata_limit = [
+    # subsequences up to the subsequence limit
+    ({"start": "0", "end": "1000"}, "1000", SC.OK),
+    ({"start": "4386"}, "1000", SC.OK),
+    # subsequences exceeding the subsequence limit
+    ({"start": "0", "end": "1001"}, "1000", SC.REQUESTED_RANGE_NOT_SATISFIABLE),
+    ({"end": "1001"}, "1000", SC.REQUESTED_RANGE_NOT_SATISFIABLE),
+    ({"start": "4385"}, "1000", SC.REQUESTED_RANGE_NOT_SATISFIABLE),
+    # no subsequence limit
+    ({"start": "0"}, "0", SC.OK)
+]
+
+@pytest.mark.parametrize("query,limit,exp_sc", testdata_limit)
+def test_query_parameters_subsequence_limit(query, limit, exp_sc):
+    limit_props_dict = dict(props_dict)
+    limit_props_dict["server.subsequence_limit"] = limit
+    properties, request, response = setup_properties_request_response(
+        limit_props_dict, {"path": {"seqid": TRUNC512_PHAGE}, "query": query})
+    response.set_status_code(SC.OK)
+
+    @QueryParametersMidware(properties, request, response)
+    def dummy_function(properties, request, response):
+        return None
+    dummy_function(properties, request, response)
+
+    assert response.get_status_code() == exp_sc
+    if exp_sc != SC.OK:
+        assert response.get_body() == json.dumps({
+            "message": "requested subsequence exceeds the subsequence limit "
+                       + "of %s" % limit})
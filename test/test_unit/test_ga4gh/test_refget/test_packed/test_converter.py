@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for packed sequence converter"""
+
+import os
+from click.testing import CliRunner
+from ga4gh.refget.packed.converter import convert_dir, convert_file, \
+    run_converter
+from ga4gh.refget.packed.twobit import decode_sequence
+from test.common.constants import TRUNC512_PHAGE
+
+phage_file = "test/common/fileserver/sequence/%s/index.html" % TRUNC512_PHAGE
+
+def test_convert_file(tmp_path):
+    output_file = str(tmp_path / "packed" / TRUNC512_PHAGE)
+    assert convert_file(phage_file, output_file)
+    assert decode_sequence(open(output_file, "rb").read()) == \
+        open(phage_file, "rb").read()
+
+    # metadata objects are not sequence objects
+    metadata_file = "test/common/fileserver/sequence/%s/metadata" \
+        % TRUNC512_PHAGE
+    assert not convert_file(metadata_file, str(tmp_path / "metadata"))
+    assert not os.path.exists(str(tmp_path / "metadata"))
+
+def test_convert_dir(tmp_path):
+    n_converted, plain_bytes, packed_bytes = convert_dir(
+        "test/common/fileserver/sequence", str(tmp_path))
+    assert [n_converted, plain_bytes] == [1, 5386]
+    assert packed_bytes < plain_bytes / 3
+    assert os.path.exists(
+        str(tmp_path / TRUNC512_PHAGE / "index.html"))
+
+def test_run_converter(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(run_converter, [
+        "--sequence-dir", "test/common/fileserver/sequence",
+        "--output-dir", str(tmp_path / "packed")])
+    assert result.exit_code == 0
+
+    result = runner.invoke(run_converter, [
+        "--sequence-dir", str(tmp_path / "packed" / TRUNC512_PHAGE),
+        "--output-dir", str(tmp_path / "repacked")])
+    assert result.exit_code == 1
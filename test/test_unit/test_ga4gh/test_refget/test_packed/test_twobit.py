@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for 2-bit packed sequence format"""
+
+import pytest
+from ga4gh.refget.packed import twobit
+from ga4gh.refget.packed.twobit import HEADER, PackedIndex, decode_sequence, \
+    encode_sequence, get_index_size, pack_bases, unpack_bases
+from test.common.constants import TRUNC512_PHAGE
+
+phage_seq = open(
+    "test/common/fileserver/sequence/%s/index.html" % TRUNC512_PHAGE, "rb"
+).read()
+
+testdata_sequences = [
+    b"",
+    b"A",
+    b"ACGTACG",
+    b"NNNNACGTNNNN",
+    b"acgtnACGTNRYKMacgt",
+    b"ACGT" * 100 + b"N" * 1000 + b"gattaca" * 50 + b"T",
+    phage_seq
+]
+
+@pytest.mark.parametrize("seq", testdata_sequences)
+def test_encode_decode_sequence(seq):
+    data = encode_sequence(seq)
+    index_size = get_index_size(data)
+    assert len(data) == index_size + (len(seq) + 3) // 4
+    assert decode_sequence(data) == seq
+
+def test_encode_size():
+    # ACGT-only sequences are packed at 4 bases per byte, after the header
+    assert len(encode_sequence(phage_seq)) == HEADER.size + 1347
+    # each run adds a single run table record
+    assert get_index_size(encode_sequence(b"ACGTNNNNNNNNacgt")) == \
+        HEADER.size + 16 + 16
+
+testdata_windows = [
+    (0, 1), (0, 4), (1, 3), (3, 9), (4, 8), (398, 402), (1390, 1410),
+    (1398, 1402), (1400, 1750), (0, 1751)
+]
+
+@pytest.mark.parametrize("start,end", testdata_windows)
+def test_decode_window(start, end):
+    seq = testdata_sequences[5]
+    data = encode_sequence(seq)
+    index = PackedIndex(data)
+    assert index.length == len(seq)
+    byte_start, byte_end, first_base = index.get_packed_range(start, end)
+    assert first_base % 4 == 0
+    assert index.decode(data[byte_start:byte_end], first_base, start, end) \
+        == seq[start:end]
+
+testdata_invalid = [
+    b"",
+    b"RG2B",
+    b">NC_001422.1\nGAGTTTTATCGCTTCCATGACGCAGAAGTTAACACTTTCGG",
+    HEADER.pack(b"RG2B", 2, 4, 0, 0) + b"\x1b"
+]
+
+@pytest.mark.parametrize("data", testdata_invalid)
+def test_get_index_size_invalid(data):
+    assert get_index_size(data) is None
+    assert decode_sequence(data) is None
+
+def test_pack_unpack_bases():
+    packed = pack_bases(b"ACGTT")
+    assert packed == bytes([0b00011011, 0b11000000])
+    assert unpack_bases(packed) == bytearray(b"ACGTTAAA")
+    assert unpack_bases(memoryview(packed)[1:]) == bytearray(b"TAAA")
+
+def test_pack_unpack_bases_fallback(monkeypatch):
+    monkeypatch.setattr(twobit, "numpy", None)
+    packed = pack_bases(phage_seq)
+    assert unpack_bases(packed)[:len(phage_seq)] == phage_seq
+
+def test_pack_unpack_bases_numpy():
+    pytest.importorskip("numpy")
+    packed = pack_bases(phage_seq)
+    assert unpack_bases(packed)[:len(phage_seq)] == phage_seq
+    assert unpack_bases(memoryview(packed)[1:3]) == phage_seq[4:12]
+
+@pytest.mark.parametrize("seq", [phage_seq, phage_seq[:4097], b"ACGTTGCA",
+                                 b"T"])
+def test_pack_unpack_bases_numpy_fallback(monkeypatch, seq):
+    # vectorised and pure-Python paths produce identical output
+    pytest.importorskip("numpy")
+    every_byte = bytes(range(256))
+    packed = pack_bases(seq)
+    unpacked = [unpack_bases(every_byte), unpack_bases(packed)]
+    monkeypatch.setattr(twobit, "numpy", None)
+    assert pack_bases(seq) == packed
+    assert [unpack_bases(every_byte), unpack_bases(packed)] == unpacked
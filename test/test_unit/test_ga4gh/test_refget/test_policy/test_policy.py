@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for policy module"""
+
+import pytest
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.pinned_source import get_pinned_store
+from ga4gh.refget.policy.policy import should_proxy
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE, \
+    TRUNC512_NONEXISTENT, FILESERVER_PROPS_DICT
+from test.common.methods import setup_properties_request_response
+
+testdata = [
+    # full sequences at or below the maximum length are proxied
+    ({}, TRUNC512_PHAGE, None, None, True),
+    ({}, TRUNC512_CEREVISIAE, None, None, False),
+    ({"server.proxy_sequence_max_length": "5386"}, TRUNC512_PHAGE, None, None,
+     True),
+    ({"server.proxy_sequence_max_length": "5385"}, TRUNC512_PHAGE, None, None,
+     False),
+    ({"server.proxy_sequence_max_length": "0"}, TRUNC512_PHAGE, None, None,
+     False),
+    # full sequences of unknown length are redirected
+    ({}, TRUNC512_NONEXISTENT, None, None, False),
+    # ranges spanning at most the maximum number of bases are proxied
+    ({}, TRUNC512_CEREVISIAE, "range", [[0, 65536]], True),
+    ({}, TRUNC512_CEREVISIAE, "range", [[0, 65537]], False),
+    ({"server.proxy_range_max_length": "10"}, TRUNC512_PHAGE, "range",
+     [[0, 5], [3, 10]], True),
+    ({"server.proxy_range_max_length": "10"}, TRUNC512_PHAGE, "range",
+     [[0, 5], [20, 26]], False),
+    # ranges are always proxied in proxy range mode
+    ({"server.range_mode": "proxy"}, TRUNC512_CEREVISIAE, "range",
+     [[0, 230218]], True),
+    # start/end subsequences are always proxied
+    ({"server.proxy_sequence_max_length": "0"}, TRUNC512_CEREVISIAE,
+     "start-end", None, True)
+]
+
+@pytest.mark.parametrize("props,seqid,subseq_type,ranges,exp_proxy", testdata)
+def test_should_proxy(props, seqid, subseq_type, ranges, exp_proxy):
+    properties, request, response = setup_properties_request_response(
+        dict(FILESERVER_PROPS_DICT, **props), {})
+    datasource = get_datasource(properties)
+    assert should_proxy(properties, datasource, seqid, subseq_type, ranges) \
+        == exp_proxy
+
+def test_should_proxy_pinned():
+    properties, request, response = setup_properties_request_response(
+        dict(FILESERVER_PROPS_DICT, **{
+            "cache.pinned_bytes": "1000000",
+            "server.proxy_sequence_max_length": "0",
+            "server.proxy_range_max_length": "0"
+        }), {})
+    datasource = get_datasource(properties)
+    get_pinned_store(properties).clear()
+    assert not should_proxy(properties, datasource, TRUNC512_PHAGE, None,
+                            None)
+    # pinned sequences are served from memory, rather than redirected
+    assert datasource.pin_sequence(TRUNC512_PHAGE, 5386)
+    assert should_proxy(properties, datasource, TRUNC512_PHAGE, None, None)
+    assert should_proxy(properties, datasource, TRUNC512_PHAGE, "range",
+                        [[0, 5386]])
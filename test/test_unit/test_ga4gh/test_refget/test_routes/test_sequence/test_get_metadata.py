@@ -7,19 +7,60 @@ from ga4gh.refget.http.status_codes import StatusCodes as SC
 from ga4gh.refget.routes.sequence.get_metadata import get_metadata
 from test.common.methods import setup_properties_request_response
 from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE, \
-    TRUNC512_NONEXISTENT, FILESERVER_PROPS_DICT
+    TRUNC512_NONEXISTENT, FILESERVER_PROPS_DICT, LOCAL_PROPS_DICT
 
 props_dict = FILESERVER_PROPS_DICT
 
+proxy_props_dict = dict(FILESERVER_PROPS_DICT)
+proxy_props_dict["server.metadata_mode"] = "proxy"
+
+phage_metadata = json.dumps({
+    "metadata": {
+        "md5": "3332ed720ac7eaa9b3655c06f6b9e196",
+        "trunc512": TRUNC512_PHAGE,
+        "length": 5386,
+        "aliases": []
+    }
+})
+
 testdata = [
     # get metadata via redirect
-    ({"path": {"seqid": TRUNC512_PHAGE}}, SC.REDIRECT_FOUND, "")
+    (props_dict, {"path": {"seqid": TRUNC512_PHAGE}}, SC.REDIRECT_FOUND, ""),
+    # get metadata directly
+    (proxy_props_dict, {"path": {"seqid": TRUNC512_PHAGE}}, SC.OK,
+     phage_metadata),
+    # get metadata directly, local datasource cannot redirect
+    (LOCAL_PROPS_DICT, {"path": {"seqid": TRUNC512_PHAGE}}, SC.OK,
+     phage_metadata),
+    # get metadata directly, metadata could not be found for object
+    (
+        proxy_props_dict,
+        {"path": {"seqid": TRUNC512_NONEXISTENT}},
+        SC.NOT_FOUND,
+        json.dumps({
+            "message": "sequence " + TRUNC512_NONEXISTENT + " not found"})
+    )
 ]
 
-@pytest.mark.parametrize("request_dict,exp_sc,exp_body", testdata)
-def test_get_sequence(request_dict, exp_sc, exp_body):
+@pytest.mark.parametrize("props_dict,request_dict,exp_sc,exp_body", testdata)
+def test_get_metadata(props_dict, request_dict, exp_sc, exp_body):
     properties, request, response = setup_properties_request_response(
         props_dict, request_dict)
     get_metadata(properties, request, response)
     assert response.get_status_code() == exp_sc
     assert response.get_body() == exp_body
+
+def test_get_metadata_caching():
+    properties, request, response = setup_properties_request_response(
+        proxy_props_dict, {"path": {"seqid": TRUNC512_PHAGE}})
+    get_metadata(properties, request, response)
+    etag = response.get_header("ETag")
+    assert "immutable" in response.get_header("Cache-Control")
+
+    # conditional request is answered without contacting the datasource
+    properties, request, response = setup_properties_request_response(
+        proxy_props_dict, {"path": {"seqid": TRUNC512_PHAGE},
+                           "header": {"If-None-Match": etag}})
+    get_metadata(properties, request, response)
+    assert response.get_status_code() == SC.NOT_MODIFIED
+    assert response.get_body() == ""
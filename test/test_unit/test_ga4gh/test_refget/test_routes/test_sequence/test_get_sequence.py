@@ -3,22 +3,42 @@
 
 import json
 import pytest
+from ga4gh.refget.catalog.builder import build_catalog, iter_metadata
+from ga4gh.refget.config.properties import Properties
+from ga4gh.refget.http.response import Response
 from ga4gh.refget.http.status_codes import StatusCodes as SC
-from ga4gh.refget.routes.sequence.get_sequence import get_sequence
+from ga4gh.refget.routes.sequence.get_sequence import get_sequence, \
+    set_byteranges
+from ga4gh.refget.util.admission_control import get_admission_controller
 from test.common.methods import setup_properties_request_response
 from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE, \
-    TRUNC512_NONEXISTENT, FILESERVER_PROPS_DICT
+    TRUNC512_NONEXISTENT, FILESERVER_PROPS_DICT, LOCAL_PROPS_DICT, \
+    PACKED_PROPS_DICT
 
 props_dict = FILESERVER_PROPS_DICT
 
+stream_props_dict = dict(FILESERVER_PROPS_DICT)
+stream_props_dict["server.stream_threshold"] = "10"
+
+phage_seq = open(
+    "test/common/fileserver/sequence/%s/index.html" % TRUNC512_PHAGE).read()
+
 testdata = [
-    # get full sequence via redirect
-    ({"path": {"seqid": TRUNC512_PHAGE}}, SC.REDIRECT_FOUND, ""),
+    # get large full sequence via redirect
+    ({"path": {"seqid": TRUNC512_CEREVISIAE}}, SC.REDIRECT_FOUND, ""),
+    # small full sequence is proxied
+    ({"path": {"seqid": TRUNC512_PHAGE}}, SC.OK, phage_seq),
     # get subseq by start/end
     (
         {"path": {"seqid": TRUNC512_PHAGE}, "query": {"start": "25", "end": "50"}},
         SC.OK,
         "AAGTTAACACTTTCGGATATTTCTG"
+    ),
+    # malformed sequence id is not found, rather than redirected
+    (
+        {"path": {"seqid": "notaseqid"}},
+        SC.NOT_FOUND,
+        json.dumps({"message": "sequence notaseqid not found"})
     )
 ]
 
@@ -27,5 +47,363 @@ def test_get_sequence(request_dict, exp_sc, exp_body):
     properties, request, response = setup_properties_request_response(
         props_dict, request_dict)
     get_sequence(properties, request, response)
+    response.join_body_stream()
+    assert response.get_status_code() == exp_sc
+    assert response.get_body() == exp_body
+
+testdata_stream = [
+    # subseq larger than stream threshold is streamed
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "query": {"start": "25", "end": "50"}},
+        True,
+        "AAGTTAACACTTTCGGATATTTCTG"
+    ),
+    # subseq to end of sequence larger than stream threshold is streamed
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "query": {"start": "5366"}},
+        True,
+        "ATTGGCGTATCCAACCTGCA"
+    ),
+    # subseq smaller than stream threshold is not streamed
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "query": {"start": "25", "end": "30"}},
+        False,
+        "AAGTT"
+    )
+]
+
+@pytest.mark.parametrize("request_dict,exp_streamed,exp_body", testdata_stream)
+def test_get_sequence_stream(request_dict, exp_streamed, exp_body):
+    properties, request, response = setup_properties_request_response(
+        stream_props_dict, request_dict)
+    get_sequence(properties, request, response)
+    assert response.get_status_code() == SC.OK
+    assert response.is_streamed() == exp_streamed
+    assert response.get_header("Content-Length") == len(exp_body)
+    response.join_body_stream()
+    assert response.get_body() == exp_body
+
+testdata_local = [
+    # full sequence cannot be redirected, returned directly
+    ({"path": {"seqid": TRUNC512_PHAGE}}, SC.OK, phage_seq, {}),
+    # subseq by start/end
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "query": {"start": "25", "end": "50"}},
+        SC.OK,
+        "AAGTTAACACTTTCGGATATTTCTG",
+        {}
+    ),
+    # subseq by Range cannot be redirected, returned as partial content
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "header": {"Range": "bytes=25-49"}},
+        SC.PARTIAL_CONTENT,
+        "AAGTTAACACTTTCGGATATTTCTG",
+        {"Content-Range": "bytes 25-49/5386"}
+    ),
+    # Range end beyond sequence end is truncated
+    (
+        {"path": {"seqid": TRUNC512_PHAGE},
+         "header": {"Range": "bytes=5380-9999"}},
+        SC.PARTIAL_CONTENT,
+        "CCTGCA",
+        {"Content-Range": "bytes 5380-5385/5386"}
+    ),
+    # open-ended and suffix Range
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "header": {"Range": "bytes=5380-"}},
+        SC.PARTIAL_CONTENT,
+        "CCTGCA",
+        {"Content-Range": "bytes 5380-5385/5386"}
+    ),
+    (
+        {"path": {"seqid": TRUNC512_PHAGE}, "header": {"Range": "bytes=-6"}},
+        SC.PARTIAL_CONTENT,
+        "CCTGCA",
+        {"Content-Range": "bytes 5380-5385/5386"}
+    ),
+    # overlapping Ranges are merged into a single range
+    (
+        {"path": {"seqid": TRUNC512_PHAGE},
+         "header": {"Range": "bytes=30-49,25-34"}},
+        SC.PARTIAL_CONTENT,
+        "AAGTTAACACTTTCGGATATTTCTG",
+        {"Content-Range": "bytes 25-49/5386"}
+    ),
+    # sequence not present in local directory
+    (
+        {"path": {"seqid": TRUNC512_NONEXISTENT}},
+        SC.NOT_FOUND,
+        json.dumps({
+            "message": "sequence " + TRUNC512_NONEXISTENT + " not found"}),
+        {}
+    )
+]
+
+# packed sequences cannot be redirected either, and are decoded by the server
+@pytest.mark.parametrize("local_props_dict", [LOCAL_PROPS_DICT,
+                                              PACKED_PROPS_DICT])
+@pytest.mark.parametrize("request_dict,exp_sc,exp_body,exp_headers",
+                         testdata_local)
+def test_get_sequence_local(local_props_dict, request_dict, exp_sc, exp_body,
+                            exp_headers):
+    properties, request, response = setup_properties_request_response(
+        local_props_dict, request_dict)
+    get_sequence(properties, request, response)
+    response.join_body_stream()
+    assert response.get_status_code() == exp_sc
+    assert response.get_body() == exp_body
+    for key in exp_headers.keys():
+        assert response.get_header(key) == exp_headers[key]
+
+redirect_props_dict = dict(FILESERVER_PROPS_DICT)
+redirect_props_dict["server.proxy_sequence_max_length"] = "0"
+redirect_props_dict["server.proxy_range_max_length"] = "10"
+
+range_props_dict = dict(redirect_props_dict)
+range_props_dict["server.range_mode"] = "proxy"
+
+testdata_range = [
+    # small Range is proxied
+    (
+        props_dict,
+        "bytes=25-49",
+        SC.PARTIAL_CONTENT,
+        "bytes 25-49/5386",
+        "AAGTTAACACTTTCGGATATTTCTG"
+    ),
+    # Range larger than the proxied maximum is redirected
+    (redirect_props_dict, "bytes=25-49", SC.REDIRECT_FOUND, None, ""),
+    # total span of multiple ranges is compared to the proxied maximum
+    (redirect_props_dict, "bytes=0-5,10-15", SC.REDIRECT_FOUND, None, ""),
+    (
+        redirect_props_dict,
+        "bytes=25-29,27-34",
+        SC.PARTIAL_CONTENT,
+        "bytes 25-34/5386",
+        "AAGTTAACAC"
+    ),
+    # Range is always served directly in proxy mode
+    (
+        range_props_dict,
+        "bytes=25-49",
+        SC.PARTIAL_CONTENT,
+        "bytes 25-49/5386",
+        "AAGTTAACACTTTCGGATATTTCTG"
+    )
+]
+
+@pytest.mark.parametrize("props_dict,range_header,exp_sc,exp_content_range,"
+                         + "exp_body", testdata_range)
+def test_get_sequence_range(props_dict, range_header, exp_sc,
+                            exp_content_range, exp_body):
+    properties, request, response = setup_properties_request_response(
+        props_dict,
+        {"path": {"seqid": TRUNC512_PHAGE}, "header": {"Range": range_header}})
+    get_sequence(properties, request, response)
+    assert response.get_status_code() == exp_sc
+    assert response.get_headers().get("Content-Range") == exp_content_range
+    assert response.get_body() == exp_body
+
+testdata_multipart = [
+    # multiple ranges, read in full
+    (range_props_dict, "bytes=0-4,25-29,-6", False),
+    # multiple ranges, streamed part by part
+    (dict(range_props_dict, **{"server.stream_threshold": "10"}),
+     "bytes=0-4,25-29,-6", True),
+    # multiple ranges of local sequences
+    (LOCAL_PROPS_DICT, "bytes=25-29, 0-4, -6", False),
+    (PACKED_PROPS_DICT, "bytes=25-29, 0-4, -6", False)
+]
+
+@pytest.mark.parametrize("props_dict,range_header,exp_streamed",
+                         testdata_multipart)
+def test_get_sequence_multipart(props_dict, range_header, exp_streamed):
+    properties, request, response = setup_properties_request_response(
+        props_dict,
+        {"path": {"seqid": TRUNC512_PHAGE}, "header": {"Range": range_header}})
+    get_sequence(properties, request, response)
+    assert response.get_status_code() == SC.PARTIAL_CONTENT
+    assert response.is_streamed() == exp_streamed
+    content_type = response.get_header("Content-Type")
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1]
+
+    response.join_body_stream()
+    body = response.get_body()
+    assert response.get_header("Content-Length") == len(body)
+    exp_body = "".join(
+        "--%s\r\n" % boundary
+        + "Content-Type: text/vnd.ga4gh.refget.v1.0.0+plain\r\n"
+        + "Content-Range: bytes %d-%d/5386\r\n\r\n%s\r\n" % (
+            start, end - 1, phage_seq[start:end])
+        for start, end in [[0, 5], [25, 30], [5380, 5386]]
+    ) + "--%s--\r\n" % boundary
+    assert body == exp_body
+
+class PartsDataSource(object):
+    """Datasource streaming fixed parts, closing streams into a list"""
+
+    def __init__(self, missing_start):
+        self.missing_start = missing_start
+        self.opened = []
+        self.closed = []
+
+    def stream_subsequence(self, seqid, start, end):
+        if start == self.missing_start:
+            return None
+        datasource = self
+
+        class PartStream(object):
+            def __iter__(self):
+                return iter([b"A" * (end - start)])
+
+            def close(self):
+                datasource.closed.append(start)
+
+        self.opened.append(start)
+        return PartStream()
+
+testdata_multipart_streams = [
+    # every part is opened before the response is returned
+    (None, True, [0, 25], []),
+    # a missing part fails the response, closing the parts already opened
+    (25, False, [0], [0]),
+    (0, False, [], [])
+]
+
+@pytest.mark.parametrize("missing_start,exp_set,exp_opened,exp_closed",
+                         testdata_multipart_streams)
+def test_set_byteranges_streams(missing_start, exp_set, exp_opened,
+                                exp_closed):
+    properties = Properties({"server.stream_threshold": "1"})
+    datasource = PartsDataSource(missing_start)
+    response = Response()
+    response.put_header("Content-Type", "text/plain")
+    assert set_byteranges(properties, datasource, response, TRUNC512_PHAGE,
+                          [[0, 5], [25, 30]], 50) == exp_set
+    assert datasource.opened == exp_opened
+    assert datasource.closed == exp_closed
+    if exp_set:
+        # discarding the unread body closes every part
+        response.get_body_stream().close()
+        assert datasource.closed == [0, 25]
+
+def test_get_sequence_multipart_overloaded():
+    # streamed parts are admitted before the response is returned, so a
+    # rejected part fetch is answered with SERVICE UNAVAILABLE
+    overloaded_props_dict = dict(props_dict)
+    overloaded_props_dict["cache.sequence_bytes"] = "0"
+    overloaded_props_dict["server.stream_threshold"] = "10"
+    overloaded_props_dict["server.max_upstream_fetches"] = "2"
+    properties, request, response = setup_properties_request_response(
+        overloaded_props_dict,
+        {"path": {"seqid": TRUNC512_PHAGE},
+         "header": {"Range": "bytes=0-4,25-29,-6"}})
+    admission = get_admission_controller(properties)
+    admission.acquire(0)
+    try:
+        get_sequence(properties, request, response)
+    finally:
+        admission.release(0)
+    assert response.get_status_code() == SC.SERVICE_UNAVAILABLE
+    assert response.get_header("Retry-After") == "1"
+    assert not response.is_streamed()
+    # the part admitted before the rejection has been released
+    assert admission.fetches == 0
+
+testdata_caching = [
+    # proxied and redirected responses are cacheable, errors are not
+    ({"path": {"seqid": TRUNC512_PHAGE}}, SC.OK, True),
+    ({"path": {"seqid": TRUNC512_CEREVISIAE}}, SC.REDIRECT_FOUND, True),
+    ({"path": {"seqid": TRUNC512_NONEXISTENT}}, SC.NOT_FOUND, False)
+]
+
+@pytest.mark.parametrize("request_dict,exp_sc,exp_cacheable",
+                         testdata_caching)
+def test_get_sequence_caching(request_dict, exp_sc, exp_cacheable):
+    properties, request, response = setup_properties_request_response(
+        props_dict, request_dict)
+    get_sequence(properties, request, response)
+    assert response.get_status_code() == exp_sc
+    headers = response.get_headers()
+    assert ("ETag" in headers) == exp_cacheable
+    if not exp_cacheable:
+        return
+    assert headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    # conditional request is answered without contacting the datasource
+    properties, request, response = setup_properties_request_response(
+        props_dict, dict(request_dict,
+                         header={"If-None-Match": headers["ETag"]}))
+    get_sequence(properties, request, response)
+    assert response.get_status_code() == SC.NOT_MODIFIED
+    assert response.get_body() == ""
+
+testdata_conditional_invalid = [
+    ({"path": {"seqid": "nonexistent"}}, SC.NOT_FOUND),
+    ({"path": {"seqid": TRUNC512_PHAGE}, "query": {"start": "5", "end": "1"}},
+     SC.NOT_IMPLEMENTED)
+]
+
+@pytest.mark.parametrize("request_dict,exp_sc", testdata_conditional_invalid)
+def test_get_sequence_conditional_invalid(request_dict, exp_sc):
+    # conditions matching any representation do not hide invalid requests
+    for header in [{"If-None-Match": "*"},
+                   {"If-Modified-Since": "Sat, 17 Oct 2026 10:00:00 GMT"}]:
+        properties, request, response = setup_properties_request_response(
+            props_dict, dict(request_dict, header=header))
+        get_sequence(properties, request, response)
+        assert response.get_status_code() == exp_sc
+
+@pytest.fixture(scope="module")
+def catalog_props_dict(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("catalog") / "catalog.bin")
+    build_catalog(iter_metadata("test/common/fileserver"), path)
+    catalog_props_dict = dict(FILESERVER_PROPS_DICT)
+    catalog_props_dict["local.catalog_file"] = path
+    return catalog_props_dict
+
+testdata_catalog = [
+    # get subseq by md5 alias
+    (
+        {"path": {"seqid": "3332ed720ac7eaa9b3655c06f6b9e196"},
+         "query": {"start": "25", "end": "50"}},
+        SC.OK,
+        "AAGTTAACACTTTCGGATATTTCTG",
+        {}
+    ),
+    # small full sequence by ga4gh identifier is proxied
+    (
+        {"path": {"seqid": "ga4gh:SQ.IIXILYBQCpHdC4qpI3sOQ_HAeAm9bmeF"}},
+        SC.OK,
+        phage_seq,
+        {}
+    ),
+    # large full sequence by md5 alias redirects to the canonical object
+    (
+        {"path": {"seqid": "6681ac2f62509cfc220d78751b8dc524"}},
+        SC.REDIRECT_FOUND,
+        "",
+        {"Location": "http://localhost:8080/sequence/" + TRUNC512_CEREVISIAE}
+    ),
+    # sequences absent from the catalog are not found
+    (
+        {"path": {"seqid": TRUNC512_NONEXISTENT}},
+        SC.NOT_FOUND,
+        json.dumps({"message": "sequence %s not found" % TRUNC512_NONEXISTENT}),
+        {}
+    )
+]
+
+@pytest.mark.parametrize("request_dict,exp_sc,exp_body,exp_headers",
+    testdata_catalog)
+def test_get_sequence_catalog(catalog_props_dict, request_dict, exp_sc,
+    exp_body, exp_headers):
+    properties, request, response = setup_properties_request_response(
+        catalog_props_dict, request_dict)
+    get_sequence(properties, request, response)
+    response.join_body_stream()
     assert response.get_status_code() == exp_sc
     assert response.get_body() == exp_body
+    for key in exp_headers.keys():
+        assert response.get_header(key) == exp_headers[key]
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for get_sequence_batch method"""
+
+import json
+import pytest
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.routes.sequence.get_sequence_batch import \
+    get_sequence_batch, get_windows
+from ga4gh.refget.util.admission_control import get_admission_controller
+from test.common.methods import setup_properties_request_response
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_NONEXISTENT, \
+    FILESERVER_PROPS_DICT, LOCAL_PROPS_DICT
+
+props_dict = dict(FILESERVER_PROPS_DICT)
+props_dict["source.sequence_path"] = "/sequence/{seqid}/index.html"
+
+small_batch_props_dict = dict(props_dict)
+small_batch_props_dict["server.batch_max_size"] = "2"
+
+def batch(*items):
+    return json.dumps({"requests": list(items)})
+
+testdata_windows = [
+    ([], []),
+    ([(0, 10)], [[0, 10]]),
+    ([(20, 30), (0, 10)], [[0, 30]]),
+    ([(0, 10), (5, 8)], [[0, 10]]),
+    ([(0, 10), (10000, 10010)], [[0, 10], [10000, 10010]])
+]
+
+@pytest.mark.parametrize("coords,exp_windows", testdata_windows)
+def test_get_windows(coords, exp_windows):
+    assert get_windows(coords) == exp_windows
+
+testdata_windows_limited = [
+    # windows are merged up to the maximum length
+    ([(0, 10), (20, 30)], 30, [[0, 30]]),
+    ([(0, 10), (20, 30)], 29, [[0, 10], [20, 30]]),
+    ([(0, 10), (5, 8), (20, 30)], 20, [[0, 10], [20, 30]]),
+    ([(0, 10), (10, 20), (20, 30)], 20, [[0, 20], [20, 30]]),
+    ([(0, 10), (20, 30)], 0, [[0, 30]])
+]
+
+@pytest.mark.parametrize("coords,max_length,exp_windows",
+                         testdata_windows_limited)
+def test_get_windows_limited(coords, max_length, exp_windows):
+    assert get_windows(coords, max_length) == exp_windows
+
+testdata = [
+    # subsequences of the same sequence, in request order, fetched from the
+    # http and local datasources
+    (
+        props_dict,
+        batch({"seqid": TRUNC512_PHAGE, "start": 5366, "end": 5386},
+              {"seqid": TRUNC512_PHAGE, "start": 25, "end": 50},
+              {"seqid": TRUNC512_PHAGE, "start": "30", "end": "35"}),
+        SC.OK,
+        [
+            {"seqid": TRUNC512_PHAGE, "status": SC.OK, "start": 5366,
+             "end": 5386, "sequence": "ATTGGCGTATCCAACCTGCA"},
+            {"seqid": TRUNC512_PHAGE, "status": SC.OK, "start": 25,
+             "end": 50, "sequence": "AAGTTAACACTTTCGGATATTTCTG"},
+            {"seqid": TRUNC512_PHAGE, "status": SC.OK, "start": 30,
+             "end": 35, "sequence": "AACAC"}
+        ]
+    ),
+    (
+        LOCAL_PROPS_DICT,
+        batch({"seqid": TRUNC512_PHAGE, "start": 25, "end": 50}),
+        SC.OK,
+        [
+            {"seqid": TRUNC512_PHAGE, "status": SC.OK, "start": 25,
+             "end": 50, "sequence": "AAGTTAACACTTTCGGATATTTCTG"}
+        ]
+    ),
+    # invalid subsequences are reported per request
+    (
+        props_dict,
+        batch({"seqid": TRUNC512_PHAGE, "start": 5380},
+              {"seqid": TRUNC512_PHAGE, "start": 50, "end": 25},
+              {"seqid": TRUNC512_PHAGE, "start": 0, "end": 6000},
+              {"seqid": TRUNC512_PHAGE, "start": "abc"},
+              {"seqid": TRUNC512_NONEXISTENT, "start": 0, "end": 10}),
+        SC.OK,
+        [
+            {"seqid": TRUNC512_PHAGE, "status": SC.OK, "start": 5380,
+             "end": 5386, "sequence": "CCTGCA"},
+            {"seqid": TRUNC512_PHAGE, "status": SC.NOT_IMPLEMENTED,
+             "message": "server DOES NOT support circular sequences, end "
+                        + "MUST be higher than start"},
+            {"seqid": TRUNC512_PHAGE,
+             "status": SC.REQUESTED_RANGE_NOT_SATISFIABLE,
+             "message": "Invalid sequence range provided"},
+            {"seqid": TRUNC512_PHAGE, "status": SC.BAD_REQUEST,
+             "message": "start/end must be unsigned int"},
+            {"seqid": TRUNC512_NONEXISTENT, "status": SC.NOT_FOUND,
+             "message": "sequence %s not found" % TRUNC512_NONEXISTENT}
+        ]
+    ),
+    # malformed batches
+    (props_dict, "not json", SC.BAD_REQUEST, None),
+    (props_dict, json.dumps({"requests": {}}), SC.BAD_REQUEST, None),
+    (props_dict, batch({"start": 0}), SC.BAD_REQUEST, None),
+    (props_dict, batch({"seqid": 5}), SC.BAD_REQUEST, None),
+    (props_dict, batch({"seqid": ["x"]}), SC.BAD_REQUEST, None),
+    (props_dict, batch({"seqid": TRUNC512_PHAGE, "start": [0]}),
+     SC.BAD_REQUEST, None),
+    (props_dict, batch({"seqid": TRUNC512_PHAGE, "end": {"x": 1}}),
+     SC.BAD_REQUEST, None),
+    (props_dict, batch({"seqid": TRUNC512_PHAGE, "start": 1.5}),
+     SC.BAD_REQUEST, None),
+    (props_dict, batch({"seqid": TRUNC512_PHAGE, "end": True}),
+     SC.BAD_REQUEST, None),
+    (
+        small_batch_props_dict,
+        batch(*[{"seqid": TRUNC512_PHAGE}] * 3),
+        SC.BAD_REQUEST,
+        None
+    )
+]
+
+@pytest.mark.parametrize("props_dict,body,exp_sc,exp_results", testdata)
+def test_get_sequence_batch(props_dict, body, exp_sc, exp_results):
+    properties, request, response = setup_properties_request_response(
+        props_dict, {"body": body})
+    get_sequence_batch(properties, request, response)
+    assert response.get_status_code() == exp_sc
+    if exp_results is not None:
+        assert json.loads(response.get_body())["results"] == exp_results
+
+def test_get_sequence_batch_full_sequence():
+    properties, request, response = setup_properties_request_response(
+        props_dict, {"body": batch({"seqid": TRUNC512_PHAGE})})
+    get_sequence_batch(properties, request, response)
+    result = json.loads(response.get_body())["results"][0]
+    assert result["status"] == SC.OK
+    assert result["start"] == 0
+    assert result["end"] == 5386
+    assert len(result["sequence"]) == 5386
+
+def test_get_sequence_batch_subsequence_limit():
+    limit_props_dict = dict(props_dict)
+    limit_props_dict["server.subsequence_limit"] = "1000"
+    properties, request, response = setup_properties_request_response(
+        limit_props_dict, {"body": batch(
+            {"seqid": TRUNC512_PHAGE},
+            {"seqid": TRUNC512_PHAGE, "start": 0, "end": 1000})})
+    get_sequence_batch(properties, request, response)
+    results = json.loads(response.get_body())["results"]
+    assert [r["status"] for r in results] == \
+        [SC.REQUESTED_RANGE_NOT_SATISFIABLE, SC.OK]
+    assert results[0]["message"] == \
+        "requested subsequence exceeds the subsequence limit of 1000"
+
+def test_get_sequence_batch_too_large():
+    # windows held until the response is assembled are bounded in total
+    large_props_dict = dict(props_dict)
+    large_props_dict["server.max_inflight_bytes"] = "100"
+    properties, request, response = setup_properties_request_response(
+        large_props_dict, {"body": batch(
+            {"seqid": TRUNC512_PHAGE, "start": 0, "end": 60},
+            {"seqid": TRUNC512_PHAGE, "start": 5000, "end": 5060})})
+    get_sequence_batch(properties, request, response)
+    assert response.get_status_code() == SC.PAYLOAD_TOO_LARGE
+    assert json.loads(response.get_body())["message"] == \
+        "batch subsequences exceed the in-flight byte limit of 100"
+
+    properties, request, response = setup_properties_request_response(
+        large_props_dict, {"body": batch(
+            {"seqid": TRUNC512_PHAGE, "start": 0, "end": 60},
+            {"seqid": TRUNC512_PHAGE, "start": 40, "end": 100})})
+    get_sequence_batch(properties, request, response)
+    assert response.get_status_code() == SC.OK
+
+def test_get_sequence_batch_overloaded():
+    # uncached windows rejected by admission control reject the whole batch
+    overloaded_props_dict = dict(props_dict)
+    overloaded_props_dict["cache.sequence_bytes"] = "0"
+    overloaded_props_dict["server.max_upstream_fetches"] = "1"
+    overloaded_props_dict["server.max_inflight_bytes"] = "10"
+    properties, request, response = setup_properties_request_response(
+        overloaded_props_dict, {"body": batch(
+            {"seqid": TRUNC512_PHAGE, "start": 0, "end": 10})})
+    admission = get_admission_controller(properties)
+    admission.acquire(0)
+    try:
+        get_sequence_batch(properties, request, response)
+    finally:
+        admission.release(0)
+    assert response.get_status_code() == SC.SERVICE_UNAVAILABLE
+    assert response.get_header("Retry-After") == "1"
@@ -19,6 +19,12 @@ testdata = [
     )
 ]
 
+testdata_limit = [
+    ({}, 300000),
+    ({"server.subsequence_limit": "1000"}, 1000),
+    ({"server.subsequence_limit": "0"}, None)
+]
+
 @pytest.mark.parametrize("request_dict,exp_sc,exp_body", testdata)
 def test_get_service_info(request_dict, exp_sc, exp_body):
     properties, request, response = setup_properties_request_response(
@@ -26,3 +32,24 @@ def test_get_service_info(request_dict, exp_sc, exp_body):
     get_service_info(properties, request, response)
     assert response.get_status_code() == exp_sc
     assert response.get_body() == exp_body
+
+@pytest.mark.parametrize("limit_props_dict,exp_limit", testdata_limit)
+def test_get_service_info_subsequence_limit(limit_props_dict, exp_limit):
+    # the enforced subsequence limit is advertised
+    properties, request, response = setup_properties_request_response(
+        limit_props_dict, {})
+    get_service_info(properties, request, response)
+    service = json.loads(response.get_body())["service"]
+    assert service["subsequence_limit"] == exp_limit
+
+def test_get_service_info_caching():
+    # service info may change between deployments, so it is not immutable,
+    # and its entity tag changes with its content
+    etags = []
+    for limit_props_dict in [{}, {"server.subsequence_limit": "1000"}]:
+        properties, request, response = setup_properties_request_response(
+            limit_props_dict, {})
+        get_service_info(properties, request, response)
+        assert response.get_header("Cache-Control") == "public, max-age=3600"
+        etags.append(response.get_header("ETag"))
+    assert etags[0] != etags[1]
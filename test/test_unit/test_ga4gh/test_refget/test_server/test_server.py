@@ -1,10 +1,25 @@
 # -*- coding: utf-8 -*-
 """Unit tests for RefgetServer class"""
 
+import gzip
+import json
 import pytest
+import tornado.netutil
+import tornado.process
+from click.testing import CliRunner
+from tornado.ioloop import IOLoop
 from ga4gh.refget.config.exceptions import RefgetException
+from ga4gh.refget.datasource.metadata import get_metadata_cache
+from ga4gh.refget.datasource.pinned_source import get_pinned_store
+from ga4gh.refget.datasource.s3_source import get_s3_client
+from ga4gh.refget.datasource.upstream import get_session
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.metrics.metrics import render_metrics, set_worker
+from ga4gh.refget.util.executor import get_executor
 from ga4gh.refget.server.server import RefgetServer, GetServiceInfoHandler, \
-    GetMetadataHandler, GetSequenceHandler
+    GetMetadataHandler, GetSequenceHandler, run_server
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE
+from test.common.methods import fetch_from_application
 
 props_dir = "test/common/properties/"
 
@@ -53,3 +68,196 @@ def test_server_setup(props_file, e_success, e_code, e_msg):
         assert e_success == False
         assert e.get_exit_code() == e_code
         assert e.get_message() == e_msg
+
+testdata_fetch = [
+    ("/sequence/service-info", SC.OK, None),
+    (
+        "/sequence/%s?start=25&end=50" % TRUNC512_PHAGE,
+        SC.OK,
+        b"AAGTTAACACTTTCGGATATTTCTG"
+    ),
+    ("/sequence/%s" % TRUNC512_CEREVISIAE, SC.REDIRECT_FOUND, b""),
+    ("/sequence/%s/metadata" % TRUNC512_PHAGE, SC.REDIRECT_FOUND, b"")
+]
+
+@pytest.mark.parametrize("path,exp_sc,exp_body", testdata_fetch)
+def test_server_fetch(path, exp_sc, exp_body):
+
+    server = RefgetServer(props_dir + "application.properties.0")
+    response = fetch_from_application(server.application, path)
+    assert response.code == exp_sc
+    if exp_body is not None:
+        assert response.body == exp_body
+
+def test_server_fetch_streamed():
+
+    server = RefgetServer(props_dir + "application.properties.2")
+    path = "/sequence/%s?start=25&end=50" % TRUNC512_PHAGE
+    response = fetch_from_application(server.application, path)
+    assert response.code == SC.OK
+    assert response.body == b"AAGTTAACACTTTCGGATATTTCTG"
+
+def test_server_fetch_local():
+
+    server = RefgetServer(props_dir + "application.properties.3")
+    phage_seq = open(
+        "test/common/fileserver/sequence/%s/index.html" % TRUNC512_PHAGE, "rb"
+    ).read()
+    response = fetch_from_application(
+        server.application, "/sequence/%s" % TRUNC512_PHAGE)
+    assert response.code == SC.OK
+    assert response.body == phage_seq
+
+testdata_compressed = [
+    # small subsequence, below the minimum compressed size
+    ("application.properties.0", "?start=25&end=50", None),
+    # full sequence, streamed from the local datasource
+    ("application.properties.3", "", "gzip"),
+    # subsequence, streamed from the http datasource
+    ("application.properties.2", "?start=0&end=5000", "gzip")
+]
+
+@pytest.mark.parametrize("props_file,query,exp_encoding", testdata_compressed)
+def test_server_fetch_compressed(props_file, query, exp_encoding):
+
+    server = RefgetServer(props_dir + props_file)
+    phage_seq = open(
+        "test/common/fileserver/sequence/%s/index.html" % TRUNC512_PHAGE, "rb"
+    ).read()
+    response = fetch_from_application(
+        server.application, "/sequence/%s%s" % (TRUNC512_PHAGE, query),
+        headers={"Accept-Encoding": "gzip"}, decompress_response=False)
+    assert response.code == SC.OK
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers.get("Content-Encoding") == exp_encoding
+
+    start, end = [int(p.split("=")[1]) for p in query[1:].split("&")] \
+        if query else [0, len(phage_seq)]
+    body = gzip.decompress(response.body) if exp_encoding else response.body
+    assert body == phage_seq[start:end]
+
+def test_server_warmup(tmp_path):
+    warmup_file = tmp_path / "warmup.txt"
+    warmup_file.write_text(TRUNC512_PHAGE + "\n")
+    props_file = tmp_path / "application.properties"
+    props_file.write_text(
+        open(props_dir + "application.properties.0").read().strip() + "\n"
+        + "cache.pinned_bytes=1000000\n"
+        + "local.warmup_file=%s\n" % str(warmup_file))
+
+    # listed sequences are warmed up before the server serves requests
+    server = RefgetServer(str(props_file))
+    assert server.warmup_seqids == [TRUNC512_PHAGE]
+    metadata_cache = get_metadata_cache(server.properties)
+    pinned_store = get_pinned_store(server.properties)
+    assert metadata_cache.contains(TRUNC512_PHAGE)
+    assert pinned_store.contains(TRUNC512_PHAGE)
+
+    # background refresh reloads evicted metadata objects
+    metadata_cache.clear()
+    IOLoop.current().run_sync(server.refresh_warmup)
+    assert metadata_cache.contains(TRUNC512_PHAGE)
+    pinned_store.clear()
+
+def test_server_fetch_not_modified():
+
+    server = RefgetServer(props_dir + "application.properties.0")
+    path = "/sequence/%s?start=25&end=50" % TRUNC512_PHAGE
+    response = fetch_from_application(server.application, path)
+    assert response.code == SC.OK
+    assert "immutable" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+
+    # the server's own entity tag is not replaced by a body hash
+    response = fetch_from_application(
+        server.application, path, headers={"If-None-Match": etag})
+    assert response.code == 304
+    assert response.headers["ETag"] == etag
+    assert response.body == b""
+
+testdata_workers = [
+    (props_dir + "application.properties.0", None, 1),
+    (props_dir + "application.properties.0", 4, 4),
+    (props_dir + "application.properties.0", 0, 0),
+    (props_dir + "application.properties.4", None, 0),
+    (props_dir + "application.properties.4", 2, 2)
+]
+
+@pytest.mark.parametrize("props_file,workers,exp_workers", testdata_workers)
+def test_server_workers(props_file, workers, exp_workers):
+
+    server = RefgetServer(props_file)
+    assert server.get_workers(workers) == exp_workers
+
+def test_server_run_forked(monkeypatch):
+
+    class StubIOLoop(object):
+        def start(self):
+            pass
+
+    server = RefgetServer(props_dir + "application.properties.0")
+    forks = []
+    monkeypatch.setattr(tornado.netutil, "bind_sockets", lambda port: [])
+    monkeypatch.setattr(tornado.process, "fork_processes",
+                        lambda workers: forks.append(workers))
+    monkeypatch.setattr(tornado.process, "task_id", lambda: 1)
+    monkeypatch.setattr(IOLoop, "current", staticmethod(StubIOLoop))
+    monkeypatch.setattr(RefgetServer, "start_warmup_refresh",
+                        lambda self: None)
+
+    session = get_session(server.properties)
+    s3_client = get_s3_client(server.properties)
+    executor = get_executor(server.properties)
+    server.run(2)
+    text = render_metrics()
+    set_worker(None)
+    assert forks == [2]
+    assert get_session(server.properties) is not session
+    assert get_s3_client(server.properties) is not s3_client
+    assert get_executor(server.properties) is not executor
+    assert 'refget_cache_size{cache="metadata",worker="1"}' in text
+
+def test_run_server_options(monkeypatch):
+
+    runs = []
+    monkeypatch.setattr(RefgetServer, "run",
+                        lambda self, workers=None: runs.append(workers))
+    result = CliRunner().invoke(run_server, [
+        "--properties-file", props_dir + "application.properties.0",
+        "--workers", "3"
+    ])
+    assert result.exit_code == 0
+    assert runs == [3]
+
+def test_server_metrics():
+
+    server = RefgetServer(props_dir + "application.properties.0")
+    fetch_from_application(
+        server.application, "/sequence/%s?start=0&end=10" % TRUNC512_PHAGE)
+    response = fetch_from_application(
+        server.application, "/sequence/%s" % TRUNC512_PHAGE, method="POST",
+        body="")
+    assert response.code == SC.METHOD_NOT_ALLOWED
+    response = fetch_from_application(server.application, "/metrics")
+    assert response.code == SC.OK
+    assert response.headers["Content-Type"].startswith("text/plain")
+    text = response.body.decode("utf-8")
+    assert 'refget_requests_total{route="sequence",outcome="body",' \
+        + 'status="200",worker="0"}' in text
+    assert 'refget_requests_total{route="method_not_allowed",' \
+        + 'outcome="error",status="405",worker="0"}' in text
+    assert 'route="sequence",outcome="error",status="405"' not in text
+    assert 'refget_upstream_requests_total{call="metadata",status="200",' \
+        + 'worker="0"}' in text
+
+def test_server_sequence_batch():
+
+    server = RefgetServer(props_dir + "application.properties.0")
+    body = json.dumps({"requests": [
+        {"seqid": TRUNC512_PHAGE, "start": 25, "end": 50}]})
+    response = fetch_from_application(
+        server.application, "/sequence/batch", method="POST", body=body)
+    assert response.code == SC.OK
+    result = json.loads(response.body.decode("utf-8"))["results"][0]
+    assert result["status"] == SC.OK
+    assert result["sequence"] == "AAGTTAACACTTTCGGATATTTCTG"
@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 """Unit tests for AWS Lambda functions"""
 
+import base64
+import gzip
 import json
 import pytest
 from ga4gh.refget.config.service_info import SERVICE_INFO
 from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.serverless.aws.awslambda import functions
 from ga4gh.refget.serverless.aws.awslambda.functions import \
-    get_sequence, get_metadata, get_service_info
+    get_sequence, get_sequence_batch, get_metadata, get_service_info, \
+    get_properties, \
+    get_memory_limit, get_cache_sizes, load_properties
 from test.common.constants import TRUNC512_PHAGE, FILESERVER_PROPS_DICT as PROPS
 
 context = None
@@ -24,6 +29,22 @@ testdata = [
         "AAGTTAACACTTTCGGATATTTCTG",
         {}
     ),
+    # get_sequence_batch tests
+    (
+        get_sequence_batch,
+        {
+            "pathParameters": {},
+            "queryStringParameters": {},
+            "headers": {},
+            "body": json.dumps({"requests": [
+                {"seqid": TRUNC512_PHAGE, "start": 25, "end": 50}]})
+        },
+        SC.OK,
+        json.dumps({"results": [{
+            "seqid": TRUNC512_PHAGE, "status": SC.OK, "start": 25, "end": 50,
+            "sequence": "AAGTTAACACTTTCGGATATTTCTG"}]}),
+        {}
+    ),
     # get_metadata tests
     (
         get_metadata,
@@ -56,6 +77,7 @@ testdata = [
 def mock_env(monkeypatch):
     monkeypatch.setenv("SOURCE_BASE_URL", PROPS["source.base_url"])
     monkeypatch.setenv("SOURCE_METADATA_PATH", PROPS["source.metadata_path"])
+    monkeypatch.setattr(functions, "container_properties", None)
 
 @pytest.mark.parametrize("function,event,exp_sc,exp_body,exp_headers", testdata)
 def test_aws_lambda_function(function, event, exp_sc, exp_body, exp_headers,
@@ -66,3 +88,69 @@ def test_aws_lambda_function(function, event, exp_sc, exp_body, exp_headers,
     assert response["body"] == exp_body
     for key in exp_headers.keys():
         assert response["headers"][key] == exp_headers[key]
+
+def test_aws_lambda_function_compressed(mock_env):
+
+    event = {
+        "pathParameters": {"seqid": TRUNC512_PHAGE},
+        "queryStringParameters": {"start": "0", "end": "5000"},
+        "headers": {"accept-encoding": "gzip"}
+    }
+    response = get_sequence(event, context)
+    assert response["statusCode"] == SC.OK
+    assert response["isBase64Encoded"]
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    body = gzip.decompress(base64.b64decode(response["body"]))
+    assert len(body) == 5000
+    assert body[25:50] == b"AAGTTAACACTTTCGGATATTTCTG"
+
+def test_get_properties(mock_env, monkeypatch):
+
+    properties = get_properties(context)
+    assert properties.get("source.base_url") == PROPS["source.base_url"]
+
+    # properties are resolved once per container
+    monkeypatch.setenv("SOURCE_BASE_URL", "http://example.org")
+    assert get_properties(context) is properties
+    assert properties.get("source.base_url") == PROPS["source.base_url"]
+
+class MockContext(object):
+    memory_limit_in_mb = "256"
+
+testdata_memory_limit = [
+    (MockContext(), None, 256),
+    (None, "1024", 1024),
+    (None, None, None)
+]
+
+@pytest.mark.parametrize("context,envvar,exp_limit", testdata_memory_limit)
+def test_get_memory_limit(context, envvar, exp_limit, monkeypatch):
+    monkeypatch.delenv("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", raising=False)
+    if envvar:
+        monkeypatch.setenv("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", envvar)
+    assert get_memory_limit(context) == exp_limit
+
+testdata_cache_sizes = [
+    (1024, 0.25, 32768, 234881024),
+    (128, 0.5, 8192, 58720256)
+]
+
+@pytest.mark.parametrize("memory_limit,fraction,exp_metadata,exp_sequence",
+    testdata_cache_sizes)
+def test_get_cache_sizes(memory_limit, fraction, exp_metadata, exp_sequence):
+    cache_sizes = get_cache_sizes(memory_limit, fraction)
+    assert cache_sizes["cache.metadata_size"] == exp_metadata
+    assert cache_sizes["cache.sequence_bytes"] == exp_sequence
+
+def test_load_properties_cache_sizes(mock_env, monkeypatch):
+
+    # cache sizes derived from function memory
+    properties = load_properties(MockContext())
+    assert int(properties.get("cache.metadata_size")) == 8192
+    assert int(properties.get("cache.sequence_bytes")) == 58720256
+
+    # explicitly set cache sizes take precedence
+    monkeypatch.setenv("CACHE_SEQUENCE_BYTES", "1000")
+    properties = load_properties(MockContext())
+    assert int(properties.get("cache.metadata_size")) == 8192
+    assert int(properties.get("cache.sequence_bytes")) == 1000
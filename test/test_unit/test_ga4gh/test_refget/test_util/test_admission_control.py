@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for admission module"""
+
+import pytest
+from ga4gh.refget.config.exceptions import RefgetOverloadedException
+from ga4gh.refget.metrics.metrics import admission_rejected_total
+from ga4gh.refget.util.admission_control import AdmissionController, \
+    get_admission_controller
+from test.common.methods import setup_properties
+
+testdata = [
+    # admitted fetches within the limits
+    (2, 100, [10, 20], None),
+    # rejected once the concurrent fetch limit is reached
+    (2, 100, [10, 20, 30], "fetches"),
+    # rejected once the in-flight byte limit would be exceeded
+    (4, 100, [60, 50], "bytes"),
+    # a single fetch larger than the byte limit is admitted
+    (4, 100, [150], None),
+    (4, 100, [150, 1], "bytes"),
+    # no limits
+    (0, 0, [10 ** 9] * 100, None)
+]
+
+@pytest.mark.parametrize("max_fetches,max_bytes,acquires,exp_reason",
+                         testdata)
+def test_admission_controller(max_fetches, max_bytes, acquires, exp_reason):
+    controller = AdmissionController(max_fetches, max_bytes)
+    rejected = None
+    count = None if exp_reason is None \
+        else admission_rejected_total.get(exp_reason)
+    try:
+        for n_bytes in acquires:
+            controller.acquire(n_bytes)
+    except RefgetOverloadedException as e:
+        rejected = e
+    if exp_reason is None:
+        assert rejected is None
+    else:
+        assert rejected.get_message() == \
+            "server is overloaded, too many concurrent %s" % exp_reason
+        assert admission_rejected_total.get(exp_reason) == count + 1
+
+def test_admission_controller_release():
+    controller = AdmissionController(1, 100)
+    controller.acquire(60)
+    with pytest.raises(RefgetOverloadedException):
+        controller.acquire(10)
+    controller.release(60)
+    assert [controller.fetches, controller.bytes] == [0, 0]
+    controller.acquire(100)
+
+def test_get_admission_controller():
+    properties = setup_properties({"server.max_upstream_fetches": "3",
+                                   "server.max_inflight_bytes": "1000"})
+    controller = get_admission_controller(properties)
+    assert [controller.max_fetches, controller.max_bytes] == [3, 1000]
+    assert get_admission_controller(properties) is controller
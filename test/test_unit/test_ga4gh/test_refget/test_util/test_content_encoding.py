@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for content encoding methods"""
+
+import gzip
+import pytest
+from ga4gh.refget.util import content_encoding
+from ga4gh.refget.util.content_encoding import compress_body, compress_stream, \
+    get_available_encodings, negotiate_encoding, parse_accept_encoding
+
+testdata_parse = [
+    ("gzip", {"gzip": 1.0}),
+    ("gzip, br;q=0.5", {"gzip": 1.0, "br": 0.5}),
+    ("GZIP;q=0, *;q=0.1", {"gzip": 0.0, "*": 0.1}),
+    ("gzip;q=abc, ,", {"gzip": 0.0})
+]
+
+@pytest.mark.parametrize("accept_encoding,exp_qvalues", testdata_parse)
+def test_parse_accept_encoding(accept_encoding, exp_qvalues):
+    assert parse_accept_encoding(accept_encoding) == exp_qvalues
+
+testdata_negotiate = [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("br, zstd", None)
+]
+
+@pytest.mark.parametrize("accept_encoding,exp_encoding", testdata_negotiate)
+def test_negotiate_encoding(accept_encoding, exp_encoding, monkeypatch):
+    # only gzip is available without the optional packages
+    monkeypatch.setattr(content_encoding, "brotli", None)
+    monkeypatch.setattr(content_encoding, "zstandard", None)
+    assert get_available_encodings() == {"gzip"}
+    assert negotiate_encoding(accept_encoding, ["br", "zstd", "gzip"]) \
+        == exp_encoding
+
+def test_negotiate_encoding_preference(monkeypatch):
+    monkeypatch.setattr(content_encoding, "get_available_encodings",
+                        lambda: {"br", "zstd", "gzip"})
+    preferred = ["br", "zstd", "gzip"]
+    # server preference breaks ties, client quality values take precedence
+    assert negotiate_encoding("gzip, zstd, br", preferred) == "br"
+    assert negotiate_encoding("gzip, zstd;q=0.9", preferred) == "gzip"
+    # encodings not offered by the server are never selected
+    assert negotiate_encoding("br", ["gzip"]) is None
+
+body = b"ACGT" * 1000
+
+def test_compress_body():
+    compressed = compress_body(body, "gzip")
+    assert len(compressed) < len(body)
+    assert gzip.decompress(compressed) == body
+
+class ClosableStream(object):
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+def test_compress_stream():
+    chunks = [memoryview(body)[i:i + 100] for i in range(0, len(body), 100)]
+    stream = ClosableStream(chunks)
+    compressed = list(compress_stream(stream, "gzip"))
+    assert all(compressed)
+    assert gzip.decompress(b"".join(compressed)) == body
+    assert stream.closed
+
+def test_compress_stream_closed_early():
+    stream = ClosableStream([body, body])
+    compressed = compress_stream(stream, "gzip")
+    next(compressed)
+    compressed.close()
+    assert stream.closed
+
+def test_compress_stream_not_read():
+    stream = ClosableStream([body, body])
+    compress_stream(stream, "gzip").close()
+    assert stream.closed
+
+@pytest.mark.parametrize("encoding,module", [("br", "brotli"),
+                                             ("zstd", "zstandard")])
+def test_compress_optional(encoding, module):
+    package = pytest.importorskip(module)
+    compressed = b"".join(compress_stream(iter([body, body]), encoding))
+    if encoding == "br":
+        assert package.decompress(compressed) == body + body
+    else:
+        decompressor = package.ZstdDecompressor().decompressobj()
+        assert decompressor.decompress(compressed) == body + body
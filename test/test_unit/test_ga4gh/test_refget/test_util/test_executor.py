@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for executor methods"""
+
+import pytest
+import threading
+from tornado.ioloop import IOLoop
+from ga4gh.refget.http.status_codes import StatusCodes as SC
+from ga4gh.refget.util.executor import get_batch_executor, get_executor, \
+    get_part_executor, reset_executors, run_async, run_route_async
+from test.common.methods import setup_properties_request_response
+
+def test_get_executor():
+    properties, request, response = setup_properties_request_response(
+        {"server.io_threads": "4"}, {})
+    executor = get_executor(properties)
+    assert executor is get_executor(properties)
+    assert executor._max_workers == 4
+
+def test_get_part_executor():
+    properties, request, response = setup_properties_request_response(
+        {"source.s3_part_concurrency": "3"}, {})
+    executor = get_part_executor(properties)
+    assert executor is get_part_executor(properties)
+    assert executor is not get_executor(properties)
+    assert executor._max_workers == 3
+
+def test_reset_executors():
+    properties, request, response = setup_properties_request_response({}, {})
+    executor = get_executor(properties)
+    batch_executor = get_batch_executor(properties)
+    part_executor = get_part_executor(properties)
+    reset_executors()
+    assert get_executor(properties) is not executor
+    assert get_batch_executor(properties) is not batch_executor
+    assert get_part_executor(properties) is not part_executor
+
+def test_run_async():
+    properties, request, response = setup_properties_request_response({}, {})
+    main_thread = threading.current_thread()
+    thread = IOLoop.current().run_sync(
+        lambda: run_async(properties, threading.current_thread))
+    assert thread is not main_thread
+
+def test_run_route_async():
+    properties, request, response = setup_properties_request_response({}, {})
+
+    def route(properties, request, response):
+        response.set_status_code(SC.OK)
+        response.set_body("ACGT")
+
+    IOLoop.current().run_sync(
+        lambda: run_route_async(route, properties, request, response))
+    assert response.get_status_code() == SC.OK
+    assert response.get_body() == "ACGT"
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for sequence id validation"""
+
+import pytest
+from ga4gh.refget.util.seqid import get_seqid_type, is_valid_seqid
+
+testdata = [
+    ("3332ed720ac7eaa9b3655c06f6b9e196", "md5"),
+    ("2085c82d80500a91dd0b8aa9237b0e43f1c07809bd6e6785", "trunc512"),
+    ("ga4gh:SQ.IIXILYBQCpHdC4qpI3sOQ_HAeAm9bmeF", "ga4gh"),
+    ("ga4gh:SQ.HKyMuwwEWbdUDXfk5o1EGxGeqBmon6Sp", "ga4gh"),
+    ("3332ed720ac7eaa9b3655c06f6b9e19", None),
+    ("3332ed720ac7eaa9b3655c06f6b9e196\n", None),
+    ("3332ED720AC7EAA9B3655C06F6B9E196", None),
+    ("2085c82d80500a91dd0b8aa9237b0e43f1c07809bd6e678g", None),
+    ("ga4gh:SQ.IIXILYBQCpHdC4qpI3sOQ_HAeAm9bme", None),
+    ("ga4gh:SQ.IIXILYBQCpHdC4qpI3sOQ_HAeAm9bme=", None),
+    ("NC_001422.1", None),
+    ("", None)
+]
+
+@pytest.mark.parametrize("seqid,exp_type", testdata)
+def test_seqid(seqid, exp_type):
+    assert get_seqid_type(seqid) == exp_type
+    assert is_valid_seqid(seqid) == (exp_type is not None)
+
+def test_seqid_none():
+    assert not is_valid_seqid(None)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for single-flight call coalescing"""
+
+import concurrent.futures
+import pytest
+import threading
+from ga4gh.refget.util.singleflight import SingleFlight
+
+def run_coalesced(flight, key, func, n_callers):
+    """Call func through the single flight from concurrent callers
+
+    The first call is held in flight until all other callers are waiting for
+    it, then released
+
+    Returns:
+        (list): result (or exception) of each caller
+    """
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def held_func():
+        started.set()
+        release.wait()
+        return func()
+
+    with concurrent.futures.ThreadPoolExecutor(n_callers) as executor:
+        futures = [executor.submit(flight.do, key, held_func)]
+        started.wait()
+        futures += [executor.submit(flight.do, key, held_func)
+                    for i in range(n_callers - 1)]
+        while flight.calls[key].waiters < n_callers - 1:
+            release.wait(0.001)
+        release.set()
+        return [f.exception() or f.result() for f in futures]
+
+def test_do_coalesced():
+    flight = SingleFlight()
+    calls = []
+    fetch = lambda: calls.append(1) or "ACGT"
+    results = run_coalesced(flight, ("sequence", "url", 0, 4), fetch, 8)
+    assert len(calls) == 1
+    assert results == [["ACGT", False]] + [["ACGT", True]] * 7
+    assert flight.calls == {}
+
+def test_do_exception():
+    flight = SingleFlight()
+
+    def fetch():
+        raise ConnectionError("upstream unavailable")
+
+    results = run_coalesced(flight, ("metadata", "url"), fetch, 3)
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert flight.calls == {}
+
+def test_do_sequential():
+    flight = SingleFlight()
+    calls = []
+    fetch = lambda: calls.append(1) or len(calls)
+    # completed calls are not retained
+    assert flight.do(("metadata", "url"), fetch) == [1, False]
+    assert flight.do(("metadata", "url"), fetch) == [2, False]
+
+def test_do_distinct_keys():
+    flight = SingleFlight()
+    assert flight.do(("sequence", "url", 0, 4), lambda: "ACGT") == \
+        ["ACGT", False]
+    assert flight.do(("sequence", "url", 4, 8), lambda: "TTTT") == \
+        ["TTTT", False]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for stream module"""
+
+from ga4gh.refget.util.stream import ClosingStream
+
+class DummyStream(object):
+    def __init__(self, closed):
+        self.closed = closed
+
+    def __iter__(self):
+        return iter([b"ACGT"])
+
+    def close(self):
+        self.closed.append(True)
+
+def test_closing_stream_exhausted():
+    closed = []
+    upstream = DummyStream(closed)
+    stream = ClosingStream((c.lower() for c in upstream), [upstream])
+    assert b"".join(stream) == b"acgt"
+    assert closed == [True]
+    # closing again does not close the upstream streams twice
+    stream.close()
+    assert closed == [True]
+
+def test_closing_stream_not_started():
+    # upstream streams are closed even if the stream was never read
+    closed = []
+    upstreams = [DummyStream(closed), DummyStream(closed)]
+    stream = ClosingStream((c for s in upstreams for c in s), upstreams)
+    stream.close()
+    assert closed == [True, True]
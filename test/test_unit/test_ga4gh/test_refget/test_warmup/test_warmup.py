@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for warmup module"""
+
+import pytest
+from ga4gh.refget.config.exceptions import RefgetWarmupException
+from ga4gh.refget.datasource.datasource import get_datasource
+from ga4gh.refget.datasource.metadata import get_metadata_cache, \
+    get_negative_cache
+from ga4gh.refget.datasource.pinned_source import get_pinned_store
+from ga4gh.refget.warmup.warmup import get_warmup_seqids, read_warmup_file, \
+    warm_up
+from test.common.constants import TRUNC512_PHAGE, TRUNC512_CEREVISIAE, \
+    TRUNC512_NONEXISTENT, FILESERVER_PROPS_DICT
+from test.common.methods import setup_properties
+
+def write_warmup_file(tmp_path, lines):
+    path = tmp_path / "warmup.txt"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+def test_read_warmup_file(tmp_path):
+    path = write_warmup_file(tmp_path, [
+        "# GRCh38 primary assembly",
+        "",
+        TRUNC512_PHAGE + "\tchrM",
+        "  " + TRUNC512_CEREVISIAE,
+        TRUNC512_PHAGE
+    ])
+    assert read_warmup_file(path) == [TRUNC512_PHAGE, TRUNC512_CEREVISIAE]
+
+def test_get_warmup_seqids(tmp_path):
+    assert get_warmup_seqids(setup_properties({})) is None
+    path = write_warmup_file(tmp_path, [TRUNC512_PHAGE])
+    properties = setup_properties({"local.warmup_file": path})
+    assert get_warmup_seqids(properties) == [TRUNC512_PHAGE]
+
+    properties = setup_properties({"local.warmup_file": path + ".missing"})
+    with pytest.raises(RefgetWarmupException) as e:
+        get_warmup_seqids(properties)
+    assert e.value.get_exit_code() == 8
+
+testdata_warm_up = [
+    # metadata objects are fetched, sequences are not pinned by default
+    ({}, {"sequences": 3, "metadata": 2, "pinned": 0, "failed": 0}, []),
+    # small sequences are pinned
+    ({"cache.pinned_bytes": "1000000"},
+     {"sequences": 3, "metadata": 2, "pinned": 1, "failed": 0},
+     [TRUNC512_PHAGE]),
+    # sequences longer than the maximum pinned length are not pinned
+    ({"cache.pinned_bytes": "1000000", "cache.pin_max_length": "5385"},
+     {"sequences": 3, "metadata": 2, "pinned": 0, "failed": 0}, []),
+    # sequences that do not fit in the store are not pinned
+    ({"cache.pinned_bytes": "5385"},
+     {"sequences": 3, "metadata": 2, "pinned": 0, "failed": 0}, []),
+    # upstream errors are counted, rather than raised
+    ({"source.base_url": "http://localhost:1"},
+     {"sequences": 3, "metadata": 0, "pinned": 0, "failed": 3}, [])
+]
+
+@pytest.mark.parametrize("props_dict,exp_stats,exp_pinned", testdata_warm_up)
+def test_warm_up(props_dict, exp_stats, exp_pinned):
+    properties = setup_properties(dict(
+        FILESERVER_PROPS_DICT,
+        **dict({"cache.pin_max_length": "65536"}, **props_dict)))
+    metadata_cache = get_metadata_cache(properties)
+    metadata_cache.clear()
+    get_negative_cache(properties).clear()
+    get_pinned_store(properties).clear()
+
+    seqids = [TRUNC512_PHAGE, TRUNC512_CEREVISIAE, TRUNC512_NONEXISTENT]
+    assert warm_up(properties, seqids) == exp_stats
+    assert metadata_cache.contains(TRUNC512_PHAGE) == \
+        (exp_stats["metadata"] > 0)
+    datasource = get_datasource(properties)
+    for seqid in seqids:
+        assert datasource.is_pinned(seqid) == (seqid in exp_pinned)